@@ -7,7 +7,12 @@ from pydantic import BaseModel, Field
 from database.base import get_db
 from models.models import User, Fixture, Prediction, UserStats, FixtureStatus, CompetitionType, Season
 from utils.admin_auth import get_admin_user
-from utils.position_calculator import update_all_positions
+from utils.auth import invalidate_cached_user
+from utils.position_calculator import update_all_positions, update_all_mini_league_positions
+from services.scoring import apply_fixture_result
+from services.live_table import live_table
+from services.statistics import get_cached_admin_stats, invalidate_admin_stats
+from services.cold_storage import load_archived_fixture_predictions, archived_season_ids
 import pytz
 
 router = APIRouter()
@@ -46,34 +51,7 @@ async def get_admin_stats(
     admin: User = Depends(get_admin_user)
 ):
     """Get overall system statistics"""
-    from datetime import timedelta
-    
-    now = datetime.now(pytz.UTC)
-    week_ago = now - timedelta(days=7)
-    
-    total_users = db.query(User).count()
-    total_fixtures = db.query(Fixture).count()
-    total_predictions = db.query(Prediction).count()
-    upcoming_fixtures = db.query(Fixture).filter(
-        Fixture.status == FixtureStatus.SCHEDULED
-    ).count()
-    completed_fixtures = db.query(Fixture).filter(
-        Fixture.status == FixtureStatus.FINISHED
-    ).count()
-    
-    # Count users who made predictions in the last week
-    active_users = db.query(Prediction.user_id).filter(
-        Prediction.created_at >= week_ago
-    ).distinct().count()
-    
-    return AdminStats(
-        total_users=total_users,
-        total_fixtures=total_fixtures,
-        total_predictions=total_predictions,
-        upcoming_fixtures=upcoming_fixtures,
-        completed_fixtures=completed_fixtures,
-        active_users_last_week=active_users
-    )
+    return AdminStats(**get_cached_admin_stats(db))
 
 @router.post("/fixtures", response_model=dict)
 async def create_fixture(
@@ -103,6 +81,7 @@ async def create_fixture(
     
     db.add(fixture)
     db.commit()
+    invalidate_admin_stats()
     db.refresh(fixture)
     
     return {"message": "Fixture created successfully", "id": fixture.id}
@@ -146,6 +125,7 @@ async def update_fixture(
         fixture.round = fixture_data.round
     
     db.commit()
+    invalidate_admin_stats()
     db.refresh(fixture)
     
     return {"message": "Fixture updated successfully"}
@@ -175,6 +155,7 @@ async def delete_fixture(
     
     db.delete(fixture)
     db.commit()
+    invalidate_admin_stats()
     
     return {"message": "Fixture deleted successfully"}
 
@@ -185,96 +166,64 @@ async def update_fixture_score(
     db: Session = Depends(get_db),
     admin: User = Depends(get_admin_user)
 ):
-    """Update fixture score and calculate points"""
+    """Update fixture score and calculate points.
+    
+    Safe to call again on the same fixture to correct a result: only the change in
+    each user's points is applied.
+    """
     fixture = db.query(Fixture).filter(Fixture.id == fixture_id).first()
     
     if not fixture:
         raise HTTPException(status_code=404, detail="Fixture not found")
     
-    # Update the fixture scores
-    fixture.home_score = score_data.home_score
-    fixture.away_score = score_data.away_score
-    fixture.status = FixtureStatus.FINISHED
+    summary = apply_fixture_result(db, fixture, score_data.home_score, score_data.away_score)
     
-    # Calculate points for all predictions on this fixture
-    predictions = db.query(Prediction).filter(
-        Prediction.fixture_id == fixture_id
-    ).all()
+    db.commit()
+    invalidate_admin_stats()
     
-    points_updates = []
-    for prediction in predictions:
-        points = 0
-        
-        # Exact score = 3 points
-        if (prediction.home_prediction == score_data.home_score and 
-            prediction.away_prediction == score_data.away_score):
-            points = 3
-        # Correct result = 1 point
-        elif ((prediction.home_prediction > prediction.away_prediction and 
-               score_data.home_score > score_data.away_score) or
-              (prediction.home_prediction < prediction.away_prediction and 
-               score_data.home_score < score_data.away_score) or
-              (prediction.home_prediction == prediction.away_prediction and 
-               score_data.home_score == score_data.away_score)):
-            points = 1
-        
-        prediction.points_earned = points
-        points_updates.append({
-            "user_id": prediction.user_id,
-            "points": points,
-            "exact": points == 3
-        })
+    # The match is over, stop projecting a live table for it
+    live_table.clear(fixture.id)
     
-    # Update user statistics
-    for update in points_updates:
-        # Get the correct season from the fixture
-        if not fixture.season_id:
-            # If fixture has no season, skip stats update
-            continue
-            
-        user_stats = db.query(UserStats).filter(
-            UserStats.user_id == update["user_id"],
-            UserStats.season_id == fixture.season_id
-        ).first()
-        
-        if not user_stats:
-            user_stats = UserStats(
-                user_id=update["user_id"],
-                season_id=fixture.season_id
-            )
-            db.add(user_stats)
-        
-        user_stats.total_points += update["points"]
-        if update["exact"]:
-            user_stats.correct_scores += 1
-        elif update["points"] == 1:
-            user_stats.correct_results += 1
-        
-        # Update predictions made count
-        user_stats.predictions_made += 1
-        
-        # Update streak
-        if update["points"] > 0:
-            user_stats.current_streak += 1
-            if user_stats.current_streak > user_stats.best_streak:
-                user_stats.best_streak = user_stats.current_streak
-        else:
-            user_stats.current_streak = 0
-        
-        # Update average
-        if user_stats.predictions_made > 0:
-            user_stats.avg_points_per_game = user_stats.total_points / user_stats.predictions_made
+    # Positions only move if someone's points changed
+    if summary["users_updated"]:
+        update_all_positions(db, fixture.season_id)
+        update_all_mini_league_positions(db, fixture.season_id, workers=1)
+    
+    return {
+        "message": "Score updated and points calculated",
+        **summary
+    }
+
+@router.put("/fixtures/{fixture_id}/live-score", response_model=dict)
+async def update_live_score(
+    fixture_id: int,
+    score_data: ScoreUpdate,
+    db: Session = Depends(get_db),
+    admin: User = Depends(get_admin_user)
+):
+    """Set the in-progress score of a fixture and mark it LIVE (no points are awarded)"""
+    fixture = db.query(Fixture).filter(Fixture.id == fixture_id).first()
+    
+    if not fixture:
+        raise HTTPException(status_code=404, detail="Fixture not found")
+    
+    if fixture.status not in (FixtureStatus.SCHEDULED, FixtureStatus.LIVE):
+        raise HTTPException(
+            status_code=400,
+            detail="Live scores can only be set for scheduled or live fixtures"
+        )
+    
+    fixture.home_score = score_data.home_score
+    fixture.away_score = score_data.away_score
+    fixture.status = FixtureStatus.LIVE
     
     db.commit()
+    invalidate_admin_stats()
     
-    # Recalculate all positions after updating scores
-    update_all_positions(db, fixture.season_id)
+    live_table.set_score(db, fixture)
     
     return {
-        "message": "Score updated and points calculated",
-        "predictions_processed": len(predictions),
-        "total_exact_scores": sum(1 for u in points_updates if u["exact"]),
-        "total_correct_results": sum(1 for u in points_updates if u["points"] == 1)
+        "message": f"Live score set: {fixture.home_team} {fixture.home_score}-{fixture.away_score} {fixture.away_team}"
     }
 
 @router.get("/fixtures/{fixture_id}/predictions")
@@ -289,9 +238,11 @@ async def get_fixture_predictions(
     if not fixture:
         raise HTTPException(status_code=404, detail="Fixture not found")
     
-    predictions = db.query(Prediction).filter(
-        Prediction.fixture_id == fixture_id
-    ).join(User).all()
+    predictions = load_archived_fixture_predictions(db, fixture)
+    if predictions is None:
+        predictions = db.query(Prediction).filter(
+            Prediction.fixture_id == fixture_id
+        ).join(User).all()
     
     return {
         "fixture": {
@@ -321,8 +272,13 @@ async def recalculate_all_points(
     admin: User = Depends(get_admin_user)
 ):
     """Recalculate all points for all users (use with caution)"""
+    # Seasons in cold storage have no live predictions to recalculate from
+    cold_season_ids = archived_season_ids(db)
+    
     # Reset all user stats
-    db.query(UserStats).update({
+    db.query(UserStats).filter(
+        UserStats.season_id.notin_(cold_season_ids)
+    ).update({
         "total_points": 0,
         "correct_scores": 0,
         "correct_results": 0,
@@ -384,7 +340,9 @@ async def recalculate_all_points(
             total_recalculated += 1
     
     # Update predictions_made count, averages, and streaks
-    all_stats = db.query(UserStats).all()
+    all_stats = db.query(UserStats).filter(
+        UserStats.season_id.notin_(cold_season_ids)
+    ).all()
     for stat in all_stats:
         # Count how many predictions this user has that have been scored
         predictions_made = db.query(Prediction).filter(
@@ -422,12 +380,14 @@ async def recalculate_all_points(
         stat.best_streak = best_streak
     
     db.commit()
+    invalidate_admin_stats()
     
     # Recalculate all positions after recalculating points
     # Get current season ID
     current_season = db.query(Season).filter(Season.is_current == True).first()
     if current_season:
         update_all_positions(db, current_season.id)
+        update_all_mini_league_positions(db, current_season.id, workers=1)
     
     return {
         "message": "All points recalculated successfully",
@@ -449,6 +409,7 @@ async def make_user_admin(
     
     user.is_admin = True
     db.commit()
+    invalidate_cached_user(user.id)
     
     return {"message": f"User {user.username} is now an admin"}
 
@@ -469,6 +430,7 @@ async def remove_user_admin(
     
     user.is_admin = False
     db.commit()
+    invalidate_cached_user(user.id)
     
     return {"message": f"Admin privileges removed from {user.username}"}
 
@@ -595,6 +557,7 @@ async def simulate_fixture_score(
             user_stats.avg_points_per_game = user_stats.total_points / user_stats.predictions_made
     
     db.commit()
+    invalidate_admin_stats()
     
     return {
         "message": f"TEST MODE: Score simulated for {fixture.home_team} vs {fixture.away_team}",
@@ -658,6 +621,7 @@ async def undo_fixture_score(
             user_stats.avg_points_per_game = stats["avg_points_per_game"]
     
     db.commit()
+    invalidate_admin_stats()
     
     # Remove the backup
     del fixture_backups[fixture_id]
@@ -3,8 +3,9 @@ from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from database.base import get_db, settings
 from models.models import User, UserStats, Season
-from utils.auth import create_access_token
-import requests
+from utils.auth import create_access_token, invalidate_cached_user
+from services.http_client import http_client
+import httpx
 import hmac
 import hashlib
 import base64
@@ -24,11 +25,12 @@ TWITTER_API_SECRET = os.getenv("TWITTER_API_SECRET", "")
 TWITTER_CALLBACK_URL = os.getenv("TWITTER_CALLBACK_URL", "http://localhost:3000/api/auth/callback/twitter")
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
-# Twitter OAuth endpoints
-TWITTER_REQUEST_TOKEN_URL = "https://api.twitter.com/oauth/request_token"
-TWITTER_AUTHORIZE_URL = "https://api.twitter.com/oauth/authorize"
-TWITTER_ACCESS_TOKEN_URL = "https://api.twitter.com/oauth/access_token"
-TWITTER_VERIFY_CREDENTIALS_URL = "https://api.twitter.com/1.1/account/verify_credentials.json"
+# Twitter OAuth endpoints (the base URL can point at a local stand-in server for testing)
+TWITTER_API_BASE_URL = os.getenv("TWITTER_API_BASE_URL", "https://api.twitter.com").rstrip("/")
+TWITTER_REQUEST_TOKEN_URL = f"{TWITTER_API_BASE_URL}/oauth/request_token"
+TWITTER_AUTHORIZE_URL = f"{TWITTER_API_BASE_URL}/oauth/authorize"
+TWITTER_ACCESS_TOKEN_URL = f"{TWITTER_API_BASE_URL}/oauth/access_token"
+TWITTER_VERIFY_CREDENTIALS_URL = f"{TWITTER_API_BASE_URL}/1.1/account/verify_credentials.json"
 
 # Store request tokens temporarily (in production, use Redis or database)
 request_tokens = {}
@@ -69,6 +71,14 @@ def generate_oauth_header(params: dict) -> str:
     
     return f"OAuth {', '.join(oauth_params)}"
 
+async def twitter_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Call the Twitter API on the shared client, turning network failures into a 502"""
+    try:
+        return await http_client.client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        logger.error(f"Twitter request to {url} failed: {e!r}")
+        raise HTTPException(status_code=502, detail="Could not reach Twitter")
+
 @router.get("/login")
 async def twitter_login():
     """Initiate Twitter OAuth flow"""
@@ -104,7 +114,7 @@ async def twitter_login():
         "Authorization": generate_oauth_header(oauth_params)
     }
     
-    response = requests.post(TWITTER_REQUEST_TOKEN_URL, headers=headers)
+    response = await twitter_request("POST", TWITTER_REQUEST_TOKEN_URL, headers=headers)
     
     if response.status_code != 200:
         logger.error(f"Twitter request token failed: {response.text}")
@@ -169,7 +179,7 @@ async def twitter_callback(
         "Authorization": generate_oauth_header(oauth_params)
     }
     
-    response = requests.post(TWITTER_ACCESS_TOKEN_URL, headers=headers)
+    response = await twitter_request("POST", TWITTER_ACCESS_TOKEN_URL, headers=headers)
     
     if response.status_code != 200:
         logger.error(f"Twitter access token failed: {response.text}")
@@ -209,7 +219,8 @@ async def twitter_callback(
         "Authorization": generate_oauth_header(oauth_params)
     }
     
-    response = requests.get(
+    response = await twitter_request(
+        "GET",
         TWITTER_VERIFY_CREDENTIALS_URL,
         headers=headers,
         params={"include_email": "true"}
@@ -247,6 +258,7 @@ async def twitter_callback(
         user.twitter_handle = twitter_handle  # Use actual Twitter handle
         user.avatar_url = twitter_user.get("profile_image_url_https")
         db.commit()
+        invalidate_cached_user(user.id)
     else:
         # Check if email exists (if provided)
         email = twitter_user.get("email", f"{screen_name}@twitter.local")
@@ -258,6 +270,8 @@ async def twitter_callback(
             existing_user.twitter_handle = twitter_handle  # Use actual Twitter handle
             if not existing_user.avatar_url:  # Only update avatar if not already set
                 existing_user.avatar_url = twitter_user.get("profile_image_url_https")
+            db.commit()
+            invalidate_cached_user(existing_user.id)
             user = existing_user
         else:
             # Create new user
@@ -1,15 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, select
 from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel, EmailStr, Field, validator
 from database.base import get_db, settings
 from models.models import User, UserStats, Season
 from models.email_verification import EmailVerificationToken, PasswordResetToken
-from utils.auth import verify_password, get_password_hash, create_access_token, get_current_user
+from utils.auth import verify_and_update_password, get_password_hash_async, create_access_token, get_current_user, invalidate_cached_user
 from utils.validators import validate_email, validate_password, validate_username
-from utils.email import email_service
+from services.seasons import get_current_season_id
+from services.notifications import enqueue_verification_email, enqueue_password_reset_email
 import secrets
 import string
 import logging
@@ -92,32 +93,34 @@ def generate_verification_token() -> str:
     alphabet = string.ascii_letters + string.digits
     return ''.join(secrets.choice(alphabet) for _ in range(32))
 
-def create_verification_token(db: Session, user_id: int) -> str:
-    """Create and store email verification token"""
+def create_verification_token(db: Session, user: User) -> str:
+    """Create and store email verification token, queueing the email that carries it"""
     token = generate_verification_token()
     expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
     
     verification = EmailVerificationToken(
-        user_id=user_id,
+        user_id=user.id,
         token=token,
         expires_at=expires_at
     )
     db.add(verification)
+    enqueue_verification_email(db, user, token)
     db.commit()
     
     return token
 
-def create_reset_token(db: Session, user_id: int) -> str:
-    """Create and store password reset token"""
+def create_reset_token(db: Session, user: User) -> str:
+    """Create and store password reset token, queueing the email that carries it"""
     token = generate_verification_token()
     expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
     
     reset = PasswordResetToken(
-        user_id=user_id,
+        user_id=user.id,
         token=token,
         expires_at=expires_at
     )
     db.add(reset)
+    enqueue_password_reset_email(db, user, token)
     db.commit()
     
     return token
@@ -125,7 +128,6 @@ def create_reset_token(db: Session, user_id: int) -> str:
 @router.post("/register", response_model=TokenResponse)
 async def register(
     user_data: UserRegister,
-    background_tasks: BackgroundTasks,
     request: Request,
     db: Session = Depends(get_db)
 ):
@@ -168,7 +170,7 @@ async def register(
             )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         email=user_data.email.lower(),
         username=user_data.username,
@@ -200,18 +202,11 @@ async def register(
     logger.info(f"SMTP config check - Username: {smtp_user}, Password: {'[SET]' if smtp_pass else '[NOT SET]'}")
     
     if smtp_user and smtp_pass:
-        verification_token = create_verification_token(db, new_user.id)
+        verification_token = create_verification_token(db, new_user)
         print(f"Created verification token for {new_user.email}: {verification_token[:10]}...")
         logger.info(f"Created verification token for {new_user.email}: {verification_token[:10]}...")
-        
-        background_tasks.add_task(
-            email_service.send_verification_email,
-            new_user.email,
-            new_user.username,
-            verification_token
-        )
-        print(f"Verification email task queued for {new_user.email}")
-        logger.info(f"Verification email task queued for {new_user.email}")
+        print(f"Verification email queued for {new_user.email}")
+        logger.info(f"Verification email queued for {new_user.email}")
     else:
         # Auto-verify if email not configured
         new_user.email_verified = True
@@ -270,6 +265,7 @@ async def verify_email(
     token_record.used = True
     
     db.commit()
+    invalidate_cached_user(user.id)
     
     return {"message": "Email verified successfully"}
 
@@ -278,7 +274,6 @@ class ResendVerificationRequest(BaseModel):
 
 @router.post("/resend-verification")
 async def resend_verification(
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -299,16 +294,8 @@ async def resend_verification(
     ).update({"used": True})
     db.commit()
     
-    # Create new token
-    verification_token = create_verification_token(db, current_user.id)
-    
-    # Send email
-    background_tasks.add_task(
-        email_service.send_verification_email,
-        current_user.email,
-        current_user.username,
-        verification_token
-    )
+    # Create new token and queue the email
+    create_verification_token(db, current_user)
     
     logger.info(f"Resending verification email to {current_user.email}")
     
@@ -317,7 +304,6 @@ async def resend_verification(
 @router.post("/resend-verification-public") 
 async def resend_verification_public(
     request: ResendVerificationRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Resend verification email using email address"""
@@ -343,23 +329,14 @@ async def resend_verification_public(
     ).update({"used": True})
     db.commit()
     
-    # Create new token
-    verification_token = create_verification_token(db, user.id)
-    
-    # Send email
-    background_tasks.add_task(
-        email_service.send_verification_email,
-        user.email,
-        user.username,
-        verification_token
-    )
+    # Create new token and queue the email
+    create_verification_token(db, user)
     
     return {"message": "Verification email sent"}
 
 @router.post("/forgot-password")
 async def forgot_password(
     request: PasswordResetRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Request password reset email"""
@@ -378,16 +355,8 @@ async def forgot_password(
             ).update({"used": True})
             db.commit()
             
-            # Create new token
-            reset_token = create_reset_token(db, user.id)
-            
-            # Send email
-            background_tasks.add_task(
-                email_service.send_password_reset_email,
-                user.email,
-                user.username,
-                reset_token
-            )
+            # Create new token and queue the email
+            create_reset_token(db, user)
     
     # Always return success to prevent email enumeration
     return {"message": "If an account exists with this email, a password reset link has been sent"}
@@ -422,10 +391,11 @@ async def reset_password(
     
     # Update password
     user = token_record.user
-    user.password_hash = get_password_hash(reset_data.new_password)
+    user.password_hash = await get_password_hash_async(reset_data.new_password)
     token_record.used = True
     
     db.commit()
+    invalidate_cached_user(user.id)
     
     return {"message": "Password reset successfully"}
 
@@ -472,13 +442,20 @@ async def login(
         )
     
     # Verify password
-    if not verify_password(form_data.password, user.password_hash):
+    verified, new_hash = await verify_and_update_password(form_data.password, user.password_hash)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
+    # Upgrade hashes made with an old cost factor while we have the plain password
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+        invalidate_cached_user(user.id)
+    
     # Create access token
     access_token = create_access_token(data={"sub": str(user.id)})
     
@@ -505,20 +482,44 @@ class SocialAuthRequest(BaseModel):
     avatar_url: Optional[str] = None
     twitter_handle: Optional[str] = None
 
+def unique_username(db: Session, username: str) -> str:
+    """Return username, or username_N with the lowest free N, using a single prefix query"""
+    pattern = username.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "\\_%"
+    taken = set(db.scalars(select(User.username).where(or_(
+        User.username == username,
+        User.username.like(pattern, escape="\\")
+    ))))
+    
+    candidate = username
+    counter = 1
+    while candidate in taken:
+        candidate = f"{username}_{counter}"
+        counter += 1
+    return candidate
+
 @router.post("/social", response_model=TokenResponse)
 def social_login(auth_data: SocialAuthRequest, db: Session = Depends(get_db)):
     """Handle social authentication from NextAuth"""
     print(f"[SOCIAL AUTH] Received: provider={auth_data.provider}, email={auth_data.email}, name={auth_data.name}, twitter_handle={auth_data.twitter_handle}")
     
-    # Check if user exists with this provider ID
     if auth_data.provider == "google":
-        user = db.query(User).filter(User.google_id == auth_data.provider_id).first()
+        provider_column = User.google_id
     elif auth_data.provider == "twitter":
-        user = db.query(User).filter(User.twitter_id == auth_data.provider_id).first()
-        if user:
+        provider_column = User.twitter_id
+    else:
+        raise HTTPException(status_code=400, detail="Invalid provider")
+    
+    # Look the user up by provider ID and by email in one query; the provider ID wins
+    candidates = db.query(User).filter(or_(
+        provider_column == auth_data.provider_id,
+        User.email == auth_data.email
+    )).all()
+    user = next((c for c in candidates if getattr(c, provider_column.key) == auth_data.provider_id), None)
+    update_needed = False
+    
+    if user:
+        if auth_data.provider == "twitter":
             # Always update Twitter handle and avatar for existing Twitter users (in case they changed on Twitter)
-            update_needed = False
-            
             if auth_data.twitter_handle:
                 new_handle = auth_data.twitter_handle.replace('@', '').lower()
                 if user.twitter_handle != new_handle:
@@ -533,15 +534,9 @@ def social_login(auth_data: SocialAuthRequest, db: Session = Depends(get_db)):
                 print(f"[SOCIAL AUTH] Avatar URL changed for user {user.id}")
                 user.avatar_url = auth_data.avatar_url
                 update_needed = True
-            
-            if update_needed:
-                db.commit()
     else:
-        raise HTTPException(status_code=400, detail="Invalid provider")
-    
-    # If not found by provider ID, check by email
-    if not user:
-        user = db.query(User).filter(User.email == auth_data.email).first()
+        # If not found by provider ID, check by email
+        user = next((c for c in candidates if c.email == auth_data.email), None)
         
         if user:
             # Update existing user with provider ID
@@ -557,8 +552,8 @@ def social_login(auth_data: SocialAuthRequest, db: Session = Depends(get_db)):
             
             if auth_data.avatar_url and not user.avatar_url:
                 user.avatar_url = auth_data.avatar_url
-                
-            db.commit()
+            
+            update_needed = True
         else:
             # Create new user
             # For Twitter users, use their handle as username for consistency
@@ -571,11 +566,7 @@ def social_login(auth_data: SocialAuthRequest, db: Session = Depends(get_db)):
                 username = auth_data.name.lower().replace(" ", "_")
             
             # Ensure unique username
-            base_username = username
-            counter = 1
-            while db.query(User).filter(User.username == username).first():
-                username = f"{base_username}_{counter}"
-                counter += 1
+            username = unique_username(db, username)
             
             # Prepare user data with all fields
             user_data = {
@@ -598,30 +589,23 @@ def social_login(auth_data: SocialAuthRequest, db: Session = Depends(get_db)):
             
             print(f"[SOCIAL AUTH] Creating user with data: {user_data}")
             user = User(**user_data)
-            
             db.add(user)
-            db.commit()
-            db.refresh(user)
             
-            # Verify the twitter_handle was saved
-            print(f"[SOCIAL AUTH] Created user {user.id} with twitter_handle: {user.twitter_handle}")
+            # Create user stats for current season, inserted with the user on commit
+            current_season_id = get_current_season_id(db)
+            if current_season_id:
+                db.add(UserStats(user=user, season_id=current_season_id))
             
-            # Get current season
-            current_season = db.query(Season).filter(Season.is_current == True).first()
-            if current_season:
-                # Create user stats for current season
-                user_stats = UserStats(
-                    user_id=user.id,
-                    season_id=current_season.id
-                )
-                db.add(user_stats)
-                db.commit()
+            db.flush()
+            print(f"[SOCIAL AUTH] Created user {user.id} with twitter_handle: {user.twitter_handle}")
+            update_needed = True
     
     print(f"Social login - User found/created: ID={user.id}, Email={user.email}, Admin={user.is_admin}")
     access_token = create_access_token(data={"sub": str(user.id)})
     print(f"Created token for user ID: {user.id}")
     
-    return TokenResponse(
+    # Build the response before committing so it doesn't reload the expired user
+    response = TokenResponse(
         access_token=access_token,
         token_type="bearer",
         user=UserResponse(
@@ -634,4 +618,10 @@ def social_login(auth_data: SocialAuthRequest, db: Session = Depends(get_db)):
             twitter_handle=user.twitter_handle,
             provider=user.provider
         )
-    )
\ No newline at end of file
+    )
+    
+    if update_needed:
+        db.commit()
+        invalidate_cached_user(response.user.id)
+    
+    return response
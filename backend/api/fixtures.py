@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select
 from datetime import datetime, timedelta
 from typing import List, Optional
 from pydantic import BaseModel
 from database.base import get_db
-from models.models import Fixture, FixtureStatus, CompetitionType, User, Season
-from utils.auth import get_current_user, get_current_user_optional
+from models.models import Fixture, FixtureStatus, CompetitionType, User, Season, Prediction
+from utils.auth import get_current_user_optional
+from services.cold_storage import get_archived_predictions
+from services.seasons import current_season_id_query
 import pytz
 
+# Response models and query builders are shared with api/fixtures_async.py
 router = APIRouter()
 
 class FixtureResponse(BaseModel):
@@ -26,6 +29,135 @@ class FixtureResponse(BaseModel):
     predictions_count: int = 0
     user_prediction: Optional[dict] = None
 
+def fixtures_query():
+    """Select fixtures together with their season name and prediction count"""
+    predictions_count = select(func.count(Prediction.id)).where(
+        Prediction.fixture_id == Fixture.id
+    ).correlate(Fixture).scalar_subquery()
+    
+    return select(
+        Fixture,
+        Season.name.label("season_name"),
+        predictions_count.label("predictions_count")
+    ).outerjoin(Season, Season.id == Fixture.season_id)
+
+def all_fixtures_query(season_id: Optional[int]):
+    query = fixtures_query()
+    if season_id:
+        query = query.where(Fixture.season_id == season_id)
+    return query.order_by(Fixture.kickoff_time.asc())
+
+def next_fixture_query(season_id: int, now: datetime):
+    return fixtures_query().where(
+        and_(
+            Fixture.season_id == season_id,
+            Fixture.status == FixtureStatus.SCHEDULED,
+            Fixture.kickoff_time > now
+        )
+    ).order_by(Fixture.kickoff_time).limit(1)
+
+def upcoming_fixtures_query(now: datetime, limit: int):
+    return fixtures_query().where(
+        and_(
+            Fixture.status == FixtureStatus.SCHEDULED,
+            Fixture.kickoff_time > now
+        )
+    ).order_by(Fixture.kickoff_time).limit(limit)
+
+def recent_fixtures_query(season_id: int, limit: int):
+    return fixtures_query().where(
+        and_(
+            Fixture.season_id == season_id,
+            Fixture.status == FixtureStatus.FINISHED
+        )
+    ).order_by(Fixture.kickoff_time.desc()).limit(limit)
+
+def next_fixture_id_query(now: datetime):
+    """Select the id of the one fixture open for predictions"""
+    return select(Fixture.id).where(
+        and_(
+            Fixture.status == FixtureStatus.SCHEDULED,
+            Fixture.kickoff_time > now
+        )
+    ).order_by(Fixture.kickoff_time).limit(1)
+
+def user_prediction_query(user_id: int, fixture_id: int):
+    return select(Prediction).where(
+        and_(
+            Prediction.user_id == user_id,
+            Prediction.fixture_id == fixture_id
+        )
+    ).limit(1)
+
+def season_archives(db: Session, rows) -> dict:
+    """Cold storage stores for the seasons of the given rows, None for seasons still in the live table"""
+    return {
+        season_id: get_archived_predictions(db, season_id)
+        for season_id in {row.Fixture.season_id for row in rows}
+    }
+
+def prediction_deadline(fixture: Fixture) -> datetime:
+    kickoff = fixture.kickoff_time
+    if kickoff.tzinfo is None:
+        kickoff = pytz.UTC.localize(kickoff)
+    return kickoff - timedelta(minutes=5)
+
+def user_prediction_response(prediction: Optional[Prediction]) -> Optional[dict]:
+    if not prediction:
+        return None
+    return {
+        "home_prediction": prediction.home_prediction,
+        "away_prediction": prediction.away_prediction,
+        "created_at": prediction.created_at,
+        "updated_at": prediction.updated_at
+    }
+
+def fixture_response(row, can_predict: bool, user_prediction: Optional[dict] = None, archives: Optional[dict] = None) -> FixtureResponse:
+    fixture = row.Fixture
+    # Archived seasons' predictions have left the live table, so count them in cold storage
+    archive = archives.get(fixture.season_id) if archives else None
+    return FixtureResponse(
+        id=fixture.id,
+        home_team=fixture.home_team,
+        away_team=fixture.away_team,
+        competition=fixture.competition,
+        kickoff_time=fixture.kickoff_time,
+        status=fixture.status,
+        home_score=fixture.home_score,
+        away_score=fixture.away_score,
+        season=row.season_name or "Unknown",
+        round=fixture.round,
+        can_predict=can_predict,
+        predictions_count=archive.count_for_fixture(fixture.id) if archive is not None else row.predictions_count,
+        user_prediction=user_prediction
+    )
+
+def all_fixtures_response(rows, archives: dict, now: datetime) -> List[FixtureResponse]:
+    return [
+        fixture_response(
+            row,
+            can_predict=now < prediction_deadline(row.Fixture) and row.Fixture.status == FixtureStatus.SCHEDULED,
+            archives=archives
+        )
+        for row in rows
+    ]
+
+def upcoming_fixtures_response(rows, now: datetime) -> List[FixtureResponse]:
+    # Only the first upcoming fixture is open for predictions
+    return [
+        fixture_response(row, can_predict=index == 0 and now < prediction_deadline(row.Fixture))
+        for index, row in enumerate(rows)
+    ]
+
+def single_fixture_response(row, next_fixture_id: Optional[int], archives: dict, now: datetime) -> FixtureResponse:
+    fixture = row.Fixture
+    can_predict = (
+        fixture.status == FixtureStatus.SCHEDULED and
+        now < prediction_deadline(fixture) and
+        fixture.id == next_fixture_id
+    )
+    return fixture_response(row, can_predict=can_predict, archives=archives)
+
 @router.get("/", response_model=List[FixtureResponse])
 def get_all_fixtures(
     season_id: Optional[int] = None,
@@ -36,40 +168,10 @@ def get_all_fixtures(
     
     # If no season specified, use current season
     if not season_id:
-        current_season = db.query(Season).filter(Season.is_current == True).first()
-        if current_season:
-            season_id = current_season.id
-    
-    query = db.query(Fixture)
-    if season_id:
-        query = query.filter(Fixture.season_id == season_id)
+        season_id = db.scalar(current_season_id_query())
     
-    fixtures = query.order_by(Fixture.kickoff_time.asc()).all()
-    
-    response = []
-    for fixture in fixtures:
-        kickoff = fixture.kickoff_time
-        if kickoff.tzinfo is None:
-            kickoff = pytz.UTC.localize(kickoff)
-        deadline = kickoff - timedelta(minutes=5)
-        can_predict = now < deadline and fixture.status == FixtureStatus.SCHEDULED
-        
-        response.append(FixtureResponse(
-            id=fixture.id,
-            home_team=fixture.home_team,
-            away_team=fixture.away_team,
-            competition=fixture.competition,
-            kickoff_time=fixture.kickoff_time,
-            status=fixture.status,
-            home_score=fixture.home_score,
-            away_score=fixture.away_score,
-            season=fixture.season.name if fixture.season else "Unknown",
-            round=fixture.round,
-            can_predict=can_predict,
-            predictions_count=len(fixture.predictions)
-        ))
-    
-    return response
+    rows = db.execute(all_fixtures_query(season_id)).all()
+    return all_fixtures_response(rows, season_archives(db, rows), now)
 
 @router.get("/next", response_model=FixtureResponse)
 def get_next_fixture(
@@ -79,65 +181,22 @@ def get_next_fixture(
     now = datetime.now(pytz.UTC)
     
     # Get current season
-    current_season = db.query(Season).filter(Season.is_current == True).first()
-    if not current_season:
+    season_id = db.scalar(current_season_id_query())
+    if not season_id:
         raise HTTPException(status_code=404, detail="No current season found")
     
-    next_fixture = db.query(Fixture).filter(
-        and_(
-            Fixture.season_id == current_season.id,
-            Fixture.status == FixtureStatus.SCHEDULED,
-            Fixture.kickoff_time > now
-        )
-    ).order_by(Fixture.kickoff_time).first()
-    
-    if not next_fixture:
+    row = db.execute(next_fixture_query(season_id, now)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="No upcoming fixtures found")
     
-    # Ensure kickoff_time is timezone-aware
-    kickoff = next_fixture.kickoff_time
-    if kickoff.tzinfo is None:
-        kickoff = pytz.UTC.localize(kickoff)
-    
-    deadline = kickoff - timedelta(minutes=5)
-    can_predict = now < deadline
-    
-    predictions_count = len(next_fixture.predictions)
-    
     # Get user's prediction if they're logged in
     user_prediction = None
     if current_user:
-        from models.models import Prediction
-        existing_prediction = db.query(Prediction).filter(
-            and_(
-                Prediction.user_id == current_user.id,
-                Prediction.fixture_id == next_fixture.id
-            )
-        ).first()
-        
-        if existing_prediction:
-            user_prediction = {
-                "home_prediction": existing_prediction.home_prediction,
-                "away_prediction": existing_prediction.away_prediction,
-                "created_at": existing_prediction.created_at,
-                "updated_at": existing_prediction.updated_at
-            }
+        user_prediction = user_prediction_response(
+            db.scalar(user_prediction_query(current_user.id, row.Fixture.id))
+        )
     
-    return FixtureResponse(
-        id=next_fixture.id,
-        home_team=next_fixture.home_team,
-        away_team=next_fixture.away_team,
-        competition=next_fixture.competition,
-        kickoff_time=next_fixture.kickoff_time,
-        status=next_fixture.status,
-        home_score=next_fixture.home_score,
-        away_score=next_fixture.away_score,
-        season=next_fixture.season.name if next_fixture.season else "Unknown",
-        round=next_fixture.round,
-        can_predict=can_predict,
-        predictions_count=predictions_count,
-        user_prediction=user_prediction
-    )
+    return fixture_response(row, can_predict=now < prediction_deadline(row.Fixture), user_prediction=user_prediction)
 
 @router.get("/upcoming", response_model=List[FixtureResponse])
 def get_upcoming_fixtures(
@@ -146,37 +205,8 @@ def get_upcoming_fixtures(
 ):
     now = datetime.now(pytz.UTC)
     
-    fixtures = db.query(Fixture).filter(
-        and_(
-            Fixture.status == FixtureStatus.SCHEDULED,
-            Fixture.kickoff_time > now
-        )
-    ).order_by(Fixture.kickoff_time).limit(limit).all()
-    
-    response = []
-    for fixture in fixtures:
-        kickoff = fixture.kickoff_time
-        if kickoff.tzinfo is None:
-            kickoff = pytz.UTC.localize(kickoff)
-        deadline = kickoff - timedelta(minutes=5)
-        can_predict = now < deadline and fixture == fixtures[0]
-        
-        response.append(FixtureResponse(
-            id=fixture.id,
-            home_team=fixture.home_team,
-            away_team=fixture.away_team,
-            competition=fixture.competition,
-            kickoff_time=fixture.kickoff_time,
-            status=fixture.status,
-            home_score=fixture.home_score,
-            away_score=fixture.away_score,
-            season=fixture.season.name if fixture.season else "Unknown",
-            round=fixture.round,
-            can_predict=can_predict,
-            predictions_count=len(fixture.predictions)
-        ))
-    
-    return response
+    rows = db.execute(upcoming_fixtures_query(now, limit)).all()
+    return upcoming_fixtures_response(rows, now)
 
 @router.get("/recent", response_model=List[FixtureResponse])
 def get_recent_fixtures(
@@ -184,76 +214,24 @@ def get_recent_fixtures(
     db: Session = Depends(get_db)
 ):
     # Get current season
-    current_season = db.query(Season).filter(Season.is_current == True).first()
-    if not current_season:
+    season_id = db.scalar(current_season_id_query())
+    if not season_id:
         return []
     
-    fixtures = db.query(Fixture).filter(
-        and_(
-            Fixture.season_id == current_season.id,
-            Fixture.status == FixtureStatus.FINISHED
-        )
-    ).order_by(Fixture.kickoff_time.desc()).limit(limit).all()
-    
-    response = []
-    for fixture in fixtures:
-        response.append(FixtureResponse(
-            id=fixture.id,
-            home_team=fixture.home_team,
-            away_team=fixture.away_team,
-            competition=fixture.competition,
-            kickoff_time=fixture.kickoff_time,
-            status=fixture.status,
-            home_score=fixture.home_score,
-            away_score=fixture.away_score,
-            season=fixture.season.name if fixture.season else "Unknown",
-            round=fixture.round,
-            can_predict=False,
-            predictions_count=len(fixture.predictions)
-        ))
-    
-    return response
+    rows = db.execute(recent_fixtures_query(season_id, limit)).all()
+    return [fixture_response(row, can_predict=False) for row in rows]
 
 @router.get("/{fixture_id}", response_model=FixtureResponse)
 def get_fixture(
     fixture_id: int,
     db: Session = Depends(get_db)
 ):
-    fixture = db.query(Fixture).filter(Fixture.id == fixture_id).first()
+    row = db.execute(fixtures_query().where(Fixture.id == fixture_id)).first()
     
-    if not fixture:
+    if not row:
         raise HTTPException(status_code=404, detail="Fixture not found")
     
     now = datetime.now(pytz.UTC)
-    kickoff = fixture.kickoff_time
-    if kickoff.tzinfo is None:
-        kickoff = pytz.UTC.localize(kickoff)
-    deadline = kickoff - timedelta(minutes=5)
-    
-    next_fixture = db.query(Fixture).filter(
-        and_(
-            Fixture.status == FixtureStatus.SCHEDULED,
-            Fixture.kickoff_time > now
-        )
-    ).order_by(Fixture.kickoff_time).first()
-    
-    can_predict = (
-        fixture.status == FixtureStatus.SCHEDULED and 
-        now < deadline and 
-        fixture == next_fixture
+    return single_fixture_response(
+        row, db.scalar(next_fixture_id_query(now)), season_archives(db, [row]), now
     )
-    
-    return FixtureResponse(
-        id=fixture.id,
-        home_team=fixture.home_team,
-        away_team=fixture.away_team,
-        competition=fixture.competition,
-        kickoff_time=fixture.kickoff_time,
-        status=fixture.status,
-        home_score=fixture.home_score,
-        away_score=fixture.away_score,
-        season=fixture.season.name if fixture.season else "Unknown",
-        round=fixture.round,
-        can_predict=can_predict,
-        predictions_count=len(fixture.predictions)
-    )
\ No newline at end of file
@@ -0,0 +1,96 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List, Optional
+from database.base import get_async_db
+from models.models import Fixture, User
+from utils.auth import get_current_user_optional_async
+from services.seasons import current_season_id_query
+from api.fixtures import (
+    FixtureResponse, fixtures_query, all_fixtures_query, next_fixture_query, upcoming_fixtures_query,
+    recent_fixtures_query, next_fixture_id_query, user_prediction_query, season_archives,
+    prediction_deadline, user_prediction_response, fixture_response, all_fixtures_response,
+    upcoming_fixtures_response, single_fixture_response
+)
+import pytz
+
+# Runs the queries built in api/fixtures.py on the request's AsyncSession
+router = APIRouter()
+
+@router.get("/", response_model=List[FixtureResponse])
+async def get_all_fixtures(
+    season_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all fixtures sorted by kickoff time"""
+    now = datetime.now(pytz.UTC)
+    
+    # If no season specified, use current season
+    if not season_id:
+        season_id = await db.scalar(current_season_id_query())
+    
+    rows = (await db.execute(all_fixtures_query(season_id))).all()
+    return all_fixtures_response(rows, await db.run_sync(season_archives, rows), now)
+
+@router.get("/next", response_model=FixtureResponse)
+async def get_next_fixture(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[User] = Depends(get_current_user_optional_async)
+):
+    now = datetime.now(pytz.UTC)
+    
+    # Get current season
+    season_id = await db.scalar(current_season_id_query())
+    if not season_id:
+        raise HTTPException(status_code=404, detail="No current season found")
+    
+    row = (await db.execute(next_fixture_query(season_id, now))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="No upcoming fixtures found")
+    
+    # Get user's prediction if they're logged in
+    user_prediction = None
+    if current_user:
+        user_prediction = user_prediction_response(
+            await db.scalar(user_prediction_query(current_user.id, row.Fixture.id))
+        )
+    
+    return fixture_response(row, can_predict=now < prediction_deadline(row.Fixture), user_prediction=user_prediction)
+
+@router.get("/upcoming", response_model=List[FixtureResponse])
+async def get_upcoming_fixtures(
+    limit: int = Query(default=5, le=20),
+    db: AsyncSession = Depends(get_async_db)
+):
+    now = datetime.now(pytz.UTC)
+    
+    rows = (await db.execute(upcoming_fixtures_query(now, limit))).all()
+    return upcoming_fixtures_response(rows, now)
+
+@router.get("/recent", response_model=List[FixtureResponse])
+async def get_recent_fixtures(
+    limit: int = Query(default=5, le=20),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Get current season
+    season_id = await db.scalar(current_season_id_query())
+    if not season_id:
+        return []
+    
+    rows = (await db.execute(recent_fixtures_query(season_id, limit))).all()
+    return [fixture_response(row, can_predict=False) for row in rows]
+
+@router.get("/{fixture_id}", response_model=FixtureResponse)
+async def get_fixture(
+    fixture_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    row = (await db.execute(fixtures_query().where(Fixture.id == fixture_id))).first()
+    
+    if not row:
+        raise HTTPException(status_code=404, detail="Fixture not found")
+    
+    now = datetime.now(pytz.UTC)
+    return single_fixture_response(
+        row, await db.scalar(next_fixture_id_query(now)), await db.run_sync(season_archives, [row]), now
+    )
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_, and_, Integer, func
-from typing import List
+from sqlalchemy import func, select
+from typing import List, Optional
 from pydantic import BaseModel
 from database.base import get_db
-from models.models import UserStats, User, FixtureStatus, Season
+from models.models import UserStats, User
+from models.mini_leagues import MiniLeagueMember
 from utils.auth import get_current_user
-from utils.position_calculator import update_mini_league_positions
+from utils.position_calculator import mini_league_standings
+from services.live_table import live_table
+from services.seasons import current_season_id_query
+from services.snapshots import get_season_snapshot, snapshot_entries
 
+# Response models and query builders are shared with api/leaderboard_async.py
 router = APIRouter()
 
 class LeaderboardEntry(BaseModel):
@@ -21,6 +26,88 @@ class LeaderboardEntry(BaseModel):
     avg_points_per_game: float
     current_streak: int
 
+class LiveLeaderboardEntry(LeaderboardEntry):
+    live_points: int | None
+    previous_position: int | None
+
+class LiveLeaderboard(BaseModel):
+    fixture_id: int
+    home_team: str
+    away_team: str
+    home_score: int
+    away_score: int
+    entries: List[LiveLeaderboardEntry]
+
+def season_stats_query(season_id: int):
+    """Select (UserStats, User) rows for a season"""
+    return select(UserStats, User).join(User, User.id == UserStats.user_id).where(UserStats.season_id == season_id)
+
+def leaderboard_query(season_id: int, mini_league_id: Optional[int], offset: int, limit: int):
+    """
+    Select (UserStats, User, position) rows for a page of the leaderboard. The main
+    leaderboard uses stored positions; mini leagues are ranked live by the same rules.
+    """
+    if mini_league_id:
+        standings = mini_league_standings(mini_league_id, season_id)
+        query = season_stats_query(season_id).add_columns(standings.c.position).join(
+            standings, standings.c.user_id == UserStats.user_id
+        ).order_by(standings.c.position, User.username)
+    else:
+        query = season_stats_query(season_id).add_columns(UserStats.position).order_by(
+            UserStats.position,  # Order by stored position
+            User.username  # Username as tiebreaker
+        )
+    return query.offset(offset).limit(limit)
+
+def leaderboard_count_query(season_id: int, mini_league_id: Optional[int]):
+    query = select(func.count()).select_from(UserStats).where(UserStats.season_id == season_id)
+    
+    # If mini_league_id is provided, filter by league members
+    if mini_league_id:
+        member_ids = select(MiniLeagueMember.user_id).where(
+            MiniLeagueMember.mini_league_id == mini_league_id
+        )
+        query = query.where(UserStats.user_id.in_(member_ids))
+    return query
+
+def user_stats_query(user_id: int, season_id: int):
+    return select(UserStats).where(
+        UserStats.user_id == user_id,
+        UserStats.season_id == season_id
+    ).limit(1)
+
+def league_position_query(mini_league_id: int, season_id: int, user_id: int):
+    standings = mini_league_standings(mini_league_id, season_id)
+    return select(standings.c.position).where(standings.c.user_id == user_id)
+
+def top_leaderboard_query(season_id: int, limit: int):
+    return season_stats_query(season_id).add_columns(UserStats.position).where(
+        UserStats.position <= limit  # Only get top N positions
+    ).order_by(
+        UserStats.position,
+        User.username
+    ).limit(limit)
+
+def leaderboard_entry(stat: UserStats, user: User, position: Optional[int]) -> LeaderboardEntry:
+    return LeaderboardEntry(
+        position=position if position is not None else 999,
+        username=user.username,
+        avatar_url=user.avatar_url,
+        total_points=stat.total_points,
+        correct_scores=stat.correct_scores,
+        correct_results=stat.correct_results,
+        predictions_made=stat.predictions_made,
+        avg_points_per_game=stat.avg_points_per_game,
+        current_streak=stat.current_streak
+    )
+
+def leaderboard_response(rows) -> List[LeaderboardEntry]:
+    """Build entries from (UserStats, User, position) rows"""
+    return [leaderboard_entry(stat, user, position) for stat, user, position in rows]
+
+def snapshot_leaderboard(snapshot: dict, offset: int, limit: int) -> List[LeaderboardEntry]:
+    return [LeaderboardEntry(**entry) for entry in snapshot_entries(snapshot, offset, limit)]
+
 @router.get("/", response_model=List[LeaderboardEntry])
 def get_leaderboard(
     season_id: int = Query(default=None),
@@ -31,82 +118,16 @@ def get_leaderboard(
 ):
     # If no season specified, use current season
     if not season_id:
-        current_season = db.query(Season).filter(Season.is_current == True).first()
-        if not current_season:
+        season_id = db.scalar(current_season_id_query())
+        if not season_id:
             return []
-        season_id = current_season.id
-    
-    # Base query for user stats
-    query = db.query(UserStats).filter(UserStats.season_id == season_id)
-    
-    # If mini_league_id is provided, filter by league members and calculate positions
-    if mini_league_id:
-        from models.mini_leagues import MiniLeagueMember
-        
-        # Get member user IDs for this league
-        member_ids = db.query(MiniLeagueMember.user_id).filter(
-            MiniLeagueMember.mini_league_id == mini_league_id
-        ).subquery()
-        
-        # Filter stats to only league members
-        query = query.filter(UserStats.user_id.in_(member_ids))
-        
-        # Calculate positions for this mini league
-        mini_league_positions = update_mini_league_positions(db, mini_league_id)
-        
-        # Order by ranking criteria (not position since it's for main league)
-        stats = query.join(User).order_by(
-            desc(UserStats.predictions_made > 0),  # Users with predictions first
-            desc(UserStats.total_points),
-            desc(UserStats.correct_scores),
-            desc(UserStats.correct_results),
-            User.username  # Alphabetical by username for stable ordering
-        ).offset(offset).limit(limit).all()
-        
-        # Build leaderboard with mini league positions
-        leaderboard = []
-        for stat in stats:
-            user = stat.user
-            position = mini_league_positions.get(stat.user_id, 999)
-            
-            leaderboard.append(LeaderboardEntry(
-                position=position,
-                username=user.username,
-                avatar_url=user.avatar_url,
-                total_points=stat.total_points,
-                correct_scores=stat.correct_scores,
-                correct_results=stat.correct_results,
-                predictions_made=stat.predictions_made,
-                avg_points_per_game=stat.avg_points_per_game,
-                current_streak=stat.current_streak
-            ))
-    else:
-        # Main leaderboard - use stored positions
-        stats = query.join(User).order_by(
-            UserStats.position,  # Order by stored position
-            User.username  # Username as tiebreaker
-        ).offset(offset).limit(limit).all()
-        
-        # Build leaderboard using stored positions
-        leaderboard = []
-        for stat in stats:
-            user = stat.user
-            # Use stored position from database
-            position = stat.position if stat.position is not None else 999
-            
-            leaderboard.append(LeaderboardEntry(
-                position=position,
-                username=user.username,
-                avatar_url=user.avatar_url,
-                total_points=stat.total_points,
-                correct_scores=stat.correct_scores,
-                correct_results=stat.correct_results,
-                predictions_made=stat.predictions_made,
-                avg_points_per_game=stat.avg_points_per_game,
-                current_streak=stat.current_streak
-            ))
+    elif not mini_league_id:
+        # Archived seasons are served from their final standings snapshot
+        snapshot = get_season_snapshot(db, season_id)
+        if snapshot:
+            return snapshot_leaderboard(snapshot, offset, limit)
     
-    return leaderboard
+    return leaderboard_response(db.execute(leaderboard_query(season_id, mini_league_id, offset, limit)).all())
 
 @router.get("/count")
 def get_leaderboard_count(
@@ -117,29 +138,15 @@ def get_leaderboard_count(
     """Get total count of users in leaderboard"""
     # If no season specified, use current season
     if not season_id:
-        current_season = db.query(Season).filter(Season.is_current == True).first()
-        if not current_season:
+        season_id = db.scalar(current_season_id_query())
+        if not season_id:
             return {"count": 0}
-        season_id = current_season.id
-    
-    # Base query for user stats
-    query = db.query(UserStats).filter(UserStats.season_id == season_id)
-    
-    # If mini_league_id is provided, filter by league members
-    if mini_league_id:
-        from models.mini_leagues import MiniLeagueMember
-        
-        # Get member user IDs for this league
-        member_ids = db.query(MiniLeagueMember.user_id).filter(
-            MiniLeagueMember.mini_league_id == mini_league_id
-        ).subquery()
-        
-        # Filter stats to only league members
-        query = query.filter(UserStats.user_id.in_(member_ids))
-    
-    count = query.count()
+    elif not mini_league_id:
+        snapshot = get_season_snapshot(db, season_id)
+        if snapshot:
+            return {"count": len(snapshot["entries"])}
     
-    return {"count": count}
+    return {"count": db.scalar(leaderboard_count_query(season_id, mini_league_id))}
 
 @router.get("/user-position", response_model=LeaderboardEntry)
 def get_user_position(
@@ -150,38 +157,57 @@ def get_user_position(
     """Get current user's position in the leaderboard"""
     
     # Get current season
-    current_season = db.query(Season).filter(Season.is_current == True).first()
-    if not current_season:
+    season_id = db.scalar(current_season_id_query())
+    if not season_id:
         raise HTTPException(status_code=404, detail="No current season")
     
     # Get user's stats
-    user_stats = db.query(UserStats).filter(
-        UserStats.user_id == current_user.id,
-        UserStats.season_id == current_season.id
-    ).first()
-    
+    user_stats = db.scalar(user_stats_query(current_user.id, season_id))
     if not user_stats:
         raise HTTPException(status_code=404, detail="No stats found for user in current season")
     
-    # Determine position based on league
+    # Rank within the mini league, or use the stored position for the main leaderboard
     if mini_league_id:
-        # Calculate mini league position
-        mini_league_positions = update_mini_league_positions(db, mini_league_id)
-        position = mini_league_positions.get(current_user.id, 999)
+        position = db.scalar(league_position_query(mini_league_id, season_id, current_user.id))
     else:
-        # Use stored position for main leaderboard
-        position = user_stats.position if user_stats.position is not None else 999
+        position = user_stats.position
     
-    return LeaderboardEntry(
-        position=position,
-        username=current_user.username,
-        avatar_url=current_user.avatar_url,
-        total_points=user_stats.total_points,
-        correct_scores=user_stats.correct_scores,
-        correct_results=user_stats.correct_results,
-        predictions_made=user_stats.predictions_made,
-        avg_points_per_game=user_stats.avg_points_per_game,
-        current_streak=user_stats.current_streak
+    return leaderboard_entry(user_stats, current_user, position)
+
+@router.get("/live", response_model=LiveLeaderboard)
+def get_live_leaderboard(
+    limit: int = Query(default=50, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Provisional table as if the fixture in play finished with its current score"""
+    fixture, entries = live_table.get_table(db)
+    
+    if not fixture:
+        raise HTTPException(status_code=404, detail="No fixture in play")
+    
+    return LiveLeaderboard(
+        fixture_id=fixture["id"],
+        home_team=fixture["home_team"],
+        away_team=fixture["away_team"],
+        home_score=fixture["home_score"],
+        away_score=fixture["away_score"],
+        entries=[
+            LiveLeaderboardEntry(
+                position=entry["position"],
+                username=entry["username"],
+                avatar_url=entry["avatar_url"],
+                total_points=entry["total_points"],
+                correct_scores=entry["correct_scores"],
+                correct_results=entry["correct_results"],
+                predictions_made=entry["predictions_made"],
+                avg_points_per_game=entry["avg_points_per_game"],
+                current_streak=entry["current_streak"],
+                live_points=entry["live_points"],
+                previous_position=entry["previous_position"]
+            )
+            for entry in entries[offset:offset + limit]
+        ]
     )
 
 @router.get("/top", response_model=List[LeaderboardEntry])
@@ -191,37 +217,12 @@ def get_top_leaderboard(
 ):
     """Get top players for homepage display"""
     # Get current season
-    current_season = db.query(Season).filter(Season.is_current == True).first()
-    if not current_season:
+    season_id = db.scalar(current_season_id_query())
+    if not season_id:
         return []
     
     # Get top users using stored positions
-    stats = db.query(UserStats).filter(
-        UserStats.season_id == current_season.id,
-        UserStats.position <= limit  # Only get top N positions
-    ).join(User).order_by(
-        UserStats.position,
-        User.username
-    ).limit(limit).all()
-    
-    leaderboard = []
-    for stat in stats:
-        user = stat.user
-        position = stat.position if stat.position is not None else 999
-        
-        leaderboard.append(LeaderboardEntry(
-            position=position,
-            username=user.username,
-            avatar_url=user.avatar_url,
-            total_points=stat.total_points,
-            correct_scores=stat.correct_scores,
-            correct_results=stat.correct_results,
-            predictions_made=stat.predictions_made,
-            avg_points_per_game=stat.avg_points_per_game,
-            current_streak=stat.current_streak
-        ))
-    
-    return leaderboard
+    return leaderboard_response(db.execute(top_leaderboard_query(season_id, limit)).all())
 
 @router.get("/month", response_model=List[LeaderboardEntry])
 def get_monthly_leaderboard(
@@ -229,43 +230,12 @@ def get_monthly_leaderboard(
     db: Session = Depends(get_db)
 ):
     """Get top players for current month"""
-    from datetime import datetime
-    from sqlalchemy import extract
-    
     # Get current season
-    current_season = db.query(Season).filter(Season.is_current == True).first()
-    if not current_season:
+    season_id = db.scalar(current_season_id_query())
+    if not season_id:
         return []
     
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    
     # For monthly leaderboard, we need to calculate from predictions in current month
     # This is a simplified version - you might want to create a separate monthly stats table
     # For now, just return top players from main leaderboard
-    stats = db.query(UserStats).filter(
-        UserStats.season_id == current_season.id,
-        UserStats.position <= limit
-    ).join(User).order_by(
-        UserStats.position,
-        User.username
-    ).limit(limit).all()
-    
-    leaderboard = []
-    for stat in stats:
-        user = stat.user
-        position = stat.position if stat.position is not None else 999
-        
-        leaderboard.append(LeaderboardEntry(
-            position=position,
-            username=user.username,
-            avatar_url=user.avatar_url,
-            total_points=stat.total_points,
-            correct_scores=stat.correct_scores,
-            correct_results=stat.correct_results,
-            predictions_made=stat.predictions_made,
-            avg_points_per_game=stat.avg_points_per_game,
-            current_streak=stat.current_streak
-        ))
-    
-    return leaderboard
\ No newline at end of file
+    return leaderboard_response(db.execute(top_leaderboard_query(season_id, limit)).all())
@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from database.base import get_async_db
+from models.models import User
+from utils.auth import get_current_user_async
+from services.seasons import current_season_id_query
+from services.snapshots import get_season_snapshot
+from api.leaderboard import (
+    LeaderboardEntry, leaderboard_query, leaderboard_count_query, user_stats_query, league_position_query,
+    top_leaderboard_query, leaderboard_entry, leaderboard_response, snapshot_leaderboard
+)
+
+# Runs the queries built in api/leaderboard.py on the request's AsyncSession.
+# The live table is held in memory, so main.py serves /live from the sync router.
+router = APIRouter()
+
+@router.get("/", response_model=List[LeaderboardEntry])
+async def get_leaderboard(
+    season_id: int = Query(default=None),
+    mini_league_id: int = Query(default=None),
+    limit: int = Query(default=50, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # If no season specified, use current season
+    if not season_id:
+        season_id = await db.scalar(current_season_id_query())
+        if not season_id:
+            return []
+    elif not mini_league_id:
+        # Archived seasons are served from their final standings snapshot
+        snapshot = await db.run_sync(get_season_snapshot, season_id)
+        if snapshot:
+            return snapshot_leaderboard(snapshot, offset, limit)
+    
+    return leaderboard_response((await db.execute(leaderboard_query(season_id, mini_league_id, offset, limit))).all())
+
+@router.get("/count")
+async def get_leaderboard_count(
+    season_id: int = Query(default=None),
+    mini_league_id: int = Query(default=None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get total count of users in leaderboard"""
+    # If no season specified, use current season
+    if not season_id:
+        season_id = await db.scalar(current_season_id_query())
+        if not season_id:
+            return {"count": 0}
+    elif not mini_league_id:
+        snapshot = await db.run_sync(get_season_snapshot, season_id)
+        if snapshot:
+            return {"count": len(snapshot["entries"])}
+    
+    return {"count": await db.scalar(leaderboard_count_query(season_id, mini_league_id))}
+
+@router.get("/user-position", response_model=LeaderboardEntry)
+async def get_user_position(
+    mini_league_id: int = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Get current user's position in the leaderboard"""
+    
+    # Get current season
+    season_id = await db.scalar(current_season_id_query())
+    if not season_id:
+        raise HTTPException(status_code=404, detail="No current season")
+    
+    # Get user's stats
+    user_stats = await db.scalar(user_stats_query(current_user.id, season_id))
+    if not user_stats:
+        raise HTTPException(status_code=404, detail="No stats found for user in current season")
+    
+    # Rank within the mini league, or use the stored position for the main leaderboard
+    if mini_league_id:
+        position = await db.scalar(league_position_query(mini_league_id, season_id, current_user.id))
+    else:
+        position = user_stats.position
+    
+    return leaderboard_entry(user_stats, current_user, position)
+
+@router.get("/top", response_model=List[LeaderboardEntry])
+async def get_top_leaderboard(
+    limit: int = Query(default=5, le=10),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get top players for homepage display"""
+    # Get current season
+    season_id = await db.scalar(current_season_id_query())
+    if not season_id:
+        return []
+    
+    # Get top users using stored positions
+    return leaderboard_response((await db.execute(top_leaderboard_query(season_id, limit))).all())
+
+@router.get("/month", response_model=List[LeaderboardEntry])
+async def get_monthly_leaderboard(
+    limit: int = Query(default=5, le=10),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get top players for current month"""
+    # Get current season
+    season_id = await db.scalar(current_season_id_query())
+    if not season_id:
+        return []
+    
+    # For now, just return top players from main leaderboard (see api/leaderboard.py)
+    return leaderboard_response((await db.execute(top_leaderboard_query(season_id, limit))).all())
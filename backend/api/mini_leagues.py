@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from pydantic import BaseModel, Field
 from database.base import get_db
 from models.models import User, Season, UserStats
 from models.mini_leagues import MiniLeague, MiniLeagueMember
 from utils.auth import get_current_user
+from services.mini_leagues import MAX_LEAGUES_PER_USER, claim_league_slot, claim_member_slot, release_membership, release_league
+from utils.position_calculator import ranking_values, ranking_order, ranking_position
 import random
 import string
 
@@ -30,6 +33,7 @@ class MiniLeagueResponse(BaseModel):
     is_active: bool
     is_member: bool
     is_admin: bool
+    position: Optional[int] = None
 
 class MiniLeagueMemberResponse(BaseModel):
     user_id: int
@@ -41,6 +45,42 @@ class MiniLeagueMemberResponse(BaseModel):
     predictions_made: int
     position: int
 
+class MiniLeaguePositionResponse(BaseModel):
+    mini_league_id: int
+    name: str
+    position: int
+    member_count: int
+
+def member_ranking_columns():
+    """Ranking columns for league members, counting members without season stats as zero"""
+    return [func.coalesce(column, 0) for column in ranking_values(UserStats)]
+
+def current_league_standings(user_id: int):
+    """
+    Subquery with one row per member of every current-season league the user belongs to,
+    carrying the league's member count and the member's position within it
+    """
+    user_leagues = select(MiniLeagueMember.mini_league_id).where(MiniLeagueMember.user_id == user_id)
+    
+    return select(
+        MiniLeagueMember.mini_league_id,
+        MiniLeagueMember.user_id,
+        MiniLeagueMember.is_admin,
+        func.count().over(partition_by=MiniLeagueMember.mini_league_id).label("member_count"),
+        ranking_position(member_ranking_columns(), partition_by=MiniLeagueMember.mini_league_id).label("position")
+    ).select_from(MiniLeagueMember).join(
+        MiniLeague, MiniLeague.id == MiniLeagueMember.mini_league_id
+    ).join(
+        Season, and_(Season.id == MiniLeague.season_id, Season.is_current == True)
+    ).outerjoin(
+        UserStats, and_(
+            UserStats.user_id == MiniLeagueMember.user_id,
+            UserStats.season_id == MiniLeague.season_id
+        )
+    ).where(
+        MiniLeagueMember.mini_league_id.in_(user_leagues)
+    ).subquery()
+
 def generate_invite_code():
     """Generate a unique 8-character invite code using only letters"""
     return ''.join(random.choices(string.ascii_uppercase, k=8))
@@ -58,12 +98,9 @@ async def create_mini_league(
         raise HTTPException(status_code=400, detail="No active season")
     
     # Check if user has reached league limit (5 leagues)
-    user_league_count = db.query(MiniLeagueMember).filter(
-        MiniLeagueMember.user_id == current_user.id
-    ).count()
-    
-    if user_league_count >= 5:
-        raise HTTPException(status_code=400, detail="Maximum of 5 leagues per user")
+    if not claim_league_slot(db, current_user.id):
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Maximum of {MAX_LEAGUES_PER_USER} leagues per user")
     
     # Generate unique invite code
     invite_code = generate_invite_code()
@@ -78,6 +115,7 @@ async def create_mini_league(
         created_by=current_user.id,
         season_id=current_season.id,
         max_members=league_data.max_members,
+        member_count=1,
         is_active=True
     )
     db.add(mini_league)
@@ -125,40 +163,28 @@ async def join_mini_league(
     if not mini_league.is_active:
         raise HTTPException(status_code=400, detail="This league is no longer active")
     
-    # Check if already a member
-    existing_member = db.query(MiniLeagueMember).filter(
-        and_(
-            MiniLeagueMember.mini_league_id == mini_league.id,
-            MiniLeagueMember.user_id == current_user.id
-        )
-    ).first()
-    
-    if existing_member:
+    # Add user to league; the unique constraint rejects duplicate memberships
+    try:
+        db.add(MiniLeagueMember(
+            mini_league_id=mini_league.id,
+            user_id=current_user.id,
+            is_admin=False
+        ))
+        db.flush()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(status_code=400, detail="Already a member of this league")
     
-    # Check if league is full
-    member_count = db.query(MiniLeagueMember).filter(
-        MiniLeagueMember.mini_league_id == mini_league.id
-    ).count()
-    
-    if member_count >= mini_league.max_members:
+    # Conditional increments keep concurrent joins within the limits
+    member_count = claim_member_slot(db, mini_league.id)
+    if member_count is None:
+        db.rollback()
         raise HTTPException(status_code=400, detail="League is full")
     
-    # Check user's league limit
-    user_league_count = db.query(MiniLeagueMember).filter(
-        MiniLeagueMember.user_id == current_user.id
-    ).count()
+    if not claim_league_slot(db, current_user.id):
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Maximum of {MAX_LEAGUES_PER_USER} leagues per user")
     
-    if user_league_count >= 5:
-        raise HTTPException(status_code=400, detail="Maximum of 5 leagues per user")
-    
-    # Add user to league
-    member = MiniLeagueMember(
-        mini_league_id=mini_league.id,
-        user_id=current_user.id,
-        is_admin=False
-    )
-    db.add(member)
     db.commit()
     
     # Get creator username
@@ -172,7 +198,7 @@ async def join_mini_league(
         created_by=mini_league.created_by,
         creator_username=creator.username if creator else "Unknown",
         season_id=mini_league.season_id,
-        member_count=member_count + 1,
+        member_count=member_count,
         max_members=mini_league.max_members,
         is_active=mini_league.is_active,
         is_member=True,
@@ -185,48 +211,69 @@ async def get_my_leagues(
     current_user: User = Depends(get_current_user)
 ):
     """Get all leagues the current user is a member of"""
-    # Get current season
-    current_season = db.query(Season).filter(Season.is_current == True).first()
-    if not current_season:
-        return []
-    
-    # Get user's leagues
-    memberships = db.query(MiniLeagueMember).filter(
-        MiniLeagueMember.user_id == current_user.id
-    ).all()
-    
-    leagues = []
-    for membership in memberships:
-        league = membership.league
-        
-        # Skip if not current season
-        if league.season_id != current_season.id:
-            continue
-        
-        # Get member count
-        member_count = db.query(MiniLeagueMember).filter(
-            MiniLeagueMember.mini_league_id == league.id
-        ).count()
-        
-        # Get creator username
-        creator = db.query(User).filter(User.id == league.created_by).first()
-        
-        leagues.append(MiniLeagueResponse(
+    standings = current_league_standings(current_user.id)
+    
+    rows = db.query(
+        MiniLeague,
+        User.username.label("creator_username"),
+        standings.c.member_count,
+        standings.c.position,
+        standings.c.is_admin
+    ).join(
+        standings, standings.c.mini_league_id == MiniLeague.id
+    ).outerjoin(
+        User, User.id == MiniLeague.created_by
+    ).filter(
+        standings.c.user_id == current_user.id
+    ).order_by(MiniLeague.id).all()
+    
+    return [
+        MiniLeagueResponse(
             id=league.id,
             name=league.name,
             description=league.description,
             invite_code=league.invite_code,
             created_by=league.created_by,
-            creator_username=creator.username if creator else "Unknown",
+            creator_username=creator_username or "Unknown",
             season_id=league.season_id,
             member_count=member_count,
             max_members=league.max_members,
             is_active=league.is_active,
             is_member=True,
-            is_admin=membership.is_admin
-        ))
-    
-    return leagues
+            is_admin=is_admin,
+            position=position
+        )
+        for league, creator_username, member_count, position, is_admin in rows
+    ]
+
+@router.get("/my-positions", response_model=List[MiniLeaguePositionResponse])
+async def get_my_positions(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's position in every current-season league they belong to"""
+    standings = current_league_standings(current_user.id)
+    
+    rows = db.query(
+        standings.c.mini_league_id,
+        MiniLeague.name,
+        standings.c.position,
+        standings.c.member_count
+    ).join(
+        MiniLeague, MiniLeague.id == standings.c.mini_league_id
+    ).filter(
+        standings.c.user_id == current_user.id
+    ).order_by(standings.c.mini_league_id).all()
+    
+    return [
+        MiniLeaguePositionResponse(
+            mini_league_id=row.mini_league_id,
+            name=row.name,
+            position=row.position,
+            member_count=row.member_count
+        )
+        for row in rows
+    ]
 
 @router.get("/{league_id}/members", response_model=List[MiniLeagueMemberResponse])
 async def get_league_members(
@@ -240,62 +287,48 @@ async def get_league_members(
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     
-    # Check if user is a member
-    is_member = db.query(MiniLeagueMember).filter(
-        and_(
-            MiniLeagueMember.mini_league_id == league_id,
-            MiniLeagueMember.user_id == current_user.id
+    # Members, users and season stats in one query, ranked by the leaderboard rules
+    ranking_columns = member_ranking_columns()
+    members = db.query(
+        MiniLeagueMember.user_id,
+        MiniLeagueMember.is_admin,
+        MiniLeagueMember.joined_at,
+        User.username,
+        User.avatar_url,
+        func.coalesce(UserStats.total_points, 0).label("total_points"),
+        func.coalesce(UserStats.predictions_made, 0).label("predictions_made"),
+        ranking_position(ranking_columns).label("position")
+    ).join(
+        User, User.id == MiniLeagueMember.user_id
+    ).outerjoin(
+        UserStats, and_(
+            UserStats.user_id == MiniLeagueMember.user_id,
+            UserStats.season_id == league.season_id
         )
-    ).first()
-    
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Not a member of this league")
-    
-    # Get all members with stats
-    members = db.query(MiniLeagueMember).filter(
+    ).filter(
         MiniLeagueMember.mini_league_id == league_id
+    ).order_by(
+        *ranking_order(*ranking_columns),
+        User.username
     ).all()
     
-    member_stats = []
-    for member in members:
-        user = member.user
-        
-        # Get user stats for current season
-        user_stats = db.query(UserStats).filter(
-            and_(
-                UserStats.user_id == user.id,
-                UserStats.season_id == league.season_id
-            )
-        ).first()
-        
-        points = user_stats.total_points if user_stats else 0
-        predictions = user_stats.predictions_made if user_stats else 0
-        
-        member_stats.append({
-            'member': member,
-            'user': user,
-            'points': points,
-            'predictions': predictions
-        })
-    
-    # Sort by points (descending)
-    member_stats.sort(key=lambda x: x['points'], reverse=True)
-    
-    # Build response with positions
-    response = []
-    for position, stat in enumerate(member_stats, 1):
-        response.append(MiniLeagueMemberResponse(
-            user_id=stat['user'].id,
-            username=stat['user'].username,
-            avatar_url=stat['user'].avatar_url,
-            is_admin=stat['member'].is_admin,
-            joined_at=stat['member'].joined_at.isoformat(),
-            total_points=stat['points'],
-            predictions_made=stat['predictions'],
-            position=position
-        ))
+    # Check if user is a member
+    if not any(member.user_id == current_user.id for member in members):
+        raise HTTPException(status_code=403, detail="Not a member of this league")
     
-    return response
+    return [
+        MiniLeagueMemberResponse(
+            user_id=member.user_id,
+            username=member.username,
+            avatar_url=member.avatar_url,
+            is_admin=member.is_admin,
+            joined_at=member.joined_at.isoformat(),
+            total_points=member.total_points,
+            predictions_made=member.predictions_made,
+            position=member.position
+        )
+        for member in members
+    ]
 
 @router.delete("/{league_id}/leave")
 async def leave_league(
@@ -319,20 +352,18 @@ async def leave_league(
     league = db.query(MiniLeague).filter(MiniLeague.id == league_id).first()
     if league.created_by == current_user.id:
         # Check if there are other members
-        member_count = db.query(MiniLeagueMember).filter(
-            MiniLeagueMember.mini_league_id == league_id
-        ).count()
-        
-        if member_count > 1:
+        if league.member_count > 1:
             raise HTTPException(
                 status_code=400, 
                 detail="Creator cannot leave while other members exist. Transfer ownership or delete the league."
             )
         else:
             # Delete the league if creator is the only member
+            release_league(db, league.id)
             db.delete(league)
     else:
         # Just remove the membership
+        release_membership(db, league_id, current_user.id)
         db.delete(membership)
     
     db.commit()
@@ -353,6 +384,7 @@ async def delete_league(
     if league.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Only the creator can delete the league")
     
+    release_league(db, league.id)
     db.delete(league)
     db.commit()
     
@@ -1,14 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from datetime import datetime, timedelta
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import and_, select
+from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field, validator
 from database.base import get_db
-from models.models import Prediction, Fixture, User, FixtureStatus, Season, UserStats
+from models.models import Prediction, Fixture, User, FixtureStatus, UserStats
 from utils.auth import get_current_user
+from services.cold_storage import load_archived_fixture_predictions, archived_recent_points
+from services.seasons import current_season_id_query
+from api.fixtures import prediction_deadline, next_fixture_id_query, user_prediction_query
+import logging
 import pytz
 
+logger = logging.getLogger(__name__)
+
+# Response models and query builders are shared with api/predictions_async.py
 router = APIRouter()
 
 class PredictionCreate(BaseModel):
@@ -44,71 +51,59 @@ class PublicPrediction(BaseModel):
     away_prediction: int
     points_earned: Optional[int] = None  # Can be None for unscored fixtures
 
-@router.post("/", response_model=PredictionResponse)
-def create_or_update_prediction(
-    prediction_data: PredictionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    # Check if user's email is verified
-    if not current_user.email_verified:
+def my_predictions_query(user_id: int, season_id: int):
+    """Select a user's predictions for a season with their fixtures loaded, newest fixture first"""
+    return select(Prediction).join(
+        Fixture, Fixture.id == Prediction.fixture_id
+    ).options(
+        contains_eager(Prediction.fixture)
+    ).where(
+        Prediction.user_id == user_id,
+        Fixture.season_id == season_id
+    ).order_by(Fixture.kickoff_time.desc())
+
+def public_predictions_query(fixture_id: int):
+    return select(Prediction, User.username).join(
+        User, User.id == Prediction.user_id
+    ).where(Prediction.fixture_id == fixture_id)
+
+def check_email_verified(user: User):
+    if not user.email_verified:
         raise HTTPException(
             status_code=403, 
             detail="Please verify your email address before making predictions. Check your email for the verification link."
         )
-    
-    fixture = db.query(Fixture).filter(Fixture.id == prediction_data.fixture_id).first()
-    
+
+def check_prediction_open(fixture: Optional[Fixture], next_fixture_id: Optional[int], now: datetime):
+    """Raise unless predictions for the fixture are still open"""
     if not fixture:
         raise HTTPException(status_code=404, detail="Fixture not found")
     
-    now = datetime.now(pytz.UTC)
-    kickoff = fixture.kickoff_time
-    if kickoff.tzinfo is None:
-        kickoff = pytz.UTC.localize(kickoff)
-    deadline = kickoff - timedelta(minutes=5)
-    
-    if now >= deadline:
+    if now >= prediction_deadline(fixture):
         raise HTTPException(status_code=400, detail="Prediction deadline has passed")
     
     if fixture.status != FixtureStatus.SCHEDULED:
         raise HTTPException(status_code=400, detail="Cannot predict on this fixture")
     
-    next_fixture = db.query(Fixture).filter(
-        and_(
-            Fixture.status == FixtureStatus.SCHEDULED,
-            Fixture.kickoff_time > now
-        )
-    ).order_by(Fixture.kickoff_time).first()
-    
-    if fixture != next_fixture:
+    if fixture.id != next_fixture_id:
         raise HTTPException(status_code=400, detail="Can only predict the next upcoming fixture")
+
+def apply_prediction(existing: Optional[Prediction], prediction_data: PredictionCreate, user_id: int, now: datetime) -> Prediction:
+    """Update the existing prediction, or return a new one for the caller to add"""
+    if existing:
+        existing.home_prediction = prediction_data.home_prediction
+        existing.away_prediction = prediction_data.away_prediction
+        existing.updated_at = now
+        return existing
     
-    existing_prediction = db.query(Prediction).filter(
-        and_(
-            Prediction.user_id == current_user.id,
-            Prediction.fixture_id == prediction_data.fixture_id
-        )
-    ).first()
-    
-    if existing_prediction:
-        existing_prediction.home_prediction = prediction_data.home_prediction
-        existing_prediction.away_prediction = prediction_data.away_prediction
-        existing_prediction.updated_at = now
-        db.commit()
-        db.refresh(existing_prediction)
-        prediction = existing_prediction
-    else:
-        prediction = Prediction(
-            user_id=current_user.id,
-            fixture_id=prediction_data.fixture_id,
-            home_prediction=prediction_data.home_prediction,
-            away_prediction=prediction_data.away_prediction
-        )
-        db.add(prediction)
-        db.commit()
-        db.refresh(prediction)
-    
+    return Prediction(
+        user_id=user_id,
+        fixture_id=prediction_data.fixture_id,
+        home_prediction=prediction_data.home_prediction,
+        away_prediction=prediction_data.away_prediction
+    )
+
+def prediction_response(prediction: Prediction, fixture: Fixture) -> PredictionResponse:
     return PredictionResponse(
         id=prediction.id,
         fixture_id=prediction.fixture_id,
@@ -124,98 +119,85 @@ def create_or_update_prediction(
         fixture_away_score=fixture.away_score
     )
 
+def my_predictions_response(predictions) -> List[PredictionResponse]:
+    logger.info(f"Found {len(predictions)} predictions for user")
+    
+    response = []
+    for pred in predictions:
+        if not pred.fixture:
+            logger.error(f"Prediction {pred.id} has no fixture loaded!")
+            continue
+        response.append(prediction_response(pred, pred.fixture))
+    
+    logger.info(f"Returning {len(response)} predictions")
+    return response
+
+def public_predictions_response(rows) -> List[PublicPrediction]:
+    """Build the public list from (prediction, username) pairs"""
+    return [
+        PublicPrediction(
+            username=username,
+            home_prediction=pred.home_prediction,
+            away_prediction=pred.away_prediction,
+            points_earned=pred.points_earned
+        )
+        for pred, username in rows
+    ]
+
+@router.post("/", response_model=PredictionResponse)
+def create_or_update_prediction(
+    prediction_data: PredictionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    check_email_verified(current_user)
+    
+    now = datetime.now(pytz.UTC)
+    fixture = db.get(Fixture, prediction_data.fixture_id)
+    check_prediction_open(fixture, db.scalar(next_fixture_id_query(now)) if fixture else None, now)
+    
+    existing_prediction = db.scalar(user_prediction_query(current_user.id, fixture.id))
+    prediction = apply_prediction(existing_prediction, prediction_data, current_user.id, now)
+    if not existing_prediction:
+        db.add(prediction)
+    db.commit()
+    db.refresh(prediction)
+    
+    return prediction_response(prediction, fixture)
+
 @router.get("/my", response_model=List[PredictionResponse])
 def get_my_predictions(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    import logging
-    logger = logging.getLogger(__name__)
+    logger.info(f"Getting predictions for user: {current_user.username} (id: {current_user.id})")
     
-    try:
-        logger.info(f"Getting predictions for user: {current_user.username} (id: {current_user.id})")
-        
-        # Get current season
-        current_season = db.query(Season).filter(Season.is_current == True).first()
-        if not current_season:
-            logger.warning("No current season found")
-            return []
-        
-        logger.info(f"Current season: {current_season.id}")
-        
-        # Only get predictions for the current season
-        # Use options to eagerly load the fixture relationship
-        from sqlalchemy.orm import joinedload
-        
-        predictions = db.query(Prediction).options(
-            joinedload(Prediction.fixture)
-        ).filter(
-            Prediction.user_id == current_user.id
-        ).join(Fixture).filter(
-            Fixture.season_id == current_season.id
-        ).order_by(Fixture.kickoff_time.desc()).all()
-        
-        logger.info(f"Found {len(predictions)} predictions for user")
-        
-        response = []
-        for pred in predictions:
-            try:
-                logger.debug(f"Processing prediction {pred.id} for fixture {pred.fixture_id}")
-                
-                if not pred.fixture:
-                    logger.error(f"Prediction {pred.id} has no fixture loaded!")
-                    continue
-                    
-                response.append(PredictionResponse(
-                    id=pred.id,
-                    fixture_id=pred.fixture_id,
-                    home_prediction=pred.home_prediction,
-                    away_prediction=pred.away_prediction,
-                    points_earned=pred.points_earned,
-                    created_at=pred.created_at,
-                    updated_at=pred.updated_at,
-                    fixture_home_team=pred.fixture.home_team,
-                    fixture_away_team=pred.fixture.away_team,
-                    fixture_kickoff=pred.fixture.kickoff_time,
-                    fixture_home_score=pred.fixture.home_score,
-                    fixture_away_score=pred.fixture.away_score
-                ))
-            except Exception as e:
-                logger.error(f"Error processing prediction {pred.id}: {str(e)}")
-                raise
-        
-        logger.info(f"Returning {len(response)} predictions")
-        return response
-        
-    except Exception as e:
-        logger.error(f"Error in get_my_predictions: {str(e)}", exc_info=True)
-        raise
+    # Only get predictions for the current season
+    season_id = db.scalar(current_season_id_query())
+    if not season_id:
+        logger.warning("No current season found")
+        return []
+    
+    return my_predictions_response(db.scalars(my_predictions_query(current_user.id, season_id)).all())
 
 @router.get("/fixture/{fixture_id}", response_model=List[PublicPrediction])
 def get_fixture_predictions(
     fixture_id: int,
     db: Session = Depends(get_db)
 ):
-    fixture = db.query(Fixture).filter(Fixture.id == fixture_id).first()
+    fixture = db.get(Fixture, fixture_id)
     
     if not fixture:
         raise HTTPException(status_code=404, detail="Fixture not found")
     
     # No deadline check - predictions are viewable once match appears in results
-    predictions = db.query(Prediction).filter(
-        Prediction.fixture_id == fixture_id
-    ).join(User).all()
-    
-    response = []
-    for pred in predictions:
-        response.append(PublicPrediction(
-            username=pred.user.username,
-            home_prediction=pred.home_prediction,
-            away_prediction=pred.away_prediction,
-            points_earned=pred.points_earned
-        ))
+    archived_predictions = load_archived_fixture_predictions(db, fixture)
+    if archived_predictions is not None:
+        rows = [(pred, pred.user.username) for pred in archived_predictions]
+    else:
+        rows = db.execute(public_predictions_query(fixture_id)).all()
     
-    return response
+    return public_predictions_response(rows)
 
 @router.get("/fixture/{fixture_id}/detailed")
 def get_fixture_predictions_detailed(
@@ -234,76 +216,102 @@ def get_fixture_predictions_detailed(
     if not fixture:
         raise HTTPException(status_code=404, detail="Fixture not found")
     
-    # Get current season
-    current_season = db.query(Season).filter(Season.is_current == True).first()
-    if not current_season:
-        raise HTTPException(status_code=404, detail="No current season")
+    # Positions, points and form are those of the fixture's own season
+    season_id = fixture.season_id
     
-    # Build query for predictions
-    query = db.query(Prediction).filter(
-        Prediction.fixture_id == fixture_id
-    )
+    archived_predictions = load_archived_fixture_predictions(db, fixture)
     
-    # Filter by mini league if specified
-    if mini_league_id:
-        # Get members of the mini league
-        member_ids = db.query(MiniLeagueMember.user_id).filter(
-            MiniLeagueMember.mini_league_id == mini_league_id
-        ).subquery()
+    if archived_predictions is not None:
+        # Archived season - predictions come from cold storage
+        if mini_league_id:
+            member_ids = {
+                user_id for (user_id,) in db.query(MiniLeagueMember.user_id).filter(
+                    MiniLeagueMember.mini_league_id == mini_league_id
+                ).all()
+            }
+            archived_predictions = [p for p in archived_predictions if p.user_id in member_ids]
         
-        query = query.filter(Prediction.user_id.in_(member_ids))
-    
-    # Get total count for pagination
-    total_count = query.count()
-    
-    # Calculate overall statistics from ALL predictions (not just current page)
-    from sqlalchemy import func
-    overall_stats = db.query(
-        func.avg(Prediction.home_prediction).label('avg_home'),
-        func.avg(Prediction.away_prediction).label('avg_away'),
-        func.count(Prediction.id).label('total_predictions')
-    ).filter(Prediction.fixture_id == fixture_id)
-    
-    # Apply mini league filter to stats if needed
-    if mini_league_id:
-        member_ids = db.query(MiniLeagueMember.user_id).filter(
-            MiniLeagueMember.mini_league_id == mini_league_id
-        ).subquery()
-        overall_stats = overall_stats.filter(Prediction.user_id.in_(member_ids))
-    
-    stats_result = overall_stats.first()
-    avg_home_prediction = float(stats_result.avg_home) if stats_result.avg_home else 0.0
-    avg_away_prediction = float(stats_result.avg_away) if stats_result.avg_away else 0.0
-    
-    # Apply ordering and pagination for the actual predictions list
-    # If fixture is completed, order by points earned (highest first)
-    # Otherwise, order by most recent activity
-    from sqlalchemy import case, desc
-    
-    if fixture.status == FixtureStatus.FINISHED:
-        # For completed fixtures, order by points earned (descending)
-        # Handle NULL points_earned (treat as 0)
-        # Then by username for stable ordering when points are tied
-        from sqlalchemy import func
-        predictions = query.join(User, Prediction.user_id == User.id).order_by(
-            desc(func.coalesce(Prediction.points_earned, 0)),
-            User.username
-        ).limit(limit).offset(offset).all()
+        total_count = len(archived_predictions)
+        avg_home_prediction = (
+            sum(p.home_prediction for p in archived_predictions) / total_count if total_count else 0.0
+        )
+        avg_away_prediction = (
+            sum(p.away_prediction for p in archived_predictions) / total_count if total_count else 0.0
+        )
+        
+        archived_predictions.sort(key=lambda p: (-(p.points_earned or 0), p.user.username))
+        predictions = archived_predictions[offset:offset + limit]
     else:
-        # For upcoming/live fixtures, order by most recent activity
-        predictions = query.order_by(
-            desc(case(
-                (Prediction.updated_at.isnot(None), Prediction.updated_at),
-                else_=Prediction.created_at
-            ))
-        ).limit(limit).offset(offset).all()
+        # Build query for predictions
+        query = db.query(Prediction).filter(
+            Prediction.fixture_id == fixture_id
+        )
+        
+        # Filter by mini league if specified
+        if mini_league_id:
+            # Get members of the mini league
+            member_ids = db.query(MiniLeagueMember.user_id).filter(
+                MiniLeagueMember.mini_league_id == mini_league_id
+            ).subquery()
+        
+            query = query.filter(Prediction.user_id.in_(member_ids))
+        
+        # Get total count for pagination
+        total_count = query.count()
+        
+        # Calculate overall statistics from ALL predictions (not just current page)
+        from sqlalchemy import func
+        overall_stats = db.query(
+            func.avg(Prediction.home_prediction).label('avg_home'),
+            func.avg(Prediction.away_prediction).label('avg_away'),
+            func.count(Prediction.id).label('total_predictions')
+        ).filter(Prediction.fixture_id == fixture_id)
+        
+        # Apply mini league filter to stats if needed
+        if mini_league_id:
+            member_ids = db.query(MiniLeagueMember.user_id).filter(
+                MiniLeagueMember.mini_league_id == mini_league_id
+            ).subquery()
+            overall_stats = overall_stats.filter(Prediction.user_id.in_(member_ids))
+        
+        stats_result = overall_stats.first()
+        avg_home_prediction = float(stats_result.avg_home) if stats_result.avg_home else 0.0
+        avg_away_prediction = float(stats_result.avg_away) if stats_result.avg_away else 0.0
+        
+        # Apply ordering and pagination for the actual predictions list
+        # If fixture is completed, order by points earned (highest first)
+        # Otherwise, order by most recent activity
+        from sqlalchemy import case, desc
+        
+        if fixture.status == FixtureStatus.FINISHED:
+            # For completed fixtures, order by points earned (descending)
+            # Handle NULL points_earned (treat as 0)
+            # Then by username for stable ordering when points are tied
+            from sqlalchemy import func
+            predictions = query.join(User, Prediction.user_id == User.id).order_by(
+                desc(func.coalesce(Prediction.points_earned, 0)),
+                User.username
+            ).limit(limit).offset(offset).all()
+        else:
+            # For upcoming/live fixtures, order by most recent activity
+            predictions = query.order_by(
+                desc(case(
+                    (Prediction.updated_at.isnot(None), Prediction.updated_at),
+                    else_=Prediction.created_at
+                ))
+            ).limit(limit).offset(offset).all()
+    
+    # An archived season's form comes from its cold storage blob
+    archived_form = None
+    if archived_predictions is not None:
+        archived_form = archived_recent_points(db, season_id, [pred.user_id for pred in predictions])
     
     response = []
     for pred in predictions:
-        # Get user's current position in leaderboard
+        # Get user's position in the season's leaderboard
         user_stats = db.query(UserStats).filter(
             UserStats.user_id == pred.user_id,
-            UserStats.season_id == current_season.id
+            UserStats.season_id == season_id
         ).first()
         
         user_position = None
@@ -314,7 +322,7 @@ def get_fixture_predictions_detailed(
             # Calculate position
             # If viewing a mini league, calculate position within that league
             position_query = db.query(UserStats).filter(
-                UserStats.season_id == current_season.id,
+                UserStats.season_id == season_id,
                 UserStats.predictions_made > 0,
                 or_(
                     UserStats.total_points > user_stats.total_points,
@@ -338,17 +346,21 @@ def get_fixture_predictions_detailed(
             user_avg_points = user_stats.avg_points_per_game
         
         # Get user's last 5 predictions for form
-        recent_preds = db.query(Prediction).join(Fixture).filter(
-            Prediction.user_id == pred.user_id,
-            Fixture.status == FixtureStatus.FINISHED,
-            Fixture.season_id == current_season.id
-        ).order_by(desc(Fixture.kickoff_time)).limit(5).all()
+        if archived_form is not None:
+            recent_points = archived_form[pred.user_id]
+        else:
+            recent_preds = db.query(Prediction).join(Fixture).filter(
+                Prediction.user_id == pred.user_id,
+                Fixture.status == FixtureStatus.FINISHED,
+                Fixture.season_id == season_id
+            ).order_by(desc(Fixture.kickoff_time)).limit(5).all()
+            recent_points = [rp.points_earned for rp in reversed(recent_preds)]
         
         user_form = ""
-        for rp in reversed(recent_preds):
-            if rp.points_earned == 3:
+        for points_earned in recent_points:
+            if points_earned == 3:
                 user_form += "W"
-            elif rp.points_earned == 1:
+            elif points_earned == 1:
                 user_form += "D"
             else:
                 user_form += "L"
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import List
+from database.base import get_async_db
+from models.models import Fixture, User
+from utils.auth import get_current_user_async
+from services.cold_storage import load_archived_fixture_predictions
+from services.seasons import current_season_id_query
+from api.fixtures import next_fixture_id_query, user_prediction_query
+from api.predictions import (
+    PredictionCreate, PredictionResponse, PublicPrediction, my_predictions_query, public_predictions_query,
+    check_email_verified, check_prediction_open, apply_prediction, prediction_response,
+    my_predictions_response, public_predictions_response, logger
+)
+import pytz
+
+# Runs the queries built in api/predictions.py on the request's AsyncSession.
+# The detailed predictions view is not ported; main.py serves it from the sync router.
+router = APIRouter()
+
+@router.post("/", response_model=PredictionResponse)
+async def create_or_update_prediction(
+    prediction_data: PredictionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    check_email_verified(current_user)
+    
+    now = datetime.now(pytz.UTC)
+    fixture = await db.get(Fixture, prediction_data.fixture_id)
+    check_prediction_open(fixture, await db.scalar(next_fixture_id_query(now)) if fixture else None, now)
+    
+    existing_prediction = await db.scalar(user_prediction_query(current_user.id, fixture.id))
+    prediction = apply_prediction(existing_prediction, prediction_data, current_user.id, now)
+    if not existing_prediction:
+        db.add(prediction)
+    await db.commit()
+    await db.refresh(prediction)
+    
+    return prediction_response(prediction, fixture)
+
+@router.get("/my", response_model=List[PredictionResponse])
+async def get_my_predictions(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    logger.info(f"Getting predictions for user: {current_user.username} (id: {current_user.id})")
+    
+    # Only get predictions for the current season
+    season_id = await db.scalar(current_season_id_query())
+    if not season_id:
+        logger.warning("No current season found")
+        return []
+    
+    return my_predictions_response((await db.scalars(my_predictions_query(current_user.id, season_id))).all())
+
+@router.get("/fixture/{fixture_id}", response_model=List[PublicPrediction])
+async def get_fixture_predictions(
+    fixture_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    fixture = await db.get(Fixture, fixture_id)
+    
+    if not fixture:
+        raise HTTPException(status_code=404, detail="Fixture not found")
+    
+    # No deadline check - predictions are viewable once match appears in results
+    archived_predictions = await db.run_sync(load_archived_fixture_predictions, fixture)
+    if archived_predictions is not None:
+        rows = [(pred, pred.user.username) for pred in archived_predictions]
+    else:
+        rows = (await db.execute(public_predictions_query(fixture_id))).all()
+    
+    return public_predictions_response(rows)
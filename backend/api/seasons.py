@@ -8,6 +8,11 @@ from database.base import get_db
 from models.models import Season, SeasonStatus, Fixture, UserStats, Prediction, User
 from utils.auth import get_current_user
 from utils.admin_auth import get_admin_user
+from services.seasons import provision_season_stats, invalidate_current_season
+from services.fixture_import import import_fixtures
+from services.snapshots import create_season_snapshot, discard_season_snapshot
+from services.cold_storage import is_season_archived
+from services.statistics import invalidate_admin_stats, get_seasons_with_counts, freeze_season_counts, unfreeze_season_counts
 
 router = APIRouter()
 
@@ -33,66 +38,46 @@ class SeasonResponse(BaseModel):
     prediction_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime]
+    user_stats_created: Optional[int] = None
+
+def season_response(season: Season, counts: dict) -> SeasonResponse:
+    return SeasonResponse(
+        id=season.id,
+        name=season.name,
+        start_date=season.start_date,
+        end_date=season.end_date,
+        status=season.status,
+        is_current=season.is_current,
+        fixture_count=counts["fixture_count"],
+        user_count=counts["user_count"],
+        prediction_count=counts["prediction_count"],
+        created_at=season.created_at,
+        updated_at=season.updated_at
+    )
+
+def get_season_counts(db: Session, season: Season) -> dict:
+    return get_seasons_with_counts(db, Season.id == season.id)[0][1]
 
 @router.get("/", response_model=List[SeasonResponse])
 async def get_all_seasons(db: Session = Depends(get_db)):
     """Get all seasons with basic statistics"""
-    seasons = db.query(Season).order_by(Season.start_date.desc()).all()
-    
-    response = []
-    for season in seasons:
-        fixture_count = db.query(Fixture).filter(Fixture.season_id == season.id).count()
-        user_count = db.query(UserStats).filter(UserStats.season_id == season.id).count()
-        prediction_count = db.query(Prediction).join(Fixture).filter(
-            Fixture.season_id == season.id
-        ).count()
-        
-        response.append(SeasonResponse(
-            id=season.id,
-            name=season.name,
-            start_date=season.start_date,
-            end_date=season.end_date,
-            status=season.status,
-            is_current=season.is_current,
-            fixture_count=fixture_count,
-            user_count=user_count,
-            prediction_count=prediction_count,
-            created_at=season.created_at,
-            updated_at=season.updated_at
-        ))
-    
-    return response
+    return [
+        season_response(season, counts)
+        for season, counts in get_seasons_with_counts(db)
+    ]
 
 @router.get("/current", response_model=SeasonResponse)
 async def get_current_season(db: Session = Depends(get_db)):
     """Get the current active season"""
-    season = db.query(Season).filter(Season.is_current == True).first()
+    seasons = get_seasons_with_counts(db, Season.is_current == True)
     
-    if not season:
+    if not seasons:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No current season found"
         )
     
-    fixture_count = db.query(Fixture).filter(Fixture.season_id == season.id).count()
-    user_count = db.query(UserStats).filter(UserStats.season_id == season.id).count()
-    prediction_count = db.query(Prediction).join(Fixture).filter(
-        Fixture.season_id == season.id
-    ).count()
-    
-    return SeasonResponse(
-        id=season.id,
-        name=season.name,
-        start_date=season.start_date,
-        end_date=season.end_date,
-        status=season.status,
-        is_current=season.is_current,
-        fixture_count=fixture_count,
-        user_count=user_count,
-        prediction_count=prediction_count,
-        created_at=season.created_at,
-        updated_at=season.updated_at
-    )
+    return season_response(*seasons[0])
 
 @router.post("/", response_model=SeasonResponse)
 async def create_season(
@@ -151,6 +136,13 @@ async def activate_season(
             detail="Season not found"
         )
     
+    # Its predictions have left the live table, so scores and stats could not be recalculated
+    if is_season_archived(db, season.id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This season's predictions are in cold storage, so it cannot be reactivated"
+        )
+    
     # Allow reactivating archived seasons for testing
     # In production, you might want to keep this restriction
     # if season.status == SeasonStatus.ARCHIVED:
@@ -161,60 +153,37 @@ async def activate_season(
     
     # Deactivate current season
     current = db.query(Season).filter(Season.is_current == True).first()
+    archived_season = None
     if current and current.id != season_id:
         current.is_current = False
         current.status = SeasonStatus.ARCHIVED
+        freeze_season_counts(db, current)
+        archived_season = current
+    
+    # Reactivated seasons can change again, so drop their final snapshot
+    if season.status == SeasonStatus.ARCHIVED:
+        discard_season_snapshot(db, season.id)
     
     # Activate new season
     season.is_current = True
     season.status = SeasonStatus.ACTIVE
+    unfreeze_season_counts(season)
     season.updated_at = datetime.now(timezone.utc)
     
     # Create UserStats for all existing users for the new season
-    existing_users = db.query(User).all()
-    for user in existing_users:
-        # Check if UserStats already exists for this user/season
-        existing_stats = db.query(UserStats).filter(
-            UserStats.user_id == user.id,
-            UserStats.season_id == season.id
-        ).first()
-        
-        if not existing_stats:
-            new_stats = UserStats(
-                user_id=user.id,
-                season_id=season.id,
-                total_points=0,
-                correct_scores=0,
-                correct_results=0,
-                predictions_made=0,
-                current_streak=0,
-                best_streak=0,
-                avg_points_per_game=0.0
-            )
-            db.add(new_stats)
+    stats_created = provision_season_stats(db, season.id)
     
     db.commit()
-    db.refresh(season)
+    invalidate_current_season()
     
-    fixture_count = db.query(Fixture).filter(Fixture.season_id == season.id).count()
-    user_count = db.query(UserStats).filter(UserStats.season_id == season.id).count()
-    prediction_count = db.query(Prediction).join(Fixture).filter(
-        Fixture.season_id == season.id
-    ).count()
+    if archived_season:
+        create_season_snapshot(db, archived_season)
     
-    return SeasonResponse(
-        id=season.id,
-        name=season.name,
-        start_date=season.start_date,
-        end_date=season.end_date,
-        status=season.status,
-        is_current=season.is_current,
-        fixture_count=fixture_count,
-        user_count=user_count,
-        prediction_count=prediction_count,
-        created_at=season.created_at,
-        updated_at=season.updated_at
-    )
+    db.refresh(season)
+    
+    response = season_response(season, get_season_counts(db, season))
+    response.user_stats_created = stats_created
+    return response
 
 @router.put("/{season_id}/archive", response_model=SeasonResponse)
 async def archive_season(
@@ -239,29 +208,16 @@ async def archive_season(
     
     season.status = SeasonStatus.ARCHIVED
     season.updated_at = datetime.now(timezone.utc)
+    freeze_season_counts(db, season)
     
     db.commit()
-    db.refresh(season)
     
-    fixture_count = db.query(Fixture).filter(Fixture.season_id == season.id).count()
-    user_count = db.query(UserStats).filter(UserStats.season_id == season.id).count()
-    prediction_count = db.query(Prediction).join(Fixture).filter(
-        Fixture.season_id == season.id
-    ).count()
+    # Final standings never change again, store them once
+    create_season_snapshot(db, season)
     
-    return SeasonResponse(
-        id=season.id,
-        name=season.name,
-        start_date=season.start_date,
-        end_date=season.end_date,
-        status=season.status,
-        is_current=season.is_current,
-        fixture_count=fixture_count,
-        user_count=user_count,
-        prediction_count=prediction_count,
-        created_at=season.created_at,
-        updated_at=season.updated_at
-    )
+    db.refresh(season)
+    
+    return season_response(season, get_season_counts(db, season))
 
 @router.delete("/{season_id}")
 async def delete_season(
@@ -330,22 +286,22 @@ async def clone_fixtures_from_season(
         )
     
     # Clone fixtures with updated dates
-    cloned_count = 0
-    for fixture in source_fixtures:
-        new_fixture = Fixture(
-            season_id=season_id,
-            home_team=fixture.home_team,
-            away_team=fixture.away_team,
-            competition=fixture.competition,
-            kickoff_time=fixture.kickoff_time.replace(year=int(target_season.name[:4])),
-            original_kickoff_time=fixture.original_kickoff_time.replace(year=int(target_season.name[:4])),
-            status=fixture.status,
-            round=fixture.round
-        )
-        db.add(new_fixture)
-        cloned_count += 1
+    target_year = int(target_season.name[:4])
+    cloned_count = import_fixtures(db, season_id, (
+        {
+            "home_team": fixture.home_team,
+            "away_team": fixture.away_team,
+            "competition": fixture.competition,
+            "kickoff_time": fixture.kickoff_time.replace(year=target_year),
+            "original_kickoff_time": fixture.original_kickoff_time.replace(year=target_year),
+            "status": fixture.status,
+            "round": fixture.round
+        }
+        for fixture in source_fixtures
+    ))
     
     db.commit()
+    invalidate_admin_stats()
     
     return {
         "message": f"Successfully cloned {cloned_count} fixtures from {source_season.name} to {target_season.name}"
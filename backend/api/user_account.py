@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from database.base import get_db
 from models.models import User, Prediction, UserStats, Notification
 from models.mini_leagues import MiniLeague, MiniLeagueMember
-from utils.auth import get_current_user
+from utils.auth import get_current_user, invalidate_cached_user, verify_password_async
+from services.mini_leagues import release_user_memberships
 from pydantic import BaseModel
 from typing import Optional
 
@@ -41,6 +42,10 @@ async def delete_user_account(
             detail="Please type 'DELETE' to confirm account deletion"
         )
     
+    # The authenticated user may come from the principal cache; check against the stored row
+    db.refresh(current_user)
+    user_id = current_user.id
+    
     # For email/password users, verify password
     if current_user.provider == "email" and current_user.password_hash:
         if not request.password:
@@ -49,10 +54,7 @@ async def delete_user_account(
                 detail="Password required for account deletion"
             )
         
-        from passlib.context import CryptContext
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        
-        if not pwd_context.verify(request.password, current_user.password_hash):
+        if not await verify_password_async(request.password, current_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password"
@@ -92,6 +94,7 @@ async def delete_user_account(
             MiniLeagueMember.user_id == current_user.id
         ).all()
         deleted_counts["mini_league_memberships"] = len(memberships)
+        release_user_memberships(db, current_user.id)
         for membership in memberships:
             db.delete(membership)
         
@@ -125,6 +128,7 @@ async def delete_user_account(
         
         # Commit all changes
         db.commit()
+        invalidate_cached_user(user_id)
         
         return DeleteAccountResponse(
             message="Your account and all associated data has been permanently deleted",
@@ -179,14 +183,10 @@ async def preview_account_deletion(
     
     mini_leagues_created = []
     for league in created_leagues:
-        member_count = db.query(MiniLeagueMember).filter(
-            MiniLeagueMember.mini_league_id == league.id
-        ).count()
-        
         mini_leagues_created.append({
             "name": league.name,
-            "member_count": member_count,
-            "will_be_deleted": member_count <= 1  # Will be deleted if user is only member
+            "member_count": league.member_count,
+            "will_be_deleted": league.member_count <= 1  # Will be deleted if user is only member
         })
     
     return {
@@ -5,7 +5,7 @@ from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional
 from database.base import get_db
 from models.models import User, UserStats
-from utils.auth import get_current_user, verify_password, get_password_hash
+from utils.auth import get_current_user, verify_password, get_password_hash, invalidate_cached_user
 
 router = APIRouter()
 
@@ -204,6 +204,7 @@ def update_profile(
         current_user.twitter_handle = update_data.twitter_handle if update_data.twitter_handle else None
     
     db.commit()
+    invalidate_cached_user(current_user.id)
     db.refresh(current_user)
     
     # Get updated profile
@@ -250,6 +251,8 @@ def change_password(
     current_user: User = Depends(get_current_user)
 ):
     """Change current user's password"""
+    # The authenticated user may come from the principal cache; check against the stored hash
+    db.refresh(current_user)
     
     # Users who signed up with social auth don't have passwords
     if not current_user.password_hash:
@@ -265,6 +268,7 @@ def change_password(
     # Update password
     current_user.password_hash = get_password_hash(password_data.new_password)
     db.commit()
+    invalidate_cached_user(current_user.id)
     
     return {"message": "Password updated successfully"}
 
@@ -1,17 +1,36 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from pydantic_settings import BaseSettings
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def async_database_url(url: str) -> str:
+    """Swap a database URL's driver for its asyncio counterpart (asyncpg / aiosqlite)"""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
 class Settings(BaseSettings):
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./predictionleague.db")
+    # Serve fixtures, predictions and leaderboard from the AsyncSession routers (api/*_async.py)
+    USE_ASYNC_DB: bool = os.getenv("USE_ASYNC_DB", "false").lower() == "true"
+    # Defaults to DATABASE_URL with an async driver
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
     SECRET_KEY: str = os.getenv("SECRET_KEY", "change-this-in-production")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080
+    # Per-process, so a deleted or changed user can stay cached on other workers for this long
+    AUTH_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_CACHE_TTL_SECONDS", "10"))
+    AUTH_CACHE_MAX_SIZE: int = int(os.getenv("AUTH_CACHE_MAX_SIZE", "4096"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
 
 settings = Settings()
 
@@ -26,6 +45,15 @@ else:
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for routers that take an AsyncSession, only built when USE_ASYNC_DB is on.
+# Objects stay usable after commit because lazy refreshes aren't possible outside the
+# session's greenlet
+async_engine = None
+AsyncSessionLocal = None
+if settings.USE_ASYNC_DB:
+    async_engine = create_async_engine(settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -33,4 +61,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("The async database engine is disabled; set USE_ASYNC_DB=true to use it")
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -1,10 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 import logging
-from database.base import engine, Base
+from database.base import engine, async_engine, Base, settings
+from services.http_client import http_client
+from utils.rate_limiter import RateLimitMiddleware
 from api import auth_v2 as auth, auth_twitter, fixtures, predictions, admin, users, leaderboard, seasons, mini_leagues, user_account
+
+if settings.USE_ASYNC_DB:
+    # Opt-in AsyncSession versions of the hot read paths, served at the same URLs
+    from api import fixtures_async, predictions_async, leaderboard_async
 import os
 from dotenv import load_dotenv
 
@@ -19,7 +25,11 @@ logging.basicConfig(
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    http_client.start()
     yield
+    await http_client.close()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(
     title="Coventry City Tweet League API",
@@ -37,20 +47,40 @@ allowed_origins = [
 if os.getenv("FRONTEND_URL"):
     allowed_origins.append(os.getenv("FRONTEND_URL"))
 
+# Added before CORS so rejections still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset", "RateLimit-Policy", "Retry-After"],
 )
 
+def with_async_port(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """The async router's routes, followed by the sync routes it does not port"""
+    ported = {(route.path, method) for route in async_router.routes for method in route.methods}
+    router = APIRouter()
+    router.routes = list(async_router.routes) + [
+        route for route in sync_router.routes
+        if not any((route.path, method) in ported for method in route.methods)
+    ]
+    return router
+
+fixtures_router, predictions_router, leaderboard_router = fixtures.router, predictions.router, leaderboard.router
+if settings.USE_ASYNC_DB:
+    fixtures_router = with_async_port(fixtures.router, fixtures_async.router)
+    predictions_router = with_async_port(predictions.router, predictions_async.router)
+    leaderboard_router = with_async_port(leaderboard.router, leaderboard_async.router)
+
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(auth_twitter.router, prefix="/api/auth/twitter", tags=["auth-twitter"])
-app.include_router(fixtures.router, prefix="/api/fixtures", tags=["fixtures"])
-app.include_router(predictions.router, prefix="/api/predictions", tags=["predictions"])
+app.include_router(fixtures_router, prefix="/api/fixtures", tags=["fixtures"])
+app.include_router(predictions_router, prefix="/api/predictions", tags=["predictions"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
-app.include_router(leaderboard.router, prefix="/api/leaderboard", tags=["leaderboard"])
+app.include_router(leaderboard_router, prefix="/api/leaderboard", tags=["leaderboard"])
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 app.include_router(seasons.router, prefix="/api/seasons", tags=["seasons"])
 app.include_router(mini_leagues.router, prefix="/api/mini-leagues", tags=["mini-leagues"])
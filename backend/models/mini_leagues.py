@@ -13,6 +13,7 @@ class MiniLeague(Base):
     created_by = Column(Integer, ForeignKey("users.id"))
     season_id = Column(Integer, ForeignKey("seasons.id"))
     max_members = Column(Integer, default=50)
+    member_count = Column(Integer, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -30,6 +31,7 @@ class MiniLeagueMember(Base):
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
     is_admin = Column(Boolean, default=False)
+    position = Column(Integer, nullable=True)  # Standing within the league, refreshed after scoring
     
     # Relationships
     league = relationship("MiniLeague", back_populates="members")
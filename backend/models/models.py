@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, Enum as SQLEnum, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, LargeBinary, JSON, Index, Enum as SQLEnum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database.base import Base
@@ -36,6 +36,7 @@ class User(Base):
     is_admin = Column(Boolean, default=False)
     email_verified = Column(Boolean, default=False)
     email_notifications = Column(Boolean, default=True)
+    league_count = Column(Integer, nullable=False, default=0, server_default="0")  # Mini league memberships
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -52,6 +53,10 @@ class Season(Base):
     end_date = Column(DateTime(timezone=True), nullable=False)
     status = Column(SQLEnum(SeasonStatus), default=SeasonStatus.DRAFT)
     is_current = Column(Boolean, default=False)
+    # Counts are frozen when a season is archived; NULL means count live
+    fixture_count = Column(Integer, nullable=True)
+    user_count = Column(Integer, nullable=True)
+    prediction_count = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -117,6 +122,27 @@ class UserStats(Base):
     user = relationship("User", back_populates="stats")
     season = relationship("Season", back_populates="user_stats")
 
+class SeasonSnapshot(Base):
+    __tablename__ = "season_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    season_id = Column(Integer, ForeignKey("seasons.id"), unique=True, nullable=False)
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed JSON final table
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    season = relationship("Season")
+
+class SeasonPredictionArchive(Base):
+    __tablename__ = "season_prediction_archives"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    season_id = Column(Integer, ForeignKey("seasons.id"), unique=True, nullable=False)
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed columnar predictions file
+    rows = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    season = relationship("Season")
+
 class Notification(Base):
     __tablename__ = "notifications"
     
@@ -128,7 +154,20 @@ class Notification(Base):
     sent = Column(Boolean, default=False)
     sent_at = Column(DateTime(timezone=True), nullable=True)
     scheduled_for = Column(DateTime(timezone=True), nullable=True)
+    payload = Column(JSON, nullable=True)  # Arguments for the email template named by type
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="notifications")
-    fixture = relationship("Fixture")
\ No newline at end of file
+    fixture = relationship("Fixture")
+    
+    __table_args__ = (
+        # The email worker only ever scans unsent rows
+        Index('ix_notifications_pending', 'scheduled_for', postgresql_where=(sent == False), sqlite_where=(sent == False)),
+        # At most one reminder per user per fixture, however often the scheduler runs
+        Index(
+            'uq_notifications_fixture_reminder', 'user_id', 'fixture_id', unique=True,
+            postgresql_where=(type == 'fixture_reminder'), sqlite_where=(type == 'fixture_reminder')
+        ),
+    )
\ No newline at end of file
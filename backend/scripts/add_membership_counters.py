@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the denormalised mini league membership counters
+(mini_leagues.member_count and users.league_count) and backfill them
+from mini_league_members. Safe to re-run; the backfill recounts from scratch.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from database.base import settings
+
+def migrate_database():
+    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {})
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    try:
+        for table, column in (("mini_leagues", "member_count"), ("users", "league_count")):
+            try:
+                with session.begin_nested():
+                    session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+                print(f"Added {column} column to {table} table")
+            except Exception:
+                print(f"{column} column already exists in {table} table")
+
+        leagues = session.execute(text("""
+            UPDATE mini_leagues SET member_count = (
+                SELECT COUNT(*) FROM mini_league_members
+                WHERE mini_league_members.mini_league_id = mini_leagues.id
+            )
+        """)).rowcount
+        print(f"Backfilled member_count for {leagues} mini leagues")
+
+        users = session.execute(text("""
+            UPDATE users SET league_count = (
+                SELECT COUNT(*) FROM mini_league_members
+                WHERE mini_league_members.user_id = users.id
+            )
+        """)).rowcount
+        print(f"Backfilled league_count for {users} users")
+
+        session.commit()
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        session.rollback()
+        print(f"Error during migration: {e}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    migrate_database()
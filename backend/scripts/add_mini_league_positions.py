@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the stored position column to mini league members
+and calculate positions for the current season's leagues
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from database.base import settings
+from utils.position_calculator import update_all_mini_league_positions
+
+def migrate_database():
+    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {})
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    try:
+        try:
+            with session.begin_nested():
+                session.execute(text("ALTER TABLE mini_league_members ADD COLUMN position INTEGER"))
+            print("Added position column to mini_league_members table")
+        except Exception:
+            print("position column already exists in mini_league_members table")
+        session.commit()
+
+        positions = update_all_mini_league_positions(session)
+        print(f"Calculated positions for {len(positions)} mini leagues")
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        session.rollback()
+        print(f"Error during migration: {e}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the email queue columns (payload, attempts, last_error),
+the pending-row index and the one-reminder-per-fixture index to notifications
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from database.base import settings
+
+def migrate_database():
+    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {})
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    try:
+        columns = (
+            ("payload", "JSON"),
+            ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+            ("last_error", "VARCHAR"),
+        )
+        for column, definition in columns:
+            try:
+                with session.begin_nested():
+                    session.execute(text(f"ALTER TABLE notifications ADD COLUMN {column} {definition}"))
+                print(f"Added {column} column to notifications table")
+            except Exception:
+                print(f"{column} column already exists in notifications table")
+
+        session.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_notifications_pending ON notifications (scheduled_for) WHERE sent = false"
+        ))
+        print("Created ix_notifications_pending index")
+
+        session.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_notifications_fixture_reminder "
+            "ON notifications (user_id, fixture_id) WHERE type = 'fixture_reminder'"
+        ))
+        print("Created uq_notifications_fixture_reminder index")
+
+        session.commit()
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        session.rollback()
+        print(f"Error during migration: {e}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    migrate_database()
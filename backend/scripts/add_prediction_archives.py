@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the season_prediction_archives table and import any
+cold storage files written to COLD_STORAGE_DIR by earlier versions, which kept
+archived predictions on local disk
+"""
+import sys
+import os
+import zlib
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database.base import settings
+from models.models import SeasonPredictionArchive, Season
+from services.cold_storage import ArchivedSeasonPredictions
+
+COLD_STORAGE_DIR = os.getenv("COLD_STORAGE_DIR", "./cold_storage")
+
+def migrate_database():
+    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {})
+    SeasonPredictionArchive.__table__.create(bind=engine, checkfirst=True)
+    print("season_prediction_archives table is present")
+
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    try:
+        names = sorted(os.listdir(COLD_STORAGE_DIR)) if os.path.isdir(COLD_STORAGE_DIR) else []
+        imported = 0
+        for name in names:
+            if not (name.startswith("season_") and name.endswith("_predictions.bin")):
+                continue
+
+            with open(os.path.join(COLD_STORAGE_DIR, name), "rb") as f:
+                data = f.read()
+            store = ArchivedSeasonPredictions(data)
+            season_id = store.header["season_id"]
+
+            if session.query(SeasonPredictionArchive.id).filter(SeasonPredictionArchive.season_id == season_id).first():
+                print(f"Season {season_id} is already archived in the database, skipping {name}")
+                continue
+            if not session.query(Season.id).filter(Season.id == season_id).first():
+                print(f"Season {season_id} no longer exists, skipping {name}")
+                continue
+
+            session.add(SeasonPredictionArchive(season_id=season_id, payload=zlib.compress(data), rows=store.rows))
+            session.commit()
+            imported += 1
+            print(f"Imported {store.rows} archived predictions for season {season_id} from {name}")
+
+        print(f"Imported {imported} cold storage files")
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        session.rollback()
+        print(f"Error during migration: {e}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    migrate_database()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Migration script to add frozen fixture/user/prediction counters to seasons
+and populate them for seasons that are already archived. Seasons whose predictions
+are already in cold storage take their prediction count from the archive, so this
+can run before or after scripts/archive_season_predictions.py
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from database.base import settings
+from models.models import Season, SeasonStatus
+from services.statistics import freeze_season_counts
+
+def migrate_database():
+    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {})
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    try:
+        for column in ("fixture_count", "user_count", "prediction_count"):
+            try:
+                with session.begin_nested():
+                    session.execute(text(f"ALTER TABLE seasons ADD COLUMN {column} INTEGER"))
+                print(f"Added {column} column to seasons table")
+            except Exception:
+                print(f"{column} column already exists in seasons table")
+
+        archived = session.query(Season).filter(Season.status == SeasonStatus.ARCHIVED).all()
+        for season in archived:
+            freeze_season_counts(session, season)
+            print(f"Froze counts for {season.name}: {season.fixture_count} fixtures, "
+                  f"{season.user_count} users, {season.prediction_count} predictions")
+
+        session.commit()
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        session.rollback()
+        print(f"Error during migration: {e}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    migrate_database()
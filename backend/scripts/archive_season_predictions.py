@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Move an archived season's predictions out of the predictions table into cold storage
+Usage: python archive_season_predictions.py <season_name>
+   or: python archive_season_predictions.py --list
+
+The predictions are stored as one compressed blob in season_prediction_archives
+and deleted from the predictions table in the same transaction. Prediction
+endpoints for the season keep working and read from the blob instead.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.base import SessionLocal
+from models.models import Season, SeasonStatus
+from services.cold_storage import archive_season_predictions, archived_season_ids
+
+def archive_season(season_name: str):
+    db = SessionLocal()
+
+    try:
+        season = db.query(Season).filter(Season.name == season_name).first()
+
+        if not season:
+            print(f"❌ Season not found: {season_name}")
+            return False
+
+        if season.status != SeasonStatus.ARCHIVED:
+            print(f"❌ Season {season.name} is {season.status.value}; only archived seasons can be moved to cold storage")
+            return False
+
+        moved = archive_season_predictions(db, season)
+        print(f"✅ Moved {moved} predictions for {season.name} to cold storage")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+def list_seasons():
+    db = SessionLocal()
+
+    try:
+        cold_ids = set(archived_season_ids(db))
+        print("\n📋 Seasons:")
+        print("-" * 50)
+        for season in db.query(Season).order_by(Season.start_date).all():
+            storage = "cold storage" if season.id in cold_ids else "live table"
+            print(f"{season.name:12s} | {season.status.value:8s} | {storage}")
+        print("-" * 50)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python archive_season_predictions.py <season_name>")
+        print("   or: python archive_season_predictions.py --list")
+        sys.exit(1)
+
+    if sys.argv[1] == "--list":
+        list_seasons()
+    else:
+        success = archive_season(sys.argv[1])
+        sys.exit(0 if success else 1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Backfill api_fixture_id for existing fixtures so the fixture imports match them
+Usage: python backfill_fixture_import_keys.py [--dry-run]
+
+Fixtures without an api_fixture_id, or with one derived by an earlier version of
+fixture_import_key, get the current key. Without this, re-running an upload over
+a season adds keyed copies of fixtures that already have predictions attached.
+Ids that came from an external API are left alone.
+
+Where several fixtures map to one key (duplicates added by earlier imports), the
+one with the most predictions gets it and the rest are listed for an admin to
+merge or delete.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import defaultdict
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from database.base import settings
+from models.models import Fixture, Prediction
+from services.fixture_import import fixture_import_key
+
+def is_derived_key(fixture: Fixture) -> bool:
+    return fixture.api_fixture_id is None or fixture.api_fixture_id.startswith(f"{fixture.season_id}:")
+
+def backfill(dry_run: bool = False):
+    engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {})
+    Session = sessionmaker(bind=engine)
+    session = Session()
+
+    try:
+        prediction_counts = dict(
+            session.query(Prediction.fixture_id, func.count(Prediction.id)).group_by(Prediction.fixture_id).all()
+        )
+
+        groups = defaultdict(list)
+        for fixture in session.query(Fixture).order_by(Fixture.id).all():
+            if not is_derived_key(fixture):
+                continue
+            key = fixture_import_key(fixture.season_id, {
+                "competition": fixture.competition,
+                "round": fixture.round,
+                "home_team": fixture.home_team,
+                "away_team": fixture.away_team,
+                "kickoff_time": fixture.kickoff_time
+            })
+            groups[key].append(fixture)
+
+        updated = 0
+        duplicates = 0
+        for key, fixtures in groups.items():
+            # Most predictions first, then the oldest row
+            keeper = max(fixtures, key=lambda fixture: (prediction_counts.get(fixture.id, 0), -fixture.id))
+
+            if len(fixtures) > 1:
+                duplicates += 1
+                print(f"⚠️  {len(fixtures)} fixtures share key {key}; keeping fixture {keeper.id}")
+                for fixture in fixtures:
+                    print(f"     id {fixture.id}: kickoff {fixture.kickoff_time}, {prediction_counts.get(fixture.id, 0)} predictions")
+
+            if keeper.api_fixture_id == key:
+                continue
+
+            # A cup tie's old key can equal its new one, so free it before reassigning
+            for fixture in fixtures:
+                if fixture is not keeper and fixture.api_fixture_id == key:
+                    fixture.api_fixture_id = None
+            session.flush()
+
+            print(f"Fixture {keeper.id} ({keeper.home_team} vs {keeper.away_team}): {keeper.api_fixture_id} -> {key}")
+            keeper.api_fixture_id = key
+            session.flush()
+            updated += 1
+
+        if dry_run:
+            session.rollback()
+            print(f"\nDry run: would update {updated} fixtures ({duplicates} duplicate keys)")
+        else:
+            session.commit()
+            print(f"\nUpdated {updated} fixtures ({duplicates} duplicate keys)")
+
+    except Exception as e:
+        session.rollback()
+        print(f"Error during backfill: {e}")
+        raise
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    backfill(dry_run="--dry-run" in sys.argv[1:])
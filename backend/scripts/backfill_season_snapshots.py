@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Write final standings snapshots for seasons that were archived before
+snapshots existed, so their leaderboards are served from the snapshot too
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from database.base import SessionLocal
+from models.models import Season, SeasonStatus, SeasonSnapshot
+from services.snapshots import create_season_snapshot
+
+def backfill():
+    db = SessionLocal()
+
+    try:
+        seasons = db.query(Season).filter(
+            Season.status == SeasonStatus.ARCHIVED,
+            ~Season.id.in_(select(SeasonSnapshot.season_id))
+        ).order_by(Season.start_date).all()
+
+        if not seasons:
+            print("Every archived season already has a snapshot")
+            return
+
+        for season in seasons:
+            snapshot = create_season_snapshot(db, season)
+            print(f"✅ Snapshot for {season.name}: {len(snapshot['entries'])} users")
+
+        print(f"\nWrote {len(seasons)} snapshots")
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill()
@@ -27,9 +27,10 @@ if not DATABASE_URL:
 
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
-from models.models import User, Prediction, Fixture
+from models.models import User, Fixture
 from datetime import datetime
 from utils.email import email_service
+from services.notifications import has_not_predicted, fixture_reminder_details
 
 # Always send reminders to these emails (admin/test accounts)
 ALWAYS_NOTIFY_EMAILS = [
@@ -71,25 +72,14 @@ def find_non_predictors(fixture_id, send_reminders=False):
         print(f"   Kickoff: {fixture.kickoff_time.strftime('%B %d, %Y at %H:%M')}")
         print(f"   Status: {fixture.status}")
         
-        # Get all users
-        all_users = db.query(User).all()
-        
-        # Get users who HAVE made predictions for this fixture
-        users_with_predictions = db.query(Prediction.user_id).filter(
-            Prediction.fixture_id == fixture_id
-        ).distinct().all()
-        users_with_predictions_ids = [u[0] for u in users_with_predictions]
-        
-        # Find users who haven't predicted
-        non_predictors = []
-        for user in all_users:
-            if user.id not in users_with_predictions_ids:
-                non_predictors.append(user)
+        # Find users who haven't predicted with a single anti-join
+        total_users = db.query(User).count()
+        non_predictors = db.query(User).filter(has_not_predicted(fixture_id)).all()
         
         # Display results
         print(f"\n📊 Statistics:")
-        print(f"   Total users: {len(all_users)}")
-        print(f"   Users who predicted: {len(users_with_predictions_ids)}")
+        print(f"   Total users: {total_users}")
+        print(f"   Users who predicted: {total_users - len(non_predictors)}")
         print(f"   Users who haven't predicted: {len(non_predictors)}")
         
         if non_predictors:
@@ -174,18 +164,7 @@ def send_email_reminders(email_users, fixture, db):
     print("\n📤 Sending reminder emails...")
     print("-" * 40)
     
-    # Format competition type for display
-    competition_display = fixture.competition.value.replace('_', ' ').title() if hasattr(fixture.competition, 'value') else str(fixture.competition)
-    
-    fixture_details = {
-        'home_team': fixture.home_team,
-        'away_team': fixture.away_team,
-        'competition': competition_display,
-        'kickoff_time': fixture.kickoff_time.strftime('%B %d, %Y at %H:%M')
-    }
-    
-    sent_count = 0
-    failed_count = 0
+    fixture_details = fixture_reminder_details(fixture)
     
     # First, add the hardcoded admin emails
     all_email_users = list(email_users)
@@ -210,28 +189,24 @@ def send_email_reminders(email_users, fixture, db):
                 all_email_users.append(temp_user)
                 print(f"   📌 Adding admin email: {admin_email}")
     
-    for user in all_email_users:
+    # Render every reminder up front, then send them over a few reused SMTP connections
+    reminders = [
+        email_service.fixture_reminder_email(
+            to_email=user.email,
+            username=user.username,
+            fixture_details=fixture_details
+        )
+        for user in all_email_users
         # Skip Twitter-only users
-        if user.email.endswith('@twitter.local'):
-            continue
-        
-        try:
-            success = email_service.send_fixture_reminder_email(
-                to_email=user.email,
-                username=user.username,
-                fixture_details=fixture_details
-            )
-            
-            if success:
-                print(f"   ✅ Sent to {user.email} ({user.username})")
-                sent_count += 1
-            else:
-                print(f"   ❌ Failed to send to {user.email} ({user.username})")
-                failed_count += 1
-                
-        except Exception as e:
-            print(f"   ❌ Error sending to {user.email}: {str(e)}")
-            failed_count += 1
+        if not user.email.endswith('@twitter.local')
+    ]
+    
+    result = email_service.send_bulk(reminders)
+    sent_count = result.sent
+    failed_count = len(result.failed)
+    
+    for index, error in result.failed.items():
+        print(f"   ❌ Failed to send to {reminders[index].to_email}: {error}")
     
     print("\n📊 Email Summary:")
     print(f"   Sent successfully: {sent_count}")
@@ -5,7 +5,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from datetime import datetime
 import pytz
 from database.base import SessionLocal, engine, Base
-from models.models import Fixture, FixtureStatus, CompetitionType
+from models.models import Season, CompetitionType
+from services.fixture_import import import_fixtures as upsert_fixtures
 
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
@@ -168,34 +169,21 @@ def import_fixtures():
     db = SessionLocal()
     
     try:
-        for fixture_data in FIXTURES:
-            # Check if fixture already exists
-            existing = db.query(Fixture).filter(
-                Fixture.home_team == fixture_data["home_team"],
-                Fixture.away_team == fixture_data["away_team"],
-                Fixture.kickoff_time == fixture_data["kickoff_time"]
-            ).first()
+        imported = 0
+        for season_name in sorted({fixture_data["season"] for fixture_data in FIXTURES}):
+            season = db.query(Season).filter(Season.name == season_name).first()
             
-            if existing:
-                print(f"Fixture already exists: {fixture_data['home_team']} vs {fixture_data['away_team']}")
+            if not season:
+                print(f"Season not found: {season_name}. Create it before importing fixtures.")
                 continue
             
-            fixture = Fixture(
-                home_team=fixture_data["home_team"],
-                away_team=fixture_data["away_team"],
-                competition=fixture_data["competition"],
-                kickoff_time=fixture_data["kickoff_time"],
-                original_kickoff_time=fixture_data["kickoff_time"],
-                status=FixtureStatus.SCHEDULED,
-                season=fixture_data["season"],
-                round=fixture_data.get("round")
-            )
-            
-            db.add(fixture)
-            print(f"Added fixture: {fixture_data['home_team']} vs {fixture_data['away_team']} on {fixture_data['kickoff_time']}")
+            # Upserts keyed on api_fixture_id, so re-running the import is safe
+            imported += upsert_fixtures(db, season.id, (
+                fixture_data for fixture_data in FIXTURES if fixture_data["season"] == season_name
+            ))
         
         db.commit()
-        print(f"\nSuccessfully imported {len(FIXTURES)} fixtures!")
+        print(f"\nSuccessfully imported {imported} fixtures!")
         
     except Exception as e:
         print(f"Error importing fixtures: {e}")
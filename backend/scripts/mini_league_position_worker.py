@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Mini league position worker: every MINI_LEAGUE_POSITION_INTERVAL_SECONDS recalculates
+the stored position of every member of the current season's mini leagues. Scoring
+already refreshes them and the leaderboard ranks leagues live, so this is a backstop
+for large seasons: set MINI_LEAGUE_POSITION_WORKERS to rank leagues across a process
+pool. Use --once to recalculate and exit (e.g. from a cron job, or by hand after
+correcting scores).
+"""
+import sys
+import os
+import time
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.base import SessionLocal
+from utils.position_calculator import update_all_mini_league_positions
+
+MINI_LEAGUE_POSITION_INTERVAL_SECONDS = float(os.getenv("MINI_LEAGUE_POSITION_INTERVAL_SECONDS", "60"))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("mini_league_position_worker")
+
+def run(once: bool = False):
+    logger.info("Mini league position worker started")
+    while True:
+        db = SessionLocal()
+        try:
+            update_all_mini_league_positions(db)
+        except Exception:
+            logger.exception("Mini league position update failed")
+            db.rollback()
+        finally:
+            db.close()
+
+        if once:
+            break
+        time.sleep(MINI_LEAGUE_POSITION_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    run(once="--once" in sys.argv)
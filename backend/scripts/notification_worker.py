@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Email queue worker: sends due rows from the notifications table, and every
+FIXTURE_REMINDER_INTERVAL_SECONDS queues prediction reminders for upcoming
+fixtures. Run one or more alongside the web service; claims use SKIP LOCKED
+so workers never send the same row, and reminders are unique per user and
+fixture. Use --once to queue reminders, drain the queue and exit (e.g. from a
+cron job).
+"""
+import sys
+import os
+import time
+import logging
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.base import SessionLocal
+from services.notifications import process_notification_batch, enqueue_fixture_reminders
+
+NOTIFICATION_POLL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", "5"))
+FIXTURE_REMINDER_INTERVAL_SECONDS = float(os.getenv("FIXTURE_REMINDER_INTERVAL_SECONDS", "300"))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("notification_worker")
+
+def run(once: bool = False):
+    logger.info("Notification worker started")
+    next_reminder_run = 0.0
+    while True:
+        db = SessionLocal()
+        try:
+            if time.monotonic() >= next_reminder_run:
+                next_reminder_run = time.monotonic() + FIXTURE_REMINDER_INTERVAL_SECONDS
+                queued = enqueue_fixture_reminders(db)
+                if queued:
+                    logger.info(f"Queued {queued} fixture reminders")
+
+            claimed = process_notification_batch(db)
+        except Exception:
+            logger.exception("Notification batch failed")
+            db.rollback()
+            claimed = 0
+        finally:
+            db.close()
+
+        if claimed == 0:
+            if once:
+                break
+            time.sleep(NOTIFICATION_POLL_SECONDS)
+
+if __name__ == "__main__":
+    run(once="--once" in sys.argv)
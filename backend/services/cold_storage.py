@@ -0,0 +1,293 @@
+"""
+Cold storage for the predictions of archived seasons.
+
+An archived season's predictions are exported to a single columnar blob of
+fixed-width arrays (one contiguous block per column, rows sorted by fixture),
+stored zlib-compressed in season_prediction_archives, and deleted from the
+live predictions table in the same transaction. Every instance therefore sees
+the same archive, and nothing depends on local disk.
+
+Readers decompress a season's blob and view the column blocks in place, so a
+fixture's predictions are found by binary search without building rows for the
+whole season. Each worker keeps only the COLD_STORAGE_CACHE_SIZE most recently
+read seasons, for up to COLD_STORAGE_CACHE_TTL_SECONDS.
+
+Blob layout:
+    MAGIC | uint32 header length | JSON header | padding | column blocks (8-byte aligned)
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from datetime import datetime, timezone
+from array import array
+from models.models import Prediction, Fixture, FixtureStatus, Season, SeasonStatus, SeasonPredictionArchive, User
+from utils.cache import TTLCache
+import bisect
+import json
+import math
+import os
+import struct
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+COLD_STORAGE_CACHE_SIZE = int(os.getenv("COLD_STORAGE_CACHE_SIZE", "2"))
+COLD_STORAGE_CACHE_TTL_SECONDS = int(os.getenv("COLD_STORAGE_CACHE_TTL_SECONDS", "900"))
+
+MAGIC = b"TLPRED1\n"
+NO_POINTS = -1
+
+# (column, array typecode); fixture_id first because rows are sorted by it
+COLUMNS = (
+    ("fixture_id", "i"),
+    ("id", "q"),
+    ("user_id", "i"),
+    ("home_prediction", "b"),
+    ("away_prediction", "b"),
+    ("points_earned", "b"),
+    ("created_at", "d"),
+    ("updated_at", "d"),
+)
+
+class ArchivedPrediction:
+    """Read-only stand-in for a Prediction row loaded from cold storage"""
+    __slots__ = (
+        "id", "user_id", "fixture_id", "home_prediction", "away_prediction",
+        "points_earned", "created_at", "updated_at", "user"
+    )
+
+    def __init__(self, **values):
+        self.user = None
+        for name, value in values.items():
+            setattr(self, name, value)
+
+class ArchivedSeasonPredictions:
+    """Read-only view over one season's decompressed predictions blob"""
+    def __init__(self, data: bytes):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a cold storage predictions blob")
+
+        (header_length,) = struct.unpack_from("<I", data, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(data[header_start:header_start + header_length])
+        self.rows = self.header["rows"]
+
+        view = memoryview(data)
+        self.columns = {}
+        for column in self.header["columns"]:
+            size = array(column["format"]).itemsize * self.rows
+            self.columns[column["name"]] = view[column["offset"]:column["offset"] + size].cast(column["format"])
+
+    def count_for_fixture(self, fixture_id: int) -> int:
+        fixture_ids = self.columns["fixture_id"]
+        return bisect.bisect_right(fixture_ids, fixture_id) - bisect.bisect_left(fixture_ids, fixture_id)
+
+    def fixture_counts(self) -> dict:
+        """Number of archived predictions per fixture"""
+        counts = {}
+        for fixture_id in self.columns["fixture_id"]:
+            counts[fixture_id] = counts.get(fixture_id, 0) + 1
+        return counts
+
+    def for_fixture(self, fixture_id: int):
+        """Return the archived predictions for a fixture"""
+        fixture_ids = self.columns["fixture_id"]
+        start = bisect.bisect_left(fixture_ids, fixture_id)
+        end = bisect.bisect_right(fixture_ids, fixture_id, lo=start)
+        return [self._row(index) for index in range(start, end)]
+
+    def points_by_user(self, user_ids) -> dict:
+        """Map each given user id to {fixture_id: points_earned} over the whole season"""
+        c = self.columns
+        points = {}
+        for index, user_id in enumerate(c["user_id"]):
+            if user_id in user_ids:
+                earned = c["points_earned"][index]
+                points.setdefault(user_id, {})[c["fixture_id"][index]] = None if earned == NO_POINTS else earned
+        return points
+
+    def _row(self, index: int) -> ArchivedPrediction:
+        c = self.columns
+        points = c["points_earned"][index]
+        return ArchivedPrediction(
+            id=c["id"][index],
+            user_id=c["user_id"][index],
+            fixture_id=c["fixture_id"][index],
+            home_prediction=c["home_prediction"][index],
+            away_prediction=c["away_prediction"][index],
+            points_earned=None if points == NO_POINTS else points,
+            created_at=_from_timestamp(c["created_at"][index]),
+            updated_at=_from_timestamp(c["updated_at"][index])
+        )
+
+# Archives never change once written; the bound keeps a worker from holding every season
+_stores = TTLCache(ttl_seconds=COLD_STORAGE_CACHE_TTL_SECONDS, max_size=COLD_STORAGE_CACHE_SIZE)
+
+def archived_season_ids(db: Session):
+    """Season ids whose predictions have been moved to cold storage"""
+    return [season_id for (season_id,) in db.query(SeasonPredictionArchive.season_id).all()]
+
+def is_season_archived(db: Session, season_id: int) -> bool:
+    if _stores.get(season_id) is not None:
+        return True
+    return db.query(SeasonPredictionArchive.id).filter(SeasonPredictionArchive.season_id == season_id).first() is not None
+
+def get_archived_predictions(db: Session, season_id: int):
+    """Return the store for a season, or None if its predictions are still in the live table"""
+    store = _stores.get(season_id)
+    if store is not None:
+        return store
+
+    # Not cached negatively: a season archived by another instance must show up at once
+    row = db.query(SeasonPredictionArchive.payload).filter(SeasonPredictionArchive.season_id == season_id).first()
+    if not row:
+        return None
+
+    store = ArchivedSeasonPredictions(zlib.decompress(row.payload))
+    _stores.set(season_id, store)
+    return store
+
+def load_archived_fixture_predictions(db: Session, fixture: Fixture):
+    """
+    Return a fixture's predictions from cold storage with .user populated, or None
+    if the fixture's season has not been moved to cold storage. Predictions of
+    users who have since deleted their account are left out.
+    """
+    store = get_archived_predictions(db, fixture.season_id)
+    if store is None:
+        return None
+
+    predictions = store.for_fixture(fixture.id)
+    if not predictions:
+        return []
+
+    users = {
+        user.id: user
+        for user in db.query(User).filter(User.id.in_({p.user_id for p in predictions})).all()
+    }
+
+    archived = []
+    for prediction in predictions:
+        prediction.user = users.get(prediction.user_id)
+        if prediction.user:
+            archived.append(prediction)
+    return archived
+
+def archived_recent_points(db: Session, season_id: int, user_ids, limit: int = 5):
+    """
+    Return user_id -> points of each user's last `limit` finished predictions in an
+    archived season, oldest first, or None if the season is not in cold storage
+    """
+    store = get_archived_predictions(db, season_id)
+    if store is None:
+        return None
+
+    finished = [
+        fixture_id for (fixture_id,) in db.query(Fixture.id).filter(
+            Fixture.season_id == season_id,
+            Fixture.status == FixtureStatus.FINISHED
+        ).order_by(Fixture.kickoff_time.desc()).all()
+    ]
+    points = store.points_by_user(set(user_ids))
+
+    recent = {}
+    for user_id in user_ids:
+        user_points = points.get(user_id, {})
+        latest = [user_points[fixture_id] for fixture_id in finished if fixture_id in user_points][:limit]
+        recent[user_id] = list(reversed(latest))
+    return recent
+
+def archive_season_predictions(db: Session, season: Season) -> int:
+    """
+    Move an archived season's predictions to cold storage: the blob is stored and
+    the rows deleted from the predictions table in one transaction. Returns the
+    number of predictions moved.
+    """
+    if season.status != SeasonStatus.ARCHIVED:
+        raise ValueError(f"Season {season.name} is not archived")
+
+    if is_season_archived(db, season.id):
+        raise ValueError(f"Predictions for season {season.name} are already in cold storage")
+
+    fixture_ids = select(Fixture.id).where(Fixture.season_id == season.id)
+    rows = db.query(
+        Prediction.fixture_id,
+        Prediction.id,
+        Prediction.user_id,
+        Prediction.home_prediction,
+        Prediction.away_prediction,
+        Prediction.points_earned,
+        Prediction.created_at,
+        Prediction.updated_at
+    ).filter(
+        Prediction.fixture_id.in_(fixture_ids)
+    ).order_by(Prediction.fixture_id, Prediction.id).all()
+
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    for row in rows:
+        columns["fixture_id"].append(row.fixture_id)
+        columns["id"].append(row.id)
+        columns["user_id"].append(row.user_id)
+        columns["home_prediction"].append(row.home_prediction)
+        columns["away_prediction"].append(row.away_prediction)
+        columns["points_earned"].append(NO_POINTS if row.points_earned is None else row.points_earned)
+        columns["created_at"].append(_to_timestamp(row.created_at))
+        columns["updated_at"].append(_to_timestamp(row.updated_at))
+
+    data = build_archive(season.id, len(rows), columns)
+    # Check the blob reads back before the live rows go
+    if ArchivedSeasonPredictions(data).rows != len(rows):
+        raise ValueError(f"Cold storage blob for season {season.name} did not read back")
+
+    db.add(SeasonPredictionArchive(season_id=season.id, payload=zlib.compress(data), rows=len(rows)))
+    deleted = db.query(Prediction).filter(
+        Prediction.fixture_id.in_(fixture_ids)
+    ).delete(synchronize_session=False)
+    if deleted != len(rows):
+        db.rollback()
+        raise ValueError(f"Predictions for season {season.name} changed while archiving; try again")
+    db.commit()
+
+    logger.info(f"Moved {deleted} predictions for season {season.name} to cold storage")
+    return deleted
+
+def build_archive(season_id: int, rows: int, columns: dict) -> bytes:
+    """Lay out the columns as a cold storage blob"""
+    # Column offsets depend on the header size, so lay them out until the header fits
+    layout = []
+    header = {"season_id": season_id, "rows": rows, "columns": layout}
+    header_bytes = b""
+    while True:
+        offset = _align(len(MAGIC) + 4 + len(header_bytes))
+        layout.clear()
+        for name, typecode in COLUMNS:
+            layout.append({"name": name, "format": typecode, "offset": offset})
+            offset = _align(offset + len(columns[name]) * columns[name].itemsize)
+        encoded = json.dumps(header).encode("utf-8")
+        fits = len(MAGIC) + 4 + len(encoded) <= layout[0]["offset"]
+        header_bytes = encoded
+        if fits:
+            break
+
+    data = bytearray(MAGIC)
+    data += struct.pack("<I", len(header_bytes))
+    data += header_bytes
+    for column in layout:
+        data += b"\0" * (column["offset"] - len(data))
+        data += columns[column["name"]].tobytes()
+    return bytes(data)
+
+def _align(offset: int, alignment: int = 8) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+def _to_timestamp(value):
+    if value is None:
+        return math.nan
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _from_timestamp(value):
+    if math.isnan(value):
+        return None
+    return datetime.fromtimestamp(value, tz=timezone.utc)
@@ -0,0 +1,86 @@
+"""
+Bulk fixture import shared by season cloning and the fixture upload scripts.
+
+Fixtures are upserted in multi-row INSERT ... ON CONFLICT (api_fixture_id) statements,
+so re-running an import updates the existing rows instead of duplicating them.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from itertools import islice
+from typing import Iterable
+from models.models import Fixture, FixtureStatus, CompetitionType
+
+CHUNK_SIZE = 500
+
+# Columns refreshed when an imported fixture already exists. Status and scores are
+# left alone so re-importing never undoes results entered by an admin.
+UPDATABLE_COLUMNS = ("home_team", "away_team", "competition", "kickoff_time", "round")
+
+# Each pairing is played once at home per season, so these keys need no round
+LEAGUE_COMPETITIONS = (CompetitionType.CHAMPIONSHIP.value,)
+
+def fixture_import_key(season_id: int, spec: dict) -> str:
+    """
+    Stable api_fixture_id for a fixture spec that doesn't carry one:
+    season:competition:home:away, plus the round for cup ties, where the same
+    teams can meet more than once. The kickoff time is left out so a rescheduled
+    fixture updates the existing row instead of becoming a new one; only a cup
+    tie without a round falls back to its kickoff date to tell replays apart.
+    """
+    competition = spec["competition"]
+    competition = getattr(competition, "value", competition)
+    parts = [str(season_id), competition]
+    if competition not in LEAGUE_COMPETITIONS:
+        if spec.get("round"):
+            parts.append(spec["round"])
+        else:
+            kickoff = spec["kickoff_time"]
+            parts.append(kickoff.date().isoformat() if hasattr(kickoff, "date") else str(kickoff)[:10])
+    return ":".join(parts + [spec["home_team"], spec["away_team"]])
+
+def fixture_row(season_id: int, spec: dict) -> dict:
+    """Column values for a fixture spec"""
+    return {
+        "season_id": season_id,
+        "api_fixture_id": spec.get("api_fixture_id") or fixture_import_key(season_id, spec),
+        "home_team": spec["home_team"],
+        "away_team": spec["away_team"],
+        "competition": spec["competition"],
+        "kickoff_time": spec["kickoff_time"],
+        "original_kickoff_time": spec.get("original_kickoff_time") or spec["kickoff_time"],
+        "status": spec.get("status") or FixtureStatus.SCHEDULED,
+        "round": spec.get("round")
+    }
+
+def import_fixtures(db: Session, season_id: int, fixtures: Iterable[dict], chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Upsert fixture specs (dicts with home_team, away_team, competition, kickoff_time and
+    optionally original_kickoff_time, status, round, api_fixture_id) into a season.
+    Returns the number of fixtures inserted or updated. A spec repeated within a chunk is
+    imported once, with its last values. The caller is responsible for committing.
+    """
+    insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+    imported = 0
+    specs = iter(fixtures)
+    while True:
+        rows = [fixture_row(season_id, spec) for spec in islice(specs, chunk_size)]
+        if not rows:
+            break
+
+        # Postgres rejects an upsert that touches the same row twice, so keep one row per key
+        rows = list({row["api_fixture_id"]: row for row in rows}.values())
+
+        statement = insert(Fixture).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["api_fixture_id"],
+            set_={
+                **{column: statement.excluded[column] for column in UPDATABLE_COLUMNS},
+                "updated_at": func.now()
+            }
+        )
+        imported += db.execute(statement).rowcount
+
+    return imported
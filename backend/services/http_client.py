@@ -0,0 +1,55 @@
+"""
+Shared outbound HTTP client.
+
+One httpx.AsyncClient is opened for the life of the app (see the lifespan hook in
+main.py) so calls to third-party APIs reuse pooled keep-alive connections instead
+of doing a TLS handshake per request. The pool size also caps how many outbound
+requests a worker has in flight; extra callers wait up to the pool timeout.
+"""
+import httpx
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "20"))
+HTTP_CLIENT_MAX_KEEPALIVE = int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", "10"))
+HTTP_CLIENT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CLIENT_TIMEOUT_SECONDS", "10"))
+HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS = float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS", "5"))
+
+class HTTPClient:
+    """Holder for the app-wide AsyncClient"""
+    def __init__(self):
+        self._client = None
+
+    def start(self, **client_options) -> httpx.AsyncClient:
+        """
+        Open the client. Extra options are passed to httpx.AsyncClient, e.g. a
+        transport pointing at a local stand-in server in tests.
+        """
+        if self._client is None:
+            options = {
+                "limits": httpx.Limits(
+                    max_connections=HTTP_CLIENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_CLIENT_MAX_KEEPALIVE
+                ),
+                "timeout": httpx.Timeout(
+                    HTTP_CLIENT_TIMEOUT_SECONDS,
+                    connect=HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS
+                ),
+                **client_options
+            }
+            self._client = httpx.AsyncClient(**options)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Opened lazily when used outside the app lifespan (scripts, bare TestClient)
+        return self._client or self.start()
+
+http_client = HTTPClient()
@@ -0,0 +1,203 @@
+"""
+In-memory provisional leaderboard for a fixture that is in play.
+
+When a fixture goes LIVE we load the season totals and everyone's prediction for
+that fixture once. Each score update then re-projects the table in memory as if
+the match had finished, and the projection is cached per score so fans
+refreshing during a match are served without touching the database.
+"""
+from sqlalchemy.orm import Session
+from models.models import Fixture, FixtureStatus, Prediction, UserStats, User
+from services.scoring import calculate_points
+from utils.position_calculator import ranking_sort_key, calculate_positions
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class LiveTable:
+    def __init__(self, refresh_seconds: int = 15):
+        # Other workers may have received the admin's score update, so the live
+        # fixture row is re-read at most this often
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._fixture = None
+        self._entries = []
+        self._predictions = {}
+        self._projection = None
+        self._checked_at = 0.0
+
+    def clear(self, fixture_id: int = None):
+        """Drop the cached table (optionally only if it belongs to fixture_id)"""
+        with self._lock:
+            if fixture_id is None or (self._fixture and self._fixture["id"] == fixture_id):
+                self._reset()
+
+    def _reset(self):
+        self._fixture = None
+        self._entries = []
+        self._predictions = {}
+        self._projection = None
+        self._checked_at = 0.0
+
+    def set_score(self, db: Session, fixture: Fixture):
+        """Record a new in-play score for a fixture, loading its base data if needed"""
+        with self._lock:
+            loaded = self._fixture is not None and self._fixture["id"] == fixture.id
+        
+        # Queries run without the lock held: get_table is called through run_sync on
+        # the event loop, and a thread lock held across IO there would stall the loop
+        state = None if loaded else self._load(db, fixture)
+        
+        with self._lock:
+            if state:
+                self._install(state)
+            if self._fixture and self._fixture["id"] == fixture.id:
+                self._fixture["home_score"] = fixture.home_score or 0
+                self._fixture["away_score"] = fixture.away_score or 0
+            self._checked_at = time.monotonic()
+
+    def get_table(self, db: Session):
+        """
+        Return (fixture, entries) for the live fixture, or (None, []) if nothing is in play.
+        Entries are dicts already sorted and carrying their projected position.
+        """
+        with self._lock:
+            stale = time.monotonic() - self._checked_at > self.refresh_seconds
+            loaded_id = self._fixture["id"] if self._fixture else None
+            if stale and loaded_id is not None:
+                # Claim the refresh; concurrent callers keep serving the current table.
+                # With nothing loaded yet each caller loads for itself rather than
+                # waiting, since waiting here would block the event loop
+                self._checked_at = time.monotonic()
+        
+        if stale:
+            try:
+                self._refresh(db, loaded_id)
+            except Exception:
+                with self._lock:
+                    self._checked_at = 0.0
+                raise
+        
+        with self._lock:
+            if not self._fixture:
+                return None, []
+
+            score = (self._fixture["home_score"], self._fixture["away_score"])
+            if not self._projection or self._projection[0] != score:
+                self._projection = (score, self._project(*score))
+
+            return dict(self._fixture), self._projection[1]
+
+    def _refresh(self, db: Session, loaded_id):
+        """Re-read the live fixture, loading its base data if it changed. Called without the lock."""
+        live_fixture = db.query(Fixture).filter(
+            Fixture.status == FixtureStatus.LIVE
+        ).order_by(Fixture.kickoff_time.desc()).first()
+
+        state = None
+        if live_fixture and live_fixture.id != loaded_id:
+            state = self._load(db, live_fixture)
+
+        with self._lock:
+            if not live_fixture:
+                self._reset()
+            else:
+                if state:
+                    self._install(state)
+                if self._fixture and self._fixture["id"] == live_fixture.id:
+                    self._fixture["home_score"] = live_fixture.home_score or 0
+                    self._fixture["away_score"] = live_fixture.away_score or 0
+            self._checked_at = time.monotonic()
+
+    def _install(self, state):
+        self._fixture, self._entries, self._predictions = state
+        self._projection = None
+
+    def _load(self, db: Session, fixture: Fixture):
+        """
+        Read season totals and predictions for the fixture (two queries per match).
+        Returns the state for _install rather than touching the cache, so it can
+        run without the lock.
+        """
+        rows = db.query(
+            UserStats.user_id,
+            User.username,
+            User.avatar_url,
+            UserStats.total_points,
+            UserStats.correct_scores,
+            UserStats.correct_results,
+            UserStats.predictions_made,
+            UserStats.current_streak,
+            UserStats.position
+        ).join(User, User.id == UserStats.user_id).filter(
+            UserStats.season_id == fixture.season_id
+        ).all()
+
+        entries = [
+            {
+                "user_id": row.user_id,
+                "username": row.username,
+                "avatar_url": row.avatar_url,
+                "total_points": row.total_points or 0,
+                "correct_scores": row.correct_scores or 0,
+                "correct_results": row.correct_results or 0,
+                "predictions_made": row.predictions_made or 0,
+                "current_streak": row.current_streak or 0,
+                "previous_position": row.position
+            }
+            for row in rows
+        ]
+
+        predictions = {
+            user_id: (home, away)
+            for user_id, home, away in db.query(
+                Prediction.user_id, Prediction.home_prediction, Prediction.away_prediction
+            ).filter(Prediction.fixture_id == fixture.id).all()
+        }
+
+        loaded_fixture = {
+            "id": fixture.id,
+            "home_team": fixture.home_team,
+            "away_team": fixture.away_team,
+            "home_score": 0,
+            "away_score": 0
+        }
+
+        logger.info(f"Loaded live table for fixture {fixture.id}: {len(entries)} users, {len(predictions)} predictions")
+        return loaded_fixture, entries, predictions
+
+    def _project(self, home_score: int, away_score: int):
+        projected = []
+        for entry in self._entries:
+            row = dict(entry)
+            prediction = self._predictions.get(entry["user_id"])
+            row["live_points"] = None
+
+            if prediction:
+                points = calculate_points(prediction[0], prediction[1], home_score, away_score)
+                row["live_points"] = points
+                row["total_points"] += points
+                row["predictions_made"] += 1
+                if points == 3:
+                    row["correct_scores"] += 1
+                elif points == 1:
+                    row["correct_results"] += 1
+                row["current_streak"] = row["current_streak"] + 1 if points > 0 else 0
+
+            row["avg_points_per_game"] = (
+                row["total_points"] / row["predictions_made"] if row["predictions_made"] > 0 else 0.0
+            )
+            projected.append(row)
+
+        values = lambda row: (row["predictions_made"], row["total_points"], row["correct_scores"], row["correct_results"])
+        projected.sort(key=lambda row: ranking_sort_key(values(row), row["username"]))
+
+        for row, position in zip(projected, calculate_positions([values(row) for row in projected])):
+            row["position"] = position
+
+        return projected
+
+# Global live table instance
+live_table = LiveTable()
@@ -0,0 +1,70 @@
+"""
+Mini league membership counters.
+
+MiniLeague.member_count and User.league_count are kept in step with
+mini_league_members so membership limits can be enforced with a single
+conditional UPDATE instead of a COUNT followed by an INSERT. The callers own
+the transaction and roll back if a later step fails.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import update, select
+from typing import Optional
+from models.models import User
+from models.mini_leagues import MiniLeague, MiniLeagueMember
+
+MAX_LEAGUES_PER_USER = 5
+
+def claim_league_slot(db: Session, user_id: int) -> bool:
+    """Count a new membership against the user's league limit; False if they are at the limit"""
+    result = db.execute(
+        update(User).where(
+            User.id == user_id,
+            User.league_count < MAX_LEAGUES_PER_USER
+        ).values(league_count=User.league_count + 1)
+    )
+    return result.rowcount == 1
+
+def claim_member_slot(db: Session, league_id: int) -> Optional[int]:
+    """Take a place in an active league; returns the new member count, or None if it is full or inactive"""
+    return db.execute(
+        update(MiniLeague).where(
+            MiniLeague.id == league_id,
+            MiniLeague.is_active == True,
+            MiniLeague.member_count < MiniLeague.max_members
+        ).values(member_count=MiniLeague.member_count + 1).returning(MiniLeague.member_count)
+    ).scalar()
+
+def release_membership(db: Session, league_id: int, user_id: int):
+    """Give back the league place and user slot of a membership that is being removed"""
+    db.execute(
+        update(MiniLeague).where(
+            MiniLeague.id == league_id,
+            MiniLeague.member_count > 0
+        ).values(member_count=MiniLeague.member_count - 1)
+    )
+    db.execute(
+        update(User).where(
+            User.id == user_id,
+            User.league_count > 0
+        ).values(league_count=User.league_count - 1)
+    )
+
+def release_league(db: Session, league_id: int):
+    """Give back the user slot of every member of a league that is being deleted"""
+    member_ids = select(MiniLeagueMember.user_id).where(MiniLeagueMember.mini_league_id == league_id)
+    db.execute(
+        update(User).where(
+            User.id.in_(member_ids),
+            User.league_count > 0
+        ).values(league_count=User.league_count - 1)
+    )
+
+def release_user_memberships(db: Session, user_id: int):
+    """Give back the league places held by a user whose account is being deleted"""
+    league_ids = select(MiniLeagueMember.mini_league_id).where(MiniLeagueMember.user_id == user_id)
+    db.execute(
+        update(MiniLeague).where(
+            MiniLeague.id.in_(league_ids),
+            MiniLeague.member_count > 0
+        ).values(member_count=MiniLeague.member_count - 1)
+    )
@@ -0,0 +1,239 @@
+"""
+Durable outbound email queue on the notifications table.
+
+Request handlers enqueue a row (type + payload) in their own transaction
+instead of sending from a BackgroundTask, so emails survive restarts and
+deploys. scripts/notification_worker.py claims due rows in batches with
+SELECT ... FOR UPDATE SKIP LOCKED, so several workers can run side by side,
+and sends them over pooled SMTP connections.
+
+A claimed row is leased by pushing scheduled_for forward before any email is
+sent; if a worker dies mid-batch its rows become due again when the lease
+runs out. Failed sends are retried with exponential backoff until
+NOTIFICATION_MAX_ATTEMPTS, after which the row stays unsent with its
+last_error for inspection.
+
+The worker also runs enqueue_fixture_reminders, which queues a reminder for
+every opted-in user who hasn't predicted once a fixture is within
+FIXTURE_REMINDER_HOURS of its prediction deadline.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, update, or_, and_, exists, literal, func, cast, String
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import logging
+import os
+from models.models import Notification, User, Fixture, FixtureStatus, Prediction
+from utils.email import email_service
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "100"))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_MAX_ATTEMPTS", "5"))
+NOTIFICATION_LEASE_SECONDS = int(os.getenv("NOTIFICATION_LEASE_SECONDS", "300"))
+NOTIFICATION_RETRY_BASE_SECONDS = int(os.getenv("NOTIFICATION_RETRY_BASE_SECONDS", "60"))
+NOTIFICATION_RETRY_MAX_SECONDS = int(os.getenv("NOTIFICATION_RETRY_MAX_SECONDS", "3600"))
+FIXTURE_REMINDER_HOURS = float(os.getenv("FIXTURE_REMINDER_HOURS", "24"))
+
+# Predictions close this long before kick-off
+PREDICTION_DEADLINE = timedelta(minutes=5)
+
+# Notification type -> renderer taking the row's payload and returning an OutgoingEmail
+EMAIL_RENDERERS = {
+    "email_verification": lambda payload: email_service.verification_email(
+        payload["to_email"], payload["username"], payload["token"]
+    ),
+    "password_reset": lambda payload: email_service.password_reset_email(
+        payload["to_email"], payload["username"], payload["token"]
+    ),
+    "fixture_reminder": lambda payload: email_service.fixture_reminder_email(
+        payload["to_email"], payload["username"], payload
+    ),
+}
+
+def enqueue_email(
+    db: Session,
+    user_id: int,
+    type: str,
+    message: str,
+    payload: dict,
+    fixture_id: Optional[int] = None,
+    scheduled_for: Optional[datetime] = None
+) -> Notification:
+    """Queue an email for the worker. The caller is responsible for committing."""
+    notification = Notification(
+        user_id=user_id,
+        fixture_id=fixture_id,
+        type=type,
+        message=message,
+        payload=payload,
+        scheduled_for=scheduled_for
+    )
+    db.add(notification)
+    return notification
+
+def enqueue_verification_email(db: Session, user: User, token: str) -> Notification:
+    return enqueue_email(
+        db, user.id, "email_verification", f"Verification email to {user.email}",
+        {"to_email": user.email, "username": user.username, "token": token}
+    )
+
+def enqueue_password_reset_email(db: Session, user: User, token: str) -> Notification:
+    return enqueue_email(
+        db, user.id, "password_reset", f"Password reset email to {user.email}",
+        {"to_email": user.email, "username": user.username, "token": token}
+    )
+
+def has_not_predicted(fixture_id: int):
+    """Anti-join condition matching users with no prediction for the fixture"""
+    return ~exists().where(
+        Prediction.user_id == User.id,
+        Prediction.fixture_id == fixture_id
+    )
+
+def fixture_reminder_details(fixture: Fixture) -> dict:
+    """The fixture fields shown in a reminder email"""
+    return {
+        'home_team': fixture.home_team,
+        'away_team': fixture.away_team,
+        'competition': fixture.competition.value.replace('_', ' ').title() if hasattr(fixture.competition, 'value') else str(fixture.competition),
+        'kickoff_time': fixture.kickoff_time.strftime('%B %d, %Y at %H:%M')
+    }
+
+def enqueue_fixture_reminder(db: Session, fixture: Fixture) -> int:
+    """
+    Queue a reminder for every user with email notifications on who hasn't
+    predicted the fixture and hasn't been reminded about it. Runs as a single
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING and returns the number of
+    reminders queued. The caller is responsible for committing.
+    """
+    dialect = db.bind.dialect.name
+    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+    build_json = func.json_build_object if dialect == "postgresql" else func.json_object
+
+    # Typed so Postgres can resolve json_build_object's variadic arguments
+    fields = {'to_email': User.email, 'username': User.username}
+    for key, detail in fixture_reminder_details(fixture).items():
+        fields[key] = cast(literal(detail), String)
+    payload = build_json(*[value for key, column in fields.items() for value in (cast(literal(key), String), column)])
+
+    columns = ["user_id", "fixture_id", "type", "message", "payload", "sent", "attempts"]
+    reminders = select(
+        User.id,
+        literal(fixture.id),
+        literal("fixture_reminder"),
+        literal(f"Prediction reminder for {fixture.home_team} vs {fixture.away_team}"),
+        payload,
+        literal(False),
+        literal(0)
+    ).where(
+        User.email_notifications == True,
+        # Placeholder addresses of Twitter accounts without an email
+        ~User.email.endswith('@twitter.local'),
+        has_not_predicted(fixture.id)
+    )
+
+    statement = insert(Notification).from_select(columns, reminders).on_conflict_do_nothing(
+        index_elements=["user_id", "fixture_id"],
+        index_where=Notification.type == "fixture_reminder"
+    )
+    return db.execute(statement).rowcount
+
+def enqueue_fixture_reminders(db: Session, now: Optional[datetime] = None) -> int:
+    """Queue reminders for every scheduled fixture whose deadline is within FIXTURE_REMINDER_HOURS"""
+    now = now or datetime.now(timezone.utc)
+    fixtures = db.query(Fixture).filter(
+        and_(
+            Fixture.status == FixtureStatus.SCHEDULED,
+            Fixture.kickoff_time > now + PREDICTION_DEADLINE,
+            Fixture.kickoff_time <= now + PREDICTION_DEADLINE + timedelta(hours=FIXTURE_REMINDER_HOURS)
+        )
+    ).all()
+
+    queued = 0
+    for fixture in fixtures:
+        count = enqueue_fixture_reminder(db, fixture)
+        if count:
+            logger.info(f"Queued {count} reminders for {fixture.home_team} vs {fixture.away_team}")
+        queued += count
+    db.commit()
+    return queued
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff after the given number of failed attempts"""
+    seconds = NOTIFICATION_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, NOTIFICATION_RETRY_MAX_SECONDS))
+
+def claim_notifications(db: Session, limit: int = NOTIFICATION_BATCH_SIZE):
+    """
+    Lease up to `limit` due notifications and count the attempt, returning
+    (id, type, payload, attempts) rows. Rows locked by another worker's claim
+    are skipped rather than waited on. Commits so the locks are held only for
+    the claim, not while sending.
+    """
+    now = datetime.now(timezone.utc)
+    due = select(Notification.id).where(
+        Notification.sent == False,
+        Notification.type.in_(EMAIL_RENDERERS),
+        Notification.attempts < NOTIFICATION_MAX_ATTEMPTS,
+        or_(Notification.scheduled_for == None, Notification.scheduled_for <= now)
+    ).order_by(Notification.id).limit(limit).with_for_update(skip_locked=True)
+
+    claimed = db.execute(
+        update(Notification).where(Notification.id.in_(due)).values(
+            scheduled_for=now + timedelta(seconds=NOTIFICATION_LEASE_SECONDS),
+            attempts=Notification.attempts + 1
+        ).returning(Notification.id, Notification.type, Notification.payload, Notification.attempts),
+        execution_options={"synchronize_session": False}
+    ).all()
+    db.commit()
+    return sorted(claimed, key=lambda row: row.id)
+
+def process_notification_batch(db: Session, limit: int = NOTIFICATION_BATCH_SIZE) -> int:
+    """Claim and send one batch of due emails; returns how many were claimed"""
+    notifications = claim_notifications(db, limit)
+    if not notifications:
+        return 0
+
+    emails = {}
+    errors = {}
+    for notification in notifications:
+        try:
+            emails[notification.id] = EMAIL_RENDERERS[notification.type](notification.payload)
+        except Exception as e:
+            logger.exception(f"Could not render notification {notification.id}")
+            errors[notification.id] = f"Render failed: {str(e)}"
+
+    # Send results are keyed by position, so one user's several notifications are told apart
+    result = email_service.send_bulk(emails.values())
+    for index, notification_id in enumerate(emails):
+        if index in result.failed:
+            errors[notification_id] = result.failed[index]
+
+    now = datetime.now(timezone.utc)
+    sent = []
+    failed = []
+    for notification in notifications:
+        error = errors.get(notification.id)
+        if error is None:
+            sent.append({"id": notification.id, "sent": True, "sent_at": now, "last_error": None})
+            continue
+
+        failed.append({
+            "id": notification.id,
+            "scheduled_for": now + retry_delay(notification.attempts),
+            "last_error": error[:1000]
+        })
+        if notification.attempts >= NOTIFICATION_MAX_ATTEMPTS:
+            logger.error(f"Giving up on notification {notification.id} after {notification.attempts} attempts: {error}")
+
+    # Bulk UPDATE by primary key, one executemany per shape
+    for rows in (sent, failed):
+        if rows:
+            db.execute(update(Notification), rows)
+    db.commit()
+
+    logger.info(f"Processed {len(notifications)} notifications: {len(sent)} sent, {len(failed)} failed")
+    return len(notifications)
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from models.models import UserStats
+from models.models import UserStats, Prediction, Fixture, FixtureStatus
 
 def calculate_points(home_pred: int, away_pred: int, home_actual: int, away_actual: int) -> int:
     if home_pred == home_actual and away_pred == away_actual:
@@ -49,4 +49,120 @@ def update_user_stats(db: Session, user_id: int, points: int, is_correct_score:
     if stats.predictions_made > 0:
         stats.avg_points_per_game = stats.total_points / stats.predictions_made
     
-    db.commit()
\ No newline at end of file
+    db.commit()
+
+def _outcome_counts(points):
+    """Return (correct_scores, correct_results) contributed by a prediction's points"""
+    if points is None:
+        return 0, 0
+    return (1 if points == 3 else 0), (1 if points == 1 else 0)
+
+def _recalculate_streaks(db: Session, season_id: int, stats_by_user: dict):
+    """Rebuild current/best streaks for the given users from their scored predictions in one query"""
+    rows = db.query(Prediction.user_id, Prediction.points_earned).join(Fixture).filter(
+        Fixture.season_id == season_id,
+        Prediction.user_id.in_(list(stats_by_user)),
+        Prediction.points_earned.isnot(None)
+    ).order_by(Prediction.user_id, Fixture.kickoff_time).all()
+    
+    streaks = {user_id: (0, 0) for user_id in stats_by_user}
+    for user_id, points in rows:
+        current, best = streaks[user_id]
+        current = current + 1 if points > 0 else 0
+        streaks[user_id] = (current, max(best, current))
+    
+    for user_id, (current, best) in streaks.items():
+        stats_by_user[user_id].current_streak = current
+        stats_by_user[user_id].best_streak = best
+
+def apply_fixture_result(db: Session, fixture: Fixture, home_score: int, away_score: int) -> dict:
+    """
+    Score every prediction on a fixture and apply only the difference to user stats.
+    Entering a result for the first time adds each prediction's points; entering it
+    again (e.g. to correct a typo) subtracts the previous contribution and adds the
+    new one, so predictions_made is never double counted. Only users whose points
+    changed are touched. The caller is responsible for committing.
+    """
+    fixture.home_score = home_score
+    fixture.away_score = away_score
+    fixture.status = FixtureStatus.FINISHED
+    
+    predictions = db.query(Prediction).filter(
+        Prediction.fixture_id == fixture.id
+    ).all()
+    
+    changes = {}
+    exact_scores = 0
+    correct_results = 0
+    for prediction in predictions:
+        points = calculate_points(
+            prediction.home_prediction, prediction.away_prediction, home_score, away_score
+        )
+        if points == 3:
+            exact_scores += 1
+        elif points == 1:
+            correct_results += 1
+        
+        if prediction.points_earned != points:
+            changes[prediction.user_id] = (prediction.points_earned, points)
+            prediction.points_earned = points
+    
+    if changes and fixture.season_id:
+        stats_by_user = {
+            stats.user_id: stats
+            for stats in db.query(UserStats).filter(
+                UserStats.season_id == fixture.season_id,
+                UserStats.user_id.in_(list(changes))
+            ).all()
+        }
+        
+        streaks_to_rebuild = {}
+        for user_id, (old_points, new_points) in changes.items():
+            stats = stats_by_user.get(user_id)
+            if not stats:
+                stats = UserStats(
+                    user_id=user_id,
+                    season_id=fixture.season_id,
+                    total_points=0,
+                    correct_scores=0,
+                    correct_results=0,
+                    predictions_made=0,
+                    current_streak=0,
+                    best_streak=0,
+                    avg_points_per_game=0.0
+                )
+                db.add(stats)
+                stats_by_user[user_id] = stats
+            
+            old_exact, old_result = _outcome_counts(old_points)
+            new_exact, new_result = _outcome_counts(new_points)
+            stats.total_points += new_points - (old_points or 0)
+            stats.correct_scores += new_exact - old_exact
+            stats.correct_results += new_result - old_result
+            
+            if old_points is None:
+                # First time this prediction is scored
+                stats.predictions_made += 1
+                if new_points > 0:
+                    stats.current_streak += 1
+                    if stats.current_streak > stats.best_streak:
+                        stats.best_streak = stats.current_streak
+                else:
+                    stats.current_streak = 0
+            elif (old_points > 0) != (new_points > 0):
+                # A correction that flips hit/miss can break or join streaks anywhere in the season
+                streaks_to_rebuild[user_id] = stats
+            
+            if stats.predictions_made > 0:
+                stats.avg_points_per_game = stats.total_points / stats.predictions_made
+        
+        if streaks_to_rebuild:
+            db.flush()
+            _recalculate_streaks(db, fixture.season_id, streaks_to_rebuild)
+    
+    return {
+        "predictions_processed": len(predictions),
+        "total_exact_scores": exact_scores,
+        "total_correct_results": correct_results,
+        "users_updated": len(changes)
+    }
@@ -0,0 +1,61 @@
+"""
+Season lifecycle helpers
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, literal, true
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Optional
+from models.models import User, UserStats, Season
+from utils.cache import TTLCache
+
+# The current season only changes on activation, which invalidates this worker's copy;
+# other workers pick the change up when the entry expires
+_current_season = TTLCache(ttl_seconds=60, max_size=1)
+
+def current_season_id_query():
+    """Select the id of the current season; shared by the sync and async routers"""
+    return select(Season.id).where(Season.is_current == True).limit(1)
+
+def get_current_season_id(db: Session) -> Optional[int]:
+    """Return the id of the current season, or None if there isn't one"""
+    season_id = _current_season.get("season_id")
+    if season_id is None:
+        season_id = db.scalar(current_season_id_query())
+        if season_id is not None:
+            _current_season.set("season_id", season_id)
+    return season_id
+
+def invalidate_current_season():
+    _current_season.invalidate()
+
+def provision_season_stats(db: Session, season_id: int) -> int:
+    """
+    Create an empty UserStats row for every user that doesn't have one for the season.
+    Runs as a single INSERT ... SELECT ... ON CONFLICT DO NOTHING and returns the
+    number of rows created. The caller is responsible for committing.
+    """
+    insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+    columns = [
+        "user_id", "season_id", "total_points", "correct_scores", "correct_results",
+        "predictions_made", "current_streak", "best_streak", "avg_points_per_game"
+    ]
+    new_stats = select(
+        User.id,
+        literal(season_id),
+        literal(0),
+        literal(0),
+        literal(0),
+        literal(0),
+        literal(0),
+        literal(0),
+        literal(0.0)
+    ).where(true())  # SQLite needs a WHERE to parse INSERT ... SELECT ... ON CONFLICT
+
+    statement = insert(UserStats).from_select(columns, new_stats).on_conflict_do_nothing(
+        index_elements=["user_id", "season_id"]
+    )
+    result = db.execute(statement)
+
+    return result.rowcount
@@ -0,0 +1,136 @@
+"""
+Immutable final-standings snapshots for archived seasons.
+
+Archiving a season writes its final table and aggregates to season_snapshots as a
+compressed JSON blob. Historical leaderboard reads are served from that blob,
+which is cached in memory after the first load, so cached reads run no queries.
+Snapshots only change when a season is reactivated or archived again; the worker
+doing that drops its own copy at once, and other workers pick the change up when
+their copy expires after SNAPSHOT_CACHE_TTL_SECONDS.
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from datetime import datetime, timezone
+from models.models import Season, SeasonSnapshot, UserStats, User
+from services.statistics import get_seasons_with_counts
+from utils.cache import TTLCache
+from utils.position_calculator import update_all_positions
+import json
+import os
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_TTL_SECONDS = int(os.getenv("SNAPSHOT_CACHE_TTL_SECONDS", "300"))
+
+ENTRY_FIELDS = (
+    "position", "username", "avatar_url", "total_points", "correct_scores",
+    "correct_results", "predictions_made", "avg_points_per_game", "current_streak"
+)
+
+# season_id -> decoded snapshot
+_snapshots = TTLCache(ttl_seconds=SNAPSHOT_CACHE_TTL_SECONDS, max_size=256)
+# Seasons known to have no snapshot are rechecked after a minute
+_missing = TTLCache(ttl_seconds=60, max_size=256)
+
+def create_season_snapshot(db: Session, season: Season) -> dict:
+    """Write the final table for a season; does nothing if one already exists"""
+    existing = db.query(SeasonSnapshot).filter(SeasonSnapshot.season_id == season.id).first()
+    if existing:
+        return _decode(existing.payload)
+
+    # Make sure stored positions reflect the final stats
+    update_all_positions(db, season.id)
+
+    rows = db.query(
+        UserStats.position,
+        User.username,
+        User.avatar_url,
+        UserStats.total_points,
+        UserStats.correct_scores,
+        UserStats.correct_results,
+        UserStats.predictions_made,
+        UserStats.avg_points_per_game,
+        UserStats.current_streak
+    ).join(User, User.id == UserStats.user_id).filter(
+        UserStats.season_id == season.id
+    ).order_by(UserStats.position, User.username).all()
+
+    _, counts = get_seasons_with_counts(db, Season.id == season.id)[0]
+    totals = db.query(
+        func.coalesce(func.sum(UserStats.total_points), 0),
+        func.coalesce(func.sum(UserStats.correct_scores), 0),
+        func.coalesce(func.sum(UserStats.correct_results), 0)
+    ).filter(UserStats.season_id == season.id).one()
+
+    snapshot = {
+        "season_id": season.id,
+        "season_name": season.name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "aggregates": {
+            **counts,
+            "total_points": totals[0],
+            "correct_scores": totals[1],
+            "correct_results": totals[2]
+        },
+        # Rows are stored as lists in ENTRY_FIELDS order to keep the blob small
+        "fields": list(ENTRY_FIELDS),
+        "entries": [
+            [
+                row.position if row.position is not None else 999,
+                row.username,
+                row.avatar_url,
+                row.total_points or 0,
+                row.correct_scores or 0,
+                row.correct_results or 0,
+                row.predictions_made or 0,
+                row.avg_points_per_game or 0.0,
+                row.current_streak or 0
+            ]
+            for row in rows
+        ]
+    }
+
+    db.add(SeasonSnapshot(season_id=season.id, payload=_encode(snapshot)))
+    db.commit()
+    _snapshots.set(season.id, snapshot)
+    _missing.invalidate(season.id)
+
+    logger.info(f"Stored final standings snapshot for season {season.name} ({len(rows)} users)")
+    return snapshot
+
+def get_season_snapshot(db: Session, season_id: int):
+    """Return the snapshot for a season, or None if it has not been archived"""
+    snapshot = _snapshots.get(season_id)
+    if snapshot is not None:
+        return snapshot
+    if _missing.get(season_id):
+        return None
+
+    row = db.query(SeasonSnapshot.payload).filter(SeasonSnapshot.season_id == season_id).first()
+    if not row:
+        _missing.set(season_id, True)
+        return None
+
+    snapshot = _decode(row.payload)
+    _snapshots.set(season_id, snapshot)
+    return snapshot
+
+def discard_season_snapshot(db: Session, season_id: int):
+    """Remove a season's snapshot when it is reactivated. The caller commits."""
+    db.query(SeasonSnapshot).filter(SeasonSnapshot.season_id == season_id).delete()
+    _snapshots.invalidate(season_id)
+    _missing.invalidate(season_id)
+
+def snapshot_entries(snapshot: dict, offset: int = 0, limit: int = None):
+    """Return a page of snapshot rows as dicts keyed by field name"""
+    fields = snapshot["fields"]
+    end = None if limit is None else offset + limit
+    return [dict(zip(fields, values)) for values in snapshot["entries"][offset:end]]
+
+def _encode(snapshot: dict) -> bytes:
+    return zlib.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8"))
+
+def _decode(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
@@ -0,0 +1,107 @@
+"""
+Aggregate counts for the admin dashboard and season pages
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func, distinct
+from datetime import datetime, timedelta
+from models.models import User, Fixture, Prediction, FixtureStatus, Season, UserStats, SeasonPredictionArchive
+from utils.cache import TTLCache
+import pytz
+
+# Admin stats are cheap to be slightly stale; fixture and score writes invalidate them
+admin_stats_cache = TTLCache(ttl_seconds=60, max_size=1)
+
+def get_cached_admin_stats(db: Session) -> dict:
+    """Return overall system statistics, computed in a single query and cached briefly"""
+    cached = admin_stats_cache.get("admin_stats")
+    if cached is not None:
+        return cached
+
+    week_ago = datetime.now(pytz.UTC) - timedelta(days=7)
+
+    row = db.execute(select(
+        select(func.count(User.id)).scalar_subquery().label("total_users"),
+        select(func.count(Fixture.id)).scalar_subquery().label("total_fixtures"),
+        select(func.count(Prediction.id)).scalar_subquery().label("total_predictions"),
+        select(func.count(Fixture.id)).where(
+            Fixture.status == FixtureStatus.SCHEDULED
+        ).scalar_subquery().label("upcoming_fixtures"),
+        select(func.count(Fixture.id)).where(
+            Fixture.status == FixtureStatus.FINISHED
+        ).scalar_subquery().label("completed_fixtures"),
+        # Users who made predictions in the last week
+        select(func.count(distinct(Prediction.user_id))).where(
+            Prediction.created_at >= week_ago
+        ).scalar_subquery().label("active_users_last_week")
+    )).one()
+
+    stats = dict(row._mapping)
+    admin_stats_cache.set("admin_stats", stats)
+    return stats
+
+def invalidate_admin_stats():
+    admin_stats_cache.invalidate()
+
+def get_seasons_with_counts(db: Session, *criteria):
+    """
+    Return [(season, counts)] for seasons matching criteria, newest first, in one query.
+    Archived seasons use their frozen counters; the others are counted with grouped
+    subqueries restricted to those seasons. A season whose predictions have moved to
+    cold storage takes its prediction count from the archive row.
+    """
+    counted_seasons = select(Season.id).where(Season.prediction_count.is_(None), *criteria)
+
+    fixture_counts = select(
+        Fixture.season_id, func.count(Fixture.id).label("count")
+    ).where(Fixture.season_id.in_(counted_seasons)).group_by(Fixture.season_id).subquery()
+
+    user_counts = select(
+        UserStats.season_id, func.count(UserStats.id).label("count")
+    ).where(UserStats.season_id.in_(counted_seasons)).group_by(UserStats.season_id).subquery()
+
+    prediction_counts = select(
+        Fixture.season_id, func.count(Prediction.id).label("count")
+    ).join(Prediction, Prediction.fixture_id == Fixture.id).where(
+        Fixture.season_id.in_(counted_seasons)
+    ).group_by(Fixture.season_id).subquery()
+
+    rows = db.query(
+        Season,
+        func.coalesce(Season.fixture_count, fixture_counts.c.count, 0),
+        func.coalesce(Season.user_count, user_counts.c.count, 0),
+        func.coalesce(Season.prediction_count, SeasonPredictionArchive.rows, prediction_counts.c.count, 0)
+    ).outerjoin(
+        SeasonPredictionArchive, SeasonPredictionArchive.season_id == Season.id
+    ).outerjoin(
+        fixture_counts, fixture_counts.c.season_id == Season.id
+    ).outerjoin(
+        user_counts, user_counts.c.season_id == Season.id
+    ).outerjoin(
+        prediction_counts, prediction_counts.c.season_id == Season.id
+    ).filter(*criteria).order_by(Season.start_date.desc()).all()
+
+    return [
+        (season, {
+            "fixture_count": fixture_count,
+            "user_count": user_count,
+            "prediction_count": prediction_count
+        })
+        for season, fixture_count, user_count, prediction_count in rows
+    ]
+
+def freeze_season_counts(db: Session, season: Season):
+    """Store the season's final counts so archived seasons are never recounted"""
+    season.fixture_count = None
+    season.user_count = None
+    season.prediction_count = None
+    db.flush()
+
+    _, counts = get_seasons_with_counts(db, Season.id == season.id)[0]
+    season.fixture_count = counts["fixture_count"]
+    season.user_count = counts["user_count"]
+    season.prediction_count = counts["prediction_count"]
+
+def unfreeze_season_counts(season: Season):
+    season.fixture_count = None
+    season.user_count = None
+    season.prediction_count = None
@@ -0,0 +1,119 @@
+"""
+Shared fixtures for the backend test suite.
+
+The app reads its settings from the environment at import time, so the database,
+rate limiter and SMTP settings are pointed at throwaway values before anything
+from the backend is imported. Every test gets freshly created tables.
+"""
+import os
+import sys
+import tempfile
+
+_database_file = os.path.join(tempfile.mkdtemp(prefix="tweetleague-tests-"), "test.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_file}"
+os.environ["USE_ASYNC_DB"] = "false"
+os.environ["RATE_LIMIT_REDIS_URL"] = ""
+os.environ["SMTP_USERNAME"] = ""
+os.environ["SMTP_PASSWORD"] = ""
+# User ids are reused once the tables are recreated, so don't cache principals
+os.environ["AUTH_CACHE_TTL_SECONDS"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta, timezone
+import pytest
+from database.base import Base, SessionLocal, engine
+from models.models import User, Season, SeasonStatus, Fixture, FixtureStatus, CompetitionType, UserStats
+from models.mini_leagues import MiniLeague, MiniLeagueMember
+from services import cold_storage, seasons, snapshots
+from utils.auth import create_access_token
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        # Per-process caches keyed by ids that the next test reuses
+        cold_storage._stores.invalidate()
+        seasons._current_season.invalidate()
+        snapshots._snapshots.invalidate()
+        snapshots._missing.invalidate()
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+    from main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+
+def make_season(db, name: str = "2025-2026", status: SeasonStatus = SeasonStatus.ACTIVE) -> Season:
+    season = Season(
+        name=name,
+        start_date=datetime(2025, 8, 1),
+        end_date=datetime(2026, 5, 31),
+        status=status,
+        is_current=status == SeasonStatus.ACTIVE
+    )
+    db.add(season)
+    db.commit()
+    return season
+
+def make_user(db, username: str, season: Season = None) -> User:
+    """A verified email user, with zeroed stats for the season if one is given"""
+    user = User(email=f"{username}@example.com", username=username, email_verified=True, provider="email")
+    db.add(user)
+    db.flush()
+    if season:
+        db.add(UserStats(
+            user_id=user.id,
+            season_id=season.id,
+            total_points=0,
+            correct_scores=0,
+            correct_results=0,
+            predictions_made=0,
+            current_streak=0,
+            best_streak=0,
+            avg_points_per_game=0.0
+        ))
+    db.commit()
+    return user
+
+def make_fixture(db, season: Season, away_team: str = "Leeds United", days_from_now: int = -1) -> Fixture:
+    kickoff = datetime.now(timezone.utc) + timedelta(days=days_from_now)
+    fixture = Fixture(
+        season_id=season.id,
+        home_team="Coventry City",
+        away_team=away_team,
+        competition=CompetitionType.CHAMPIONSHIP,
+        kickoff_time=kickoff,
+        original_kickoff_time=kickoff,
+        status=FixtureStatus.SCHEDULED
+    )
+    db.add(fixture)
+    db.commit()
+    return fixture
+
+def make_mini_league(db, creator: User, season: Season, max_members: int = 50, invite_code: str = "ABCDEFGH") -> MiniLeague:
+    """A league with its creator as the only (admin) member, counters included"""
+    league = MiniLeague(
+        name="Sky Blues",
+        invite_code=invite_code,
+        created_by=creator.id,
+        season_id=season.id,
+        max_members=max_members,
+        member_count=1,
+        is_active=True
+    )
+    db.add(league)
+    db.flush()
+    db.add(MiniLeagueMember(mini_league_id=league.id, user_id=creator.id, is_admin=True))
+    creator.league_count += 1
+    db.commit()
+    return league
@@ -0,0 +1,142 @@
+"""
+Predictions moved to cold storage read back exactly as they were written
+"""
+from array import array
+from datetime import datetime, timezone
+import pytest
+from models.models import Prediction, FixtureStatus, SeasonStatus, SeasonPredictionArchive, UserStats
+from services import cold_storage
+from services.cold_storage import (
+    ArchivedSeasonPredictions, archive_season_predictions, archived_recent_points, build_archive,
+    get_archived_predictions, load_archived_fixture_predictions, COLUMNS
+)
+from services.statistics import freeze_season_counts
+from conftest import make_season, make_user, make_fixture
+
+def prediction_values(prediction):
+    return (
+        prediction.id, prediction.user_id, prediction.fixture_id, prediction.home_prediction,
+        prediction.away_prediction, prediction.points_earned, prediction.created_at, prediction.updated_at
+    )
+
+@pytest.fixture
+def archived_season(db):
+    """An archived season with three fixtures, predictions on two of them, not yet in cold storage"""
+    season = make_season(db, status=SeasonStatus.ARCHIVED)
+    users = [make_user(db, name, season) for name in ("alice", "bob", "carol")]
+    fixtures = [make_fixture(db, season, f"Team {i}", days_from_now=i - 10) for i in range(3)]
+    created = datetime(2025, 9, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+    for fixture, points in ((fixtures[2], (3, 0, None)), (fixtures[0], (1, 1, 0))):
+        for user, earned in zip(users, points):
+            db.add(Prediction(
+                user_id=user.id,
+                fixture_id=fixture.id,
+                home_prediction=user.id,
+                away_prediction=20,
+                points_earned=earned,
+                created_at=created,
+                updated_at=created if earned == 3 else None
+            ))
+    db.commit()
+    return season, users, fixtures
+
+def test_archived_predictions_read_back_unchanged(db, archived_season):
+    season, users, fixtures = archived_season
+    live = {
+        fixture.id: sorted(
+            prediction_values(p) for p in db.query(Prediction).filter(Prediction.fixture_id == fixture.id)
+        )
+        for fixture in fixtures
+    }
+    # SQLite hands back naive datetimes; the archive stores UTC
+    live = {
+        fixture_id: [
+            values[:6] + tuple(None if v is None else v.replace(tzinfo=timezone.utc) for v in values[6:])
+            for values in rows
+        ]
+        for fixture_id, rows in live.items()
+    }
+
+    moved = archive_season_predictions(db, season)
+
+    assert moved == 6
+    assert db.query(Prediction).count() == 0
+    store = get_archived_predictions(db, season.id)
+    assert store.rows == 6
+    for fixture in fixtures:
+        archived = sorted(prediction_values(p) for p in store.for_fixture(fixture.id))
+        assert archived == live[fixture.id]
+        assert store.count_for_fixture(fixture.id) == len(live[fixture.id])
+    assert store.fixture_counts() == {fixtures[0].id: 3, fixtures[2].id: 3}
+
+def test_archive_survives_the_process_cache(db, archived_season):
+    season, users, fixtures = archived_season
+    archive_season_predictions(db, season)
+    first = get_archived_predictions(db, season.id)
+
+    cold_storage._stores.invalidate()
+    reloaded = get_archived_predictions(db, season.id)
+
+    assert reloaded is not first
+    assert [prediction_values(p) for p in reloaded.for_fixture(fixtures[0].id)] == [
+        prediction_values(p) for p in first.for_fixture(fixtures[0].id)
+    ]
+
+def test_archived_reads_match_the_live_helpers(db, archived_season):
+    season, users, fixtures = archived_season
+    for fixture in fixtures:
+        fixture.status = FixtureStatus.FINISHED
+    db.commit()
+    archive_season_predictions(db, season)
+
+    # A deleted account's archived predictions are left out
+    db.query(UserStats).filter(UserStats.user_id == users[2].id).delete()
+    db.delete(users[2])
+    db.commit()
+
+    predictions = load_archived_fixture_predictions(db, fixtures[2])
+    assert [(p.user.username, p.points_earned) for p in predictions] == [("alice", 3), ("bob", 0)]
+    # Oldest first, over the finished fixtures each user predicted
+    assert archived_recent_points(db, season.id, [users[0].id, users[1].id]) == {
+        users[0].id: [1, 3],
+        users[1].id: [1, 0]
+    }
+
+def test_live_seasons_are_not_in_cold_storage(db):
+    season = make_season(db)
+    fixture = make_fixture(db, season)
+
+    assert get_archived_predictions(db, season.id) is None
+    assert load_archived_fixture_predictions(db, fixture) is None
+    assert archived_recent_points(db, season.id, [1]) is None
+
+def test_only_archived_seasons_move_and_only_once(db, archived_season):
+    season, users, fixtures = archived_season
+    live_season = make_season(db, name="2026-2027")
+
+    with pytest.raises(ValueError):
+        archive_season_predictions(db, live_season)
+
+    archive_season_predictions(db, season)
+    with pytest.raises(ValueError):
+        archive_season_predictions(db, season)
+    assert db.query(SeasonPredictionArchive).count() == 1
+
+def test_frozen_counts_include_cold_storage(db, archived_season):
+    season, users, fixtures = archived_season
+    archive_season_predictions(db, season)
+
+    freeze_season_counts(db, season)
+
+    assert (season.fixture_count, season.user_count, season.prediction_count) == (3, 3, 6)
+
+def test_empty_archive_round_trips():
+    store = ArchivedSeasonPredictions(build_archive(1, 0, {name: array(typecode) for name, typecode in COLUMNS}))
+
+    assert store.rows == 0
+    assert store.for_fixture(1) == []
+    assert store.fixture_counts() == {}
+
+def test_rejects_data_that_is_not_an_archive():
+    with pytest.raises(ValueError):
+        ArchivedSeasonPredictions(b"not an archive")
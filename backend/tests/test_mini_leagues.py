@@ -0,0 +1,123 @@
+"""
+Mini league limits hold under concurrent joins, the join endpoint leaves the
+counters untouched when it refuses, and league leaderboards rank members live
+"""
+import threading
+from database.base import SessionLocal
+from models.models import User, UserStats
+from models.mini_leagues import MiniLeague, MiniLeagueMember
+from services.mini_leagues import MAX_LEAGUES_PER_USER, claim_league_slot, claim_member_slot
+from conftest import auth_headers, make_season, make_user, make_mini_league
+
+def join(league_id: int, user_id: int) -> str:
+    """The join endpoint's writes, in a session of its own"""
+    db = SessionLocal()
+    try:
+        if claim_member_slot(db, league_id) is None:
+            db.rollback()
+            return "full"
+        if not claim_league_slot(db, user_id):
+            db.rollback()
+            return "too many leagues"
+        db.add(MiniLeagueMember(mini_league_id=league_id, user_id=user_id, is_admin=False))
+        db.commit()
+        return "joined"
+    finally:
+        db.close()
+
+def race(joins) -> list:
+    """Run (league_id, user_id) joins at the same moment from separate threads"""
+    barrier = threading.Barrier(len(joins))
+    results = [None] * len(joins)
+
+    def run(index, league_id, user_id):
+        barrier.wait()
+        results[index] = join(league_id, user_id)
+
+    threads = [threading.Thread(target=run, args=(i, *args)) for i, args in enumerate(joins)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_joins_never_overfill_a_league(db):
+    season = make_season(db)
+    creator = make_user(db, "creator")
+    league = make_mini_league(db, creator, season, max_members=3)
+    joiners = [make_user(db, f"user{i}").id for i in range(6)]
+
+    results = race([(league.id, user_id) for user_id in joiners])
+
+    assert sorted(results) == ["full"] * 4 + ["joined"] * 2
+    db.expire_all()
+    assert db.get(MiniLeague, league.id).member_count == 3
+    assert db.query(MiniLeagueMember).filter(MiniLeagueMember.mini_league_id == league.id).count() == 3
+
+def test_concurrent_joins_never_exceed_the_per_user_limit(db):
+    season = make_season(db)
+    user = make_user(db, "joiner")
+    for i in range(MAX_LEAGUES_PER_USER - 1):
+        make_mini_league(db, user, season, invite_code=f"OWNED00{i}")
+    owner = make_user(db, "owner")
+    leagues = [make_mini_league(db, owner, season, invite_code=f"OPEN000{i}").id for i in range(3)]
+
+    results = race([(league_id, user.id) for league_id in leagues])
+
+    assert sorted(results) == ["joined"] + ["too many leagues"] * 2
+    db.expire_all()
+    assert db.get(User, user.id).league_count == MAX_LEAGUES_PER_USER
+    # The refused joins gave back the places they had claimed
+    assert sorted(db.get(MiniLeague, league_id).member_count for league_id in leagues) == [1, 1, 2]
+
+def test_join_endpoint_refusals_leave_counters_alone(db, client):
+    season = make_season(db)
+    creator = make_user(db, "creator")
+    league = make_mini_league(db, creator, season, max_members=2)
+    member, latecomer = make_user(db, "member"), make_user(db, "latecomer")
+
+    joined = client.post("/api/mini-leagues/join/abcdefgh", headers=auth_headers(member))
+    again = client.post("/api/mini-leagues/join/ABCDEFGH", headers=auth_headers(member))
+    full = client.post("/api/mini-leagues/join/ABCDEFGH", headers=auth_headers(latecomer))
+
+    assert joined.status_code == 200 and joined.json()["member_count"] == 2
+    assert (again.status_code, again.json()["detail"]) == (400, "Already a member of this league")
+    assert (full.status_code, full.json()["detail"]) == (400, "League is full")
+    db.expire_all()
+    assert db.get(MiniLeague, league.id).member_count == 2
+    assert db.get(User, member.id).league_count == 1
+    assert db.get(User, latecomer.id).league_count == 0
+
+def test_leaving_releases_both_counters(db, client):
+    season = make_season(db)
+    creator = make_user(db, "creator")
+    league = make_mini_league(db, creator, season)
+    member = make_user(db, "member")
+    client.post("/api/mini-leagues/join/ABCDEFGH", headers=auth_headers(member))
+
+    left = client.delete(f"/api/mini-leagues/{league.id}/leave", headers=auth_headers(member))
+
+    assert left.status_code == 200
+    db.expire_all()
+    assert db.get(MiniLeague, league.id).member_count == 1
+    assert db.get(User, member.id).league_count == 0
+
+def test_league_leaderboard_ranks_members_live(db, client):
+    season = make_season(db)
+    users = [make_user(db, name, season) for name in ("alice", "bob", "carol", "outsider")]
+    league = make_mini_league(db, users[0], season)
+    for user in users[1:3]:
+        db.add(MiniLeagueMember(mini_league_id=league.id, user_id=user.id))
+    # bob and carol tie; the outsider outscores everyone but isn't a member
+    for user, points in zip(users, (3, 5, 5, 9)):
+        stats = db.query(UserStats).filter(UserStats.user_id == user.id).one()
+        stats.total_points, stats.predictions_made = points, 2
+    db.commit()
+
+    board = client.get("/api/leaderboard/", params={"mini_league_id": league.id}).json()
+    own = client.get(
+        "/api/leaderboard/user-position", params={"mini_league_id": league.id}, headers=auth_headers(users[0])
+    ).json()
+
+    assert [(entry["username"], entry["position"]) for entry in board] == [("bob", 1), ("carol", 1), ("alice", 3)]
+    assert own["position"] == 3
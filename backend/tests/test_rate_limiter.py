@@ -0,0 +1,150 @@
+"""
+In-process GCRA limiting and its bounded key map, the Redis sliding window
+arithmetic and fallback, and the RateLimit-* headers set by the middleware
+"""
+import pytest
+import redis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from utils.rate_limiter import (
+    FakeClock, GCRARateLimitBackend, RateLimiter, RateLimitMiddleware, RateLimitPolicy,
+    load_rate_limit_policies, scope_client_ip, window_result
+)
+
+def test_gcra_allows_a_burst_then_one_attempt_per_interval():
+    clock = FakeClock()
+    backend = GCRARateLimitBackend(clock=clock)
+
+    # 3 per 30s: a burst of three, then one every 10 seconds
+    results = [backend.hit("key", 3, 30) for _ in range(4)]
+
+    assert [(r.allowed, r.remaining, r.reset_seconds) for r in results] == [
+        (True, 2, 10), (True, 1, 20), (True, 0, 30), (False, 0, 10)
+    ]
+
+    clock.advance(10)
+    assert backend.hit("key", 3, 30).allowed
+    assert not backend.hit("key", 3, 30).allowed
+
+def test_gcra_keys_are_limited_independently():
+    backend = GCRARateLimitBackend(clock=FakeClock())
+
+    assert backend.hit("a", 1, 60).allowed
+    assert not backend.hit("a", 1, 60).allowed
+    assert backend.hit("b", 1, 60).allowed
+
+def test_full_map_never_evicts_limited_keys():
+    clock = FakeClock()
+    backend = GCRARateLimitBackend(max_keys=2, clock=clock)
+    backend.hit("a", 1, 60)
+    backend.hit("b", 1, 60)
+
+    # New keys share one overflow bucket rather than pushing out a or b
+    assert backend.hit("c", 1, 60).allowed
+    assert not backend.hit("d", 1, 60).allowed
+    assert len(backend) == 2
+    assert not backend.hit("a", 1, 60).allowed
+    assert not backend.hit("b", 1, 60).allowed
+
+def test_refilled_keys_make_room_for_new_ones():
+    clock = FakeClock()
+    backend = GCRARateLimitBackend(max_keys=2, clock=clock)
+    backend.hit("short", 10, 10)  # refilled after one second
+    backend.hit("long", 1, 60)
+
+    clock.advance(2)
+    assert backend.hit("new", 1, 60).allowed
+    assert not backend.hit("new", 1, 60).allowed  # tracked itself, not in the overflow bucket
+    assert len(backend) == 2
+    assert not backend.hit("long", 1, 60).allowed
+
+def test_sliding_window_counts_the_previous_window_by_overlap():
+    # Halfway through: 10 * 30/60 + 5 = 10 attempts used of 10
+    result = window_result(True, previous=10, current=5, max_attempts=10, window_seconds=60, elapsed=30)
+    assert (result.allowed, result.remaining, result.reset_seconds) == (True, 0, 30)
+
+@pytest.mark.parametrize("previous, current, elapsed, retry_after", [
+    (10, 5, 30, 1),   # the previous window's share decays below the limit a moment later
+    (0, 10, 30, 31),  # this window is full: wait for it to roll over and decay
+])
+def test_sliding_window_retry_after(previous, current, elapsed, retry_after):
+    result = window_result(False, previous, current, max_attempts=10, window_seconds=60, elapsed=elapsed)
+    assert (result.allowed, result.remaining, result.reset_seconds) == (False, 0, retry_after)
+
+def test_limiter_falls_back_to_process_memory_when_redis_fails():
+    class UnreachableRedis:
+        def hit(self, key, max_attempts, window_seconds):
+            raise redis.ConnectionError("connection refused")
+
+    limiter = RateLimiter(UnreachableRedis(), GCRARateLimitBackend(clock=FakeClock()))
+
+    assert limiter.hit("key", 1, 60).allowed
+    assert not limiter.hit("key", 1, 60).allowed
+
+@pytest.mark.parametrize("forwarded_for, trusted_hops, client_ip", [
+    (None, 1, "10.0.0.1"),
+    ("203.0.113.7", 1, "203.0.113.7"),
+    ("1.2.3.4, 203.0.113.7", 1, "203.0.113.7"),  # the client forged the left entry
+    ("1.2.3.4, 203.0.113.7, 10.1.1.1", 2, "203.0.113.7"),
+    ("203.0.113.7", 2, "203.0.113.7"),  # fewer entries than proxies
+    ("203.0.113.7", 0, "10.0.0.1"),
+])
+def test_client_ip_skips_only_trusted_proxies(forwarded_for, trusted_hops, client_ip):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    scope = {"headers": headers, "client": ("10.0.0.1", 4321)}
+
+    assert scope_client_ip(scope, trusted_hops) == client_ip
+
+def test_policy_overrides_merge_over_the_defaults():
+    policies = load_rate_limit_policies(
+        '{"POST /api/auth/login/": {"limit": 20, "window": 600}, "POST /api/auth/register": null}'
+    )
+
+    assert policies["POST /api/auth/login"] == RateLimitPolicy(20, 600)
+    assert "POST /api/auth/register" not in policies
+    assert policies["POST /api/auth/forgot-password"] == RateLimitPolicy(5, 300)
+
+@pytest.fixture
+def limited_client():
+    app = FastAPI()
+
+    @app.post("/login")
+    def login():
+        return {"ok": True}
+
+    @app.get("/login")
+    def login_page():
+        return {"ok": True}
+
+    limiter = RateLimiter(GCRARateLimitBackend(clock=FakeClock()))
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, policies={"POST /login": RateLimitPolicy(2, 60)})
+    return TestClient(app)
+
+def test_middleware_sets_ratelimit_headers_and_rejects_over_the_limit(limited_client):
+    headers = {"X-Forwarded-For": "203.0.113.7"}
+
+    first = limited_client.post("/login", headers=headers)
+    second = limited_client.post("/login", headers=headers)
+    rejected = limited_client.post("/login", headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Policy"] == "2;w=60"
+    assert (first.headers["RateLimit-Remaining"], first.headers["RateLimit-Reset"]) == ("1", "30")
+    assert (second.headers["RateLimit-Remaining"], second.headers["RateLimit-Reset"]) == ("0", "60")
+    assert rejected.status_code == 429
+    assert rejected.headers["RateLimit-Remaining"] == "0"
+    assert rejected.headers["Retry-After"] == rejected.headers["RateLimit-Reset"] == "30"
+
+def test_middleware_limits_each_client_and_route_separately(limited_client):
+    for _ in range(2):
+        limited_client.post("/login", headers={"X-Forwarded-For": "203.0.113.7"})
+
+    assert limited_client.post("/login", headers={"X-Forwarded-For": "203.0.113.7"}).status_code == 429
+    # A forged left-hand entry doesn't change the key; another client's address does
+    assert limited_client.post("/login", headers={"X-Forwarded-For": "1.2.3.4, 203.0.113.7"}).status_code == 429
+    assert limited_client.post("/login", headers={"X-Forwarded-For": "198.51.100.2"}).status_code == 200
+
+    page = limited_client.get("/login", headers={"X-Forwarded-For": "203.0.113.7"})
+    assert page.status_code == 200
+    assert "RateLimit-Limit" not in page.headers
@@ -0,0 +1,91 @@
+"""
+apply_fixture_result applies only the difference a result makes, so entering
+the same score again is a no-op and a correction never double counts
+"""
+from models.models import Prediction, UserStats, FixtureStatus
+from services.scoring import apply_fixture_result
+from conftest import make_season, make_user, make_fixture
+
+def stats_for(db, user):
+    db.expire_all()
+    stats = db.query(UserStats).filter(UserStats.user_id == user.id).one()
+    return (
+        stats.total_points, stats.correct_scores, stats.correct_results,
+        stats.predictions_made, stats.current_streak, stats.best_streak
+    )
+
+def predict(db, user, fixture, home, away):
+    db.add(Prediction(user_id=user.id, fixture_id=fixture.id, home_prediction=home, away_prediction=away))
+    db.commit()
+
+def score(db, fixture, home, away):
+    result = apply_fixture_result(db, fixture, home, away)
+    db.commit()
+    return result
+
+def test_first_result_scores_every_prediction(db):
+    season = make_season(db)
+    exact, result, miss = (make_user(db, name, season) for name in ("exact", "result", "miss"))
+    fixture = make_fixture(db, season)
+    predict(db, exact, fixture, 2, 1)
+    predict(db, result, fixture, 1, 0)
+    predict(db, miss, fixture, 0, 2)
+
+    summary = score(db, fixture, 2, 1)
+
+    assert summary == {
+        "predictions_processed": 3,
+        "total_exact_scores": 1,
+        "total_correct_results": 1,
+        "users_updated": 3
+    }
+    assert fixture.status == FixtureStatus.FINISHED
+    assert stats_for(db, exact) == (3, 1, 0, 1, 1, 1)
+    assert stats_for(db, result) == (1, 0, 1, 1, 1, 1)
+    assert stats_for(db, miss) == (0, 0, 0, 1, 0, 0)
+
+def test_reentering_the_same_result_changes_nothing(db):
+    season = make_season(db)
+    user = make_user(db, "alice", season)
+    fixture = make_fixture(db, season)
+    predict(db, user, fixture, 2, 1)
+
+    score(db, fixture, 2, 1)
+    before = stats_for(db, user)
+    summary = score(db, fixture, 2, 1)
+
+    assert summary["users_updated"] == 0
+    assert stats_for(db, user) == before == (3, 1, 0, 1, 1, 1)
+
+def test_correction_replaces_the_previous_points(db):
+    season = make_season(db)
+    user = make_user(db, "alice", season)
+    fixture = make_fixture(db, season)
+    predict(db, user, fixture, 2, 1)
+
+    score(db, fixture, 2, 1)
+    score(db, fixture, 3, 1)
+
+    # Exact score becomes a correct result; still one prediction made
+    assert stats_for(db, user) == (1, 0, 1, 1, 1, 1)
+    db.expire_all()
+    assert db.query(Prediction).one().points_earned == 1
+
+def test_correction_that_flips_a_hit_rebuilds_streaks(db):
+    season = make_season(db)
+    user = make_user(db, "alice", season)
+    fixtures = [make_fixture(db, season, f"Team {i}", days_from_now=i - 5) for i in range(3)]
+    for fixture in fixtures:
+        predict(db, user, fixture, 1, 0)
+    for fixture in fixtures:
+        score(db, fixture, 1, 0)
+    assert stats_for(db, user) == (9, 3, 0, 3, 3, 3)
+
+    # Turning the middle fixture into a miss splits the run of three
+    score(db, fixtures[1], 0, 1)
+
+    assert stats_for(db, user) == (6, 2, 0, 3, 1, 1)
+
+    score(db, fixtures[1], 1, 0)
+
+    assert stats_for(db, user) == (9, 3, 0, 3, 3, 3)
@@ -1,9 +1,9 @@
 from fastapi import Depends, HTTPException, status
-from utils.auth import get_current_user
+from utils.auth import get_current_user_uncached
 from models.models import User
 
-async def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
-    """Verify that the current user is an admin"""
+async def get_admin_user(current_user: User = Depends(get_current_user_uncached)) -> User:
+    """Verify that the current user is an admin, against the stored row rather than the auth cache"""
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1,23 +1,61 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from database.base import get_db, settings
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.base import get_db, get_async_db, settings
 from models.models import User
+from utils.cache import TTLCache
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with a different cost factor are flagged for rehashing on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+# bcrypt releases the GIL, so a small pool keeps hashing off the event loop and caps its CPU use
+_password_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
 
+# Column values of recently authenticated users, keyed by user id, so requests can skip the users lookup.
+# invalidate_cached_user only clears this process, so other workers can keep serving a deleted or
+# changed user for up to AUTH_CACHE_TTL_SECONDS; admin checks always read the row instead.
+_principals = TTLCache(ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS, max_size=settings.AUTH_CACHE_MAX_SIZE)
+_user_columns = [attribute.key for attribute in inspect(User).column_attrs]
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    """verify_password on the password hashing pool, for async endpoints"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password) -> str:
+    """get_password_hash on the password hashing pool, for async endpoints"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+async def verify_and_update_password(plain_password, hashed_password) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the hashing pool. Returns (verified, new_hash) where new_hash is set
+    when the stored hash should be replaced, e.g. after BCRYPT_ROUNDS has changed.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -28,25 +66,68 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def load_user(db: Session, user_id: int, use_cache: bool = True) -> Optional[User]:
+    """
+    Return the user for an authenticated request. Cached users are rebuilt from their
+    column values and attached to the session without a query, so they can still be
+    modified and committed like a loaded row. Pass use_cache=False to read the row
+    (and refresh the cache) when the answer decides authorization.
+    """
+    values = _principals.get(user_id) if use_cache else None
+    if values is not None:
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        _principals.set(user_id, {key: getattr(user, key) for key in _user_columns})
+    else:
+        _principals.invalidate(user_id)
+    return user
+
+def invalidate_cached_user(user_id: int):
+    """Drop a user's cached principal after changing or deleting their row"""
+    _principals.invalidate(user_id)
+
+def decode_user_id(token: str) -> Optional[int]:
+    """Return the user id from a valid access token, or None"""
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            return None
         # Convert to int if it's a string
-        user_id = int(user_id) if isinstance(user_id, str) else user_id
-    except (JWTError, ValueError) as e:
-        raise credentials_exception
+        return int(user_id) if isinstance(user_id, str) else user_id
+    except (JWTError, ValueError):
+        return None
+
+def credentials_exception():
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    user_id = decode_user_id(token)
+    if user_id is None:
+        raise credentials_exception()
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = load_user(db, user_id)
     if user is None:
-        raise credentials_exception
+        raise credentials_exception()
+    return user
+
+async def get_current_user_uncached(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """get_current_user reading the users row, so revoked admins and deleted accounts are refused at once"""
+    user_id = decode_user_id(token)
+    if user_id is None:
+        raise credentials_exception()
+    
+    user = load_user(db, user_id, use_cache=False)
+    if user is None:
+        raise credentials_exception()
     return user
 
 async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme_optional), db: Session = Depends(get_db)):
@@ -55,23 +136,32 @@ async def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme
     instead of raising an exception. Used for endpoints that work with
     or without authentication.
     """
-    if not token:
+    user_id = decode_user_id(token) if token else None
+    if user_id is None:
         return None
     
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            return None
-        # Convert to int if it's a string
-        user_id = int(user_id) if isinstance(user_id, str) else user_id
-    except (JWTError, ValueError):
-        return None
+    return load_user(db, user_id)
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """get_current_user for routers on the async engine; shares the request's AsyncSession"""
+    user_id = decode_user_id(token)
+    if user_id is None:
+        raise credentials_exception()
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.run_sync(load_user, user_id)
+    if user is None:
+        raise credentials_exception()
     return user
 
-async def get_current_admin_user(current_user: User = Depends(get_current_user)):
+async def get_current_user_optional_async(token: Optional[str] = Depends(oauth2_scheme_optional), db: AsyncSession = Depends(get_async_db)):
+    """get_current_user_optional for routers on the async engine"""
+    user_id = decode_user_id(token) if token else None
+    if user_id is None:
+        return None
+    
+    return await db.run_sync(load_user, user_id)
+
+async def get_current_admin_user(current_user: User = Depends(get_current_user_uncached)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
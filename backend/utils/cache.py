@@ -0,0 +1,52 @@
+"""
+Small in-process caches shared by the API modules
+"""
+from collections import OrderedDict
+import threading
+import time
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache whose entries expire after ttl_seconds.
+    Each worker process has its own copy, so keep TTLs short for anything that
+    another worker could change.
+    """
+    def __init__(self, ttl_seconds: float, max_size: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key=_MISSING):
+        """Remove one key, or everything if no key is given"""
+        with self._lock:
+            if key is _MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
@@ -1,12 +1,45 @@
 import smtplib
 import os
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
+import queue
+import base64
+import functools
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.header import Header
+from email.utils import formataddr
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
 import logging
+from utils.email_templates import (
+    EmailTemplate,
+    VERIFICATION_HTML,
+    VERIFICATION_TEXT,
+    PASSWORD_RESET_HTML,
+    PASSWORD_RESET_TEXT,
+    FIXTURE_REMINDER_SUBJECT,
+    FIXTURE_REMINDER_HTML,
+    FIXTURE_REMINDER_TEXT
+)
 
 logger = logging.getLogger(__name__)
 
+class OutgoingEmail(NamedTuple):
+    to_email: str
+    subject: str
+    html_content: str
+    text_content: Optional[str] = None
+
+class BulkSendResult(NamedTuple):
+    sent: int
+    failed: Dict[int, str]  # Position in the batch -> error, so repeated addresses stay distinct
+
+@functools.lru_cache(maxsize=64)
+def _header_value(value: str) -> bytes:
+    """Header value as bytes, RFC 2047 encoded if it isn't plain ASCII"""
+    try:
+        return value.encode("ascii")
+    except UnicodeEncodeError:
+        return Header(value, "utf-8").encode(linesep="\r\n").encode("ascii")
+
 class EmailService:
     def __init__(self):
         # Support both Brevo and generic SMTP settings
@@ -17,11 +50,79 @@ class EmailService:
         self.from_email = os.getenv("FROM_EMAIL", "noreply@tweetleague.com")
         self.from_name = os.getenv("FROM_NAME", "Tweet League")
         self.frontend_url = os.getenv("FRONTEND_URL", "https://tweetleague.com")
+        # STARTTLS after connecting; SMTP_SSL is for implicit TLS (port 465). Set SMTP_TLS=false
+        # to point SMTP_HOST/SMTP_PORT at a local sink such as Mailpit when testing
+        self.smtp_tls = os.getenv("SMTP_TLS", "true").lower() == "true"
+        self.smtp_ssl = os.getenv("SMTP_SSL", "false").lower() == "true"
+        self.smtp_timeout = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+        # send_bulk opens up to this many connections and reconnects after this many messages on one
+        self.bulk_connections = int(os.getenv("SMTP_BULK_CONNECTIONS", "4"))
+        self.max_messages_per_connection = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+        
+        # Fixed parts of every message; base64 lines can't contain the boundary
+        boundary = f"=============={uuid.uuid4().hex}=="
+        self._message_prefix = (
+            f'Content-Type: multipart/alternative; boundary="{boundary}"\r\n'
+            'MIME-Version: 1.0\r\n'
+        ).encode("ascii")
+        self._message_headers = (
+            f"From: {formataddr((self.from_name, self.from_email))}\r\n"
+            f"Reply-To: {self.from_email}\r\n"
+            f"List-Unsubscribe: <mailto:{self.from_email}?subject=Unsubscribe>\r\n"
+            "\r\n"
+        ).encode("ascii")
+        self._part_headers = {
+            subtype: (
+                f"--{boundary}\r\n"
+                f'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+                "Content-Transfer-Encoding: base64\r\n"
+                "\r\n"
+            ).encode("ascii")
+            for subtype in ("plain", "html")
+        }
+        self._closing_boundary = f"--{boundary}--\r\n".encode("ascii")
         
         # Log configuration on initialization
         print(f"[EMAIL INIT] EmailService initialized - Host: {self.smtp_host}, Port: {self.smtp_port}, User: {self.smtp_username if self.smtp_username else 'NOT SET'}")
         logger.info(f"EmailService initialized - Host: {self.smtp_host}, Port: {self.smtp_port}, User: {self.smtp_username if self.smtp_username else 'NOT SET'}")
         
+    def message_bytes(self, email: OutgoingEmail) -> bytes:
+        """
+        Assemble a multipart/alternative message straight to wire bytes. The
+        headers shared by every message are prepared once, so per message this
+        is the To/Subject lines plus base64 of the bodies, rather than building
+        and flattening an email.message tree.
+        """
+        chunks = [
+            self._message_prefix,
+            b"Subject: ", _header_value(email.subject), b"\r\nTo: ", _header_value(email.to_email), b"\r\n",
+            self._message_headers
+        ]
+        for subtype, content in (("plain", email.text_content), ("html", email.html_content)):
+            if content:
+                chunks.append(self._part_headers[subtype])
+                chunks.append(base64.encodebytes(content.encode("utf-8")).replace(b"\n", b"\r\n"))
+        chunks.append(self._closing_boundary)
+        return b"".join(chunks)
+    
+    def connect(self) -> smtplib.SMTP:
+        """Open an authenticated SMTP connection"""
+        logger.info(f"Connecting to SMTP server {self.smtp_host}:{self.smtp_port}")
+        if self.smtp_ssl:
+            server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, timeout=self.smtp_timeout)
+        else:
+            server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=self.smtp_timeout)
+        try:
+            if self.smtp_tls and not self.smtp_ssl:
+                logger.info("Starting TLS...")
+                server.starttls()
+            logger.info(f"Logging in as {self.smtp_username}...")
+            server.login(self.smtp_username, self.smtp_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
     def send_email(self, to_email: str, subject: str, html_content: str, text_content: Optional[str] = None) -> bool:
         """Send an email using SMTP"""
         try:
@@ -35,29 +136,12 @@ class EmailService:
             
             logger.info(f"Attempting to send email to {to_email} via {self.smtp_host}:{self.smtp_port}")
             
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = to_email
-            msg['Reply-To'] = self.from_email
-            msg['List-Unsubscribe'] = f"<mailto:{self.from_email}?subject=Unsubscribe>"
-            
-            # Add text and HTML parts
-            if text_content:
-                part1 = MIMEText(text_content, 'plain')
-                msg.attach(part1)
-            part2 = MIMEText(html_content, 'html')
-            msg.attach(part2)
+            msg = self.message_bytes(OutgoingEmail(to_email, subject, html_content, text_content))
             
             # Send email
-            logger.info(f"Connecting to SMTP server {self.smtp_host}:{self.smtp_port}")
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                logger.info("Starting TLS...")
-                server.starttls()
-                logger.info(f"Logging in as {self.smtp_username}...")
-                server.login(self.smtp_username, self.smtp_password)
+            with self.connect() as server:
                 logger.info("Sending message...")
-                server.send_message(msg)
+                server.sendmail(self.from_email, [to_email], msg)
                 
             logger.info(f"Email sent successfully to {to_email}")
             return True
@@ -73,386 +157,169 @@ class EmailService:
             logger.exception("Full traceback:")
             return False
     
+    def send_bulk(self, emails: Iterable[OutgoingEmail], connections: Optional[int] = None) -> BulkSendResult:
+        """
+        Send many emails over a few reused connections instead of one connection
+        per message. Each of up to `connections` threads logs in once and sends
+        from a shared queue, reconnecting (and retrying the message once) if the
+        server drops it. Returns the count sent and the error for each failed
+        email, keyed by its position in `emails`.
+        """
+        emails = list(emails)
+        if not emails:
+            return BulkSendResult(0, {})
+        
+        if not self.smtp_username or not self.smtp_password:
+            for email in emails:
+                logger.warning(f"SMTP credentials not configured. Email would be sent to {email.to_email}: {email.subject}")
+            return BulkSendResult(len(emails), {})
+        
+        pending = queue.Queue()
+        for index, email in enumerate(emails):
+            pending.put((index, email))
+        
+        workers = max(1, min(connections or self.bulk_connections, len(emails)))
+        logger.info(f"Sending {len(emails)} emails over {workers} SMTP connections")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda _: self._send_from_queue(pending), range(workers)))
+        
+        sent = sum(result.sent for result in results)
+        failed = {index: error for result in results for index, error in result.failed.items()}
+        logger.info(f"Bulk send finished: {sent} sent, {len(failed)} failed")
+        return BulkSendResult(sent, failed)
+    
+    def _send_from_queue(self, pending: queue.Queue) -> BulkSendResult:
+        """Drain the queue over one connection, reopening it when it fails or reaches its message cap"""
+        server = None
+        sent_on_connection = 0
+        sent = 0
+        failed = {}
+        
+        try:
+            while True:
+                try:
+                    index, email = pending.get_nowait()
+                except queue.Empty:
+                    break
+                
+                msg = self.message_bytes(email)
+                for attempt in range(2):
+                    try:
+                        if server is None or sent_on_connection >= self.max_messages_per_connection:
+                            self._disconnect(server)
+                            server = self.connect()
+                            sent_on_connection = 0
+                        server.sendmail(self.from_email, [email.to_email], msg)
+                        sent_on_connection += 1
+                        sent += 1
+                        break
+                    except smtplib.SMTPAuthenticationError as e:
+                        # Retrying won't help, and every other message would fail the same way
+                        logger.error(f"SMTP Authentication failed for {self.smtp_username}: {str(e)}")
+                        failed[index] = str(e)
+                        while True:
+                            try:
+                                failed[pending.get_nowait()[0]] = str(e)
+                            except queue.Empty:
+                                break
+                        return BulkSendResult(sent, failed)
+                    except OSError as e:
+                        # SMTPException is an OSError too; apart from a dropped or refused
+                        # connection it means the message or recipient was rejected and the
+                        # session is still usable
+                        if isinstance(e, smtplib.SMTPException) and not isinstance(
+                            e, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+                        ):
+                            logger.error(f"SMTP error sending to {email.to_email}: {str(e)}")
+                            failed[index] = str(e)
+                            break
+                        
+                        # Connection lost: reconnect and retry this message once
+                        logger.warning(f"SMTP connection lost sending to {email.to_email}: {str(e)}")
+                        self._disconnect(server)
+                        server = None
+                        if attempt == 1:
+                            failed[index] = str(e)
+        finally:
+            self._disconnect(server)
+        
+        return BulkSendResult(sent, failed)
+    
+    @staticmethod
+    def _disconnect(server: Optional[smtplib.SMTP]):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+    
     def send_verification_email(self, to_email: str, username: str, verification_token: str) -> bool:
         """Send email verification link"""
         print(f"[EMAIL] send_verification_email called for {to_email} (user: {username})")
         logger.info(f"send_verification_email called for {to_email} (user: {username})")
+        return self.send_email(*self.verification_email(to_email, username, verification_token))
+    
+    def verification_email(self, to_email: str, username: str, verification_token: str) -> OutgoingEmail:
+        """Render the email verification message"""
         verification_url = f"{self.frontend_url}/verify-email?token={verification_token}"
         print(f"[EMAIL] Verification URL: {verification_url}")
         logger.info(f"Verification URL: {verification_url}")
         
-        subject = "Welcome to Tweet League - Please confirm your email"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width,initial-scale=1">
-            <meta name="x-apple-disable-message-reformatting">
-            <!--[if mso]>
-            <noscript>
-                <xml>
-                    <o:OfficeDocumentSettings>
-                        <o:PixelsPerInch>96</o:PixelsPerInch>
-                    </o:OfficeDocumentSettings>
-                </xml>
-            </noscript>
-            <![endif]-->
-            <style>
-                table, td, div, h1, p {{font-family: Arial, sans-serif;}}
-            </style>
-        </head>
-        <body style="margin:0;padding:0;word-spacing:normal;background-color:#f4f4f4;">
-            <div role="article" aria-roledescription="email" lang="en" style="text-size-adjust:100%;-webkit-text-size-adjust:100%;-ms-text-size-adjust:100%;background-color:#f4f4f4;">
-                <table role="presentation" style="width:100%;border:none;border-spacing:0;">
-                    <tr>
-                        <td align="center" style="padding:20px 0;">
-                            <!--[if mso]>
-                            <table role="presentation" align="center" style="width:600px;">
-                            <tr>
-                            <td>
-                            <![endif]-->
-                            <table role="presentation" style="width:94%;max-width:600px;border:none;border-spacing:0;text-align:left;font-family:Arial,sans-serif;font-size:16px;line-height:22px;color:#363636;">
-                                <!-- Header with Outlook-compatible background -->
-                                <tr>
-                                    <td style="padding:0;background:#62B5E5;">
-                                        <!--[if mso]>
-                                        <v:rect xmlns:v="urn:schemas-microsoft-com:vml" fill="true" stroke="false" style="width:600px;height:120px;">
-                                            <v:fill type="gradient" color="#62B5E5" color2="#315B73" angle="135"/>
-                                            <v:textbox inset="0,0,0,0">
-                                        <![endif]-->
-                                        <div style="padding:40px 30px;text-align:center;">
-                                            <h1 style="margin:0;font-size:28px;line-height:36px;color:#ffffff;font-weight:bold;">Welcome to COV Tweet League!</h1>
-                                        </div>
-                                        <!--[if mso]>
-                                            </v:textbox>
-                                        </v:rect>
-                                        <![endif]-->
-                                    </td>
-                                </tr>
-                                <!-- Content -->
-                                <tr>
-                                    <td style="padding:30px;background:#ffffff;">
-                                        <h2 style="margin:0 0 20px 0;font-size:20px;line-height:28px;color:#333333;">Hi {username},</h2>
-                                        <p style="margin:0 0 20px 0;">Welcome to the Coventry City prediction game!</p>
-                                        <p style="margin:0 0 20px 0;">To get started and make your first prediction, please confirm your email address by clicking the button below:</p>
-                                        
-                                        <!-- Button with VML fallback -->
-                                        <table role="presentation" style="width:100%;border:none;border-spacing:0;margin:30px 0;">
-                                            <tr>
-                                                <td align="center">
-                                                    <!--[if mso]>
-                                                    <v:roundrect xmlns:v="urn:schemas-microsoft-com:vml" xmlns:w="urn:schemas-microsoft-com:office:word" href="{verification_url}" style="height:50px;v-text-anchor:middle;width:250px;" arcsize="10%" stroke="f" fillcolor="#62B5E5">
-                                                        <w:anchorlock/>
-                                                        <center style="color:#ffffff;font-family:sans-serif;font-size:16px;font-weight:bold;">Confirm Email Address</center>
-                                                    </v:roundrect>
-                                                    <![endif]-->
-                                                    <!--[if !mso]><!-->
-                                                    <a href="{verification_url}" style="display:inline-block;padding:15px 30px;background-color:#62B5E5;color:#ffffff;font-weight:bold;text-decoration:none;border-radius:5px;font-size:16px;">Confirm Email Address</a>
-                                                    <!--<![endif]-->
-                                                </td>
-                                            </tr>
-                                        </table>
-                                        
-                                        <p style="margin:20px 0;font-size:14px;line-height:20px;">Or copy and paste this link into your browser:</p>
-                                        <p style="margin:0 0 20px 0;padding:12px;background-color:#f4f4f4;border-radius:4px;word-break:break-all;font-size:12px;font-family:monospace;">{verification_url}</p>
-                                        <p style="margin:0 0 20px 0;font-size:14px;color:#666666;">This link will expire in 24 hours.</p>
-                                        <p style="margin:0;font-size:14px;color:#666666;">If you didn't create an account, you can safely ignore this email.</p>
-                                    </td>
-                                </tr>
-                                <!-- Footer -->
-                                <tr>
-                                    <td style="padding:20px;text-align:center;font-size:12px;background-color:#f4f4f4;color:#666666;">
-                                        <p style="margin:0;">© 2025 COV Tweet League. All rights reserved.</p>
-                                        <p style="margin:5px 0 0 0;">
-                                            <a href="https://twitter.com/covtweetleague" style="color:#62B5E5;text-decoration:none;">@covtweetleague</a>
-                                        </p>
-                                    </td>
-                                </tr>
-                            </table>
-                            <!--[if mso]>
-                            </td>
-                            </tr>
-                            </table>
-                            <![endif]-->
-                        </td>
-                    </tr>
-                </table>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"""
-        Welcome to Tweet League!
-        
-        Hi {username},
-        
-        Thanks for signing up! Please verify your email address by clicking the link below:
-        
-        {verification_url}
-        
-        This link will expire in 24 hours.
-        
-        If you didn't create an account, you can safely ignore this email.
-        
-        © 2025 Tweet League
-        """
-        
-        return self.send_email(to_email, subject, html_content, text_content)
+        return OutgoingEmail(
+            to_email,
+            "Welcome to Tweet League - Please confirm your email",
+            VERIFICATION_HTML.render(username=username, verification_url=verification_url),
+            VERIFICATION_TEXT.render(username=username, verification_url=verification_url)
+        )
     
     def send_password_reset_email(self, to_email: str, username: str, reset_token: str) -> bool:
         """Send password reset email"""
+        return self.send_email(*self.password_reset_email(to_email, username, reset_token))
+    
+    def password_reset_email(self, to_email: str, username: str, reset_token: str) -> OutgoingEmail:
+        """Render the password reset message"""
         reset_url = f"{self.frontend_url}/reset-password?token={reset_token}"
         
-        subject = "Reset your Tweet League password"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width,initial-scale=1">
-            <meta name="x-apple-disable-message-reformatting">
-            <!--[if mso]>
-            <noscript>
-                <xml>
-                    <o:OfficeDocumentSettings>
-                        <o:PixelsPerInch>96</o:PixelsPerInch>
-                    </o:OfficeDocumentSettings>
-                </xml>
-            </noscript>
-            <![endif]-->
-            <style>
-                table, td, div, h1, p {{font-family: Arial, sans-serif;}}
-            </style>
-        </head>
-        <body style="margin:0;padding:0;word-spacing:normal;background-color:#f4f4f4;">
-            <div role="article" aria-roledescription="email" lang="en" style="text-size-adjust:100%;-webkit-text-size-adjust:100%;-ms-text-size-adjust:100%;background-color:#f4f4f4;">
-                <table role="presentation" style="width:100%;border:none;border-spacing:0;">
-                    <tr>
-                        <td align="center" style="padding:20px 0;">
-                            <table role="presentation" style="width:94%;max-width:600px;border:none;border-spacing:0;text-align:left;font-family:Arial,sans-serif;font-size:16px;line-height:22px;color:#363636;">
-                                <!-- Header -->
-                                <tr>
-                                    <td style="padding:0;background:#62B5E5;">
-                                        <!--[if mso]>
-                                        <v:rect xmlns:v="urn:schemas-microsoft-com:vml" fill="true" stroke="false" style="width:600px;height:120px;">
-                                            <v:fill type="gradient" color="#62B5E5" color2="#315B73" angle="135"/>
-                                            <v:textbox inset="0,0,0,0">
-                                        <![endif]-->
-                                        <div style="padding:40px 30px;text-align:center;">
-                                            <h1 style="margin:0;font-size:28px;line-height:36px;color:#ffffff;font-weight:bold;">Password Reset Request</h1>
-                                        </div>
-                                        <!--[if mso]>
-                                            </v:textbox>
-                                        </v:rect>
-                                        <![endif]-->
-                                    </td>
-                                </tr>
-                                <!-- Content -->
-                                <tr>
-                                    <td style="padding:30px;background:#ffffff;">
-                                        <h2 style="margin:0 0 20px 0;font-size:20px;line-height:28px;color:#333333;">Hi {username},</h2>
-                                        <p style="margin:0 0 20px 0;">We received a request to reset your password. Click the button below to create a new password:</p>
-                                        
-                                        <!-- Button -->
-                                        <table role="presentation" style="width:100%;border:none;border-spacing:0;margin:30px 0;">
-                                            <tr>
-                                                <td align="center">
-                                                    <!--[if mso]>
-                                                    <v:roundrect xmlns:v="urn:schemas-microsoft-com:vml" xmlns:w="urn:schemas-microsoft-com:office:word" href="{reset_url}" style="height:50px;v-text-anchor:middle;width:200px;" arcsize="10%" stroke="f" fillcolor="#62B5E5">
-                                                        <w:anchorlock/>
-                                                        <center style="color:#ffffff;font-family:sans-serif;font-size:16px;font-weight:bold;">Reset Password</center>
-                                                    </v:roundrect>
-                                                    <![endif]-->
-                                                    <!--[if !mso]><!-->
-                                                    <a href="{reset_url}" style="display:inline-block;padding:15px 30px;background-color:#62B5E5;color:#ffffff;font-weight:bold;text-decoration:none;border-radius:5px;font-size:16px;">Reset Password</a>
-                                                    <!--<![endif]-->
-                                                </td>
-                                            </tr>
-                                        </table>
-                                        
-                                        <p style="margin:20px 0;font-size:14px;line-height:20px;">Or copy and paste this link into your browser:</p>
-                                        <p style="margin:0 0 20px 0;padding:12px;background-color:#f4f4f4;border-radius:4px;word-break:break-all;font-size:12px;font-family:monospace;">{reset_url}</p>
-                                        <p style="margin:0 0 20px 0;font-size:14px;color:#666666;">This link will expire in 1 hour.</p>
-                                        <p style="margin:0;font-size:14px;color:#666666;">If you didn't request a password reset, you can safely ignore this email.</p>
-                                    </td>
-                                </tr>
-                                <!-- Footer -->
-                                <tr>
-                                    <td style="padding:20px;text-align:center;font-size:12px;background-color:#f4f4f4;color:#666666;">
-                                        <p style="margin:0;">© 2025 COV Tweet League. All rights reserved.</p>
-                                    </td>
-                                </tr>
-                            </table>
-                        </td>
-                    </tr>
-                </table>
-            </div>
-        </body>
-        </html>
-        """
-        
-        text_content = f"""
-        Password Reset Request
-        
-        Hi {username},
-        
-        We received a request to reset your password. Click the link below to create a new password:
-        
-        {reset_url}
-        
-        This link will expire in 1 hour.
-        
-        If you didn't request a password reset, you can safely ignore this email.
-        
-        © 2025 Tweet League
-        """
-        
-        return self.send_email(to_email, subject, html_content, text_content)
+        return OutgoingEmail(
+            to_email,
+            "Reset your Tweet League password",
+            PASSWORD_RESET_HTML.render(username=username, reset_url=reset_url),
+            PASSWORD_RESET_TEXT.render(username=username, reset_url=reset_url)
+        )
     
     def send_fixture_reminder_email(self, to_email: str, username: str, fixture_details: dict) -> bool:
         """Send fixture reminder email"""
         logger.info(f"Sending fixture reminder to {to_email} for fixture {fixture_details['home_team']} vs {fixture_details['away_team']}")
-        
-        prediction_url = f"{self.frontend_url}"
-        
-        subject = f"⚽ Don't forget to predict: {fixture_details['home_team']} vs {fixture_details['away_team']}"
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width,initial-scale=1">
-            <meta name="x-apple-disable-message-reformatting">
-            <!--[if mso]>
-            <noscript>
-                <xml>
-                    <o:OfficeDocumentSettings>
-                        <o:PixelsPerInch>96</o:PixelsPerInch>
-                    </o:OfficeDocumentSettings>
-                </xml>
-            </noscript>
-            <![endif]-->
-            <style>
-                table, td, div, h1, p {{font-family: Arial, sans-serif;}}
-            </style>
-        </head>
-        <body style="margin:0;padding:0;word-spacing:normal;background-color:#f4f4f4;">
-            <div role="article" aria-roledescription="email" lang="en" style="text-size-adjust:100%;-webkit-text-size-adjust:100%;-ms-text-size-adjust:100%;background-color:#f4f4f4;">
-                <table role="presentation" style="width:100%;border:none;border-spacing:0;">
-                    <tr>
-                        <td align="center" style="padding:20px 0;">
-                            <!--[if mso]>
-                            <table role="presentation" align="center" style="width:600px;">
-                            <tr>
-                            <td>
-                            <![endif]-->
-                            <table role="presentation" style="width:94%;max-width:600px;border:none;border-spacing:0;text-align:left;font-family:Arial,sans-serif;font-size:16px;line-height:22px;color:#363636;">
-                                <!-- Header with Outlook-compatible background -->
-                                <tr>
-                                    <td style="padding:0;background:#62B5E5;">
-                                        <!--[if mso]>
-                                        <v:rect xmlns:v="urn:schemas-microsoft-com:vml" fill="true" stroke="false" style="width:600px;height:120px;">
-                                            <v:fill type="gradient" color="#62B5E5" color2="#315B73" angle="135"/>
-                                            <v:textbox inset="0,0,0,0">
-                                        <![endif]-->
-                                        <div style="padding:40px 30px;text-align:center;">
-                                            <h1 style="margin:0;font-size:28px;line-height:36px;color:#ffffff;font-weight:bold;">⚽ Match Prediction Reminder</h1>
-                                        </div>
-                                        <!--[if mso]>
-                                            </v:textbox>
-                                        </v:rect>
-                                        <![endif]-->
-                                    </td>
-                                </tr>
-                                <!-- Content -->
-                                <tr>
-                                    <td style="padding:30px;background:#ffffff;">
-                                        <h2 style="margin:0 0 20px 0;font-size:20px;line-height:28px;color:#333333;">Hi {username},</h2>
-                                        <p style="margin:0 0 20px 0;">Don't forget to make your prediction for the upcoming match!</p>
-                                        
-                                        <!-- Match Details Box -->
-                                        <div style="background-color:#f8f9fa;border-left:4px solid #62B5E5;padding:20px;margin:20px 0;border-radius:5px;">
-                                            <h3 style="margin:0 0 15px 0;color:#333;font-size:18px;">📅 {fixture_details['home_team']} vs {fixture_details['away_team']}</h3>
-                                            <p style="margin:5px 0;color:#666;"><strong>Competition:</strong> {fixture_details['competition']}</p>
-                                            <p style="margin:5px 0;color:#666;"><strong>Kick-off:</strong> {fixture_details['kickoff_time']}</p>
-                                            <p style="margin:15px 0 0 0;color:#d9534f;font-weight:bold;">⏰ Deadline: 5 minutes before kick-off</p>
-                                        </div>
-                                        
-                                        <p style="margin:20px 0;">Remember: You can earn <strong>3 points</strong> for a perfect score or <strong>1 point</strong> for the correct result!</p>
-                                        
-                                        <!-- Button with VML fallback -->
-                                        <table role="presentation" style="width:100%;border:none;border-spacing:0;margin:30px 0;">
-                                            <tr>
-                                                <td align="center">
-                                                    <!--[if mso]>
-                                                    <v:roundrect xmlns:v="urn:schemas-microsoft-com:vml" xmlns:w="urn:schemas-microsoft-com:office:word" href="{prediction_url}" style="height:50px;v-text-anchor:middle;width:200px;" arcsize="10%" stroke="f" fillcolor="#62B5E5">
-                                                        <w:anchorlock/>
-                                                        <center style="color:#ffffff;font-family:sans-serif;font-size:16px;font-weight:bold;">Make Your Prediction</center>
-                                                    </v:roundrect>
-                                                    <![endif]-->
-                                                    <!--[if !mso]><!-->
-                                                    <a href="{prediction_url}" style="display:inline-block;padding:15px 30px;background-color:#62B5E5;color:#ffffff;font-weight:bold;text-decoration:none;border-radius:5px;font-size:16px;">Make Your Prediction</a>
-                                                    <!--<![endif]-->
-                                                </td>
-                                            </tr>
-                                        </table>
-                                        
-                                        <p style="margin:20px 0;font-size:14px;color:#666666;">Good luck! 🍀</p>
-                                    </td>
-                                </tr>
-                                <!-- Footer -->
-                                <tr>
-                                    <td style="padding:20px;text-align:center;font-size:12px;background-color:#f4f4f4;color:#666666;">
-                                        <p style="margin:0;">© 2025 COV Tweet League. All rights reserved.</p>
-                                        <p style="margin:5px 0 0 0;">
-                                            <a href="https://twitter.com/covtweetleague" style="color:#62B5E5;text-decoration:none;">@covtweetleague</a>
-                                        </p>
-                                        <p style="margin:10px 0 0 0;font-size:11px;">
-                                            You're receiving this because you haven't made a prediction for an upcoming match.
-                                        </p>
-                                    </td>
-                                </tr>
-                            </table>
-                            <!--[if mso]>
-                            </td>
-                            </tr>
-                            </table>
-                            <![endif]-->
-                        </td>
-                    </tr>
-                </table>
-            </div>
-        </body>
-        </html>
+        return self.send_email(*self.fixture_reminder_email(to_email, username, fixture_details))
+    
+    def fixture_reminder_email(self, to_email: str, username: str, fixture_details: dict) -> OutgoingEmail:
+        """Render a fixture reminder, for send_fixture_reminder_email or a send_bulk batch"""
+        subject, html, text = self.fixture_reminder_templates(
+            fixture_details['home_team'],
+            fixture_details['away_team'],
+            fixture_details['competition'],
+            fixture_details['kickoff_time']
+        )
+        return OutgoingEmail(to_email, subject, html.render(username=username), text.render(username=username))
+    
+    @functools.lru_cache(maxsize=32)
+    def fixture_reminder_templates(self, home_team: str, away_team: str, competition: str, kickoff_time: str) -> Tuple[str, EmailTemplate, EmailTemplate]:
         """
-        
-        text_content = f"""
-        Match Prediction Reminder
-        
-        Hi {username},
-        
-        Don't forget to make your prediction for:
-        
-        {fixture_details['home_team']} vs {fixture_details['away_team']}
-        Competition: {fixture_details['competition']}
-        Kick-off: {fixture_details['kickoff_time']}
-        
-        Deadline: 5 minutes before kick-off
-        
-        Make your prediction at: {prediction_url}
-        
-        Remember: You can earn 3 points for a perfect score or 1 point for the correct result!
-        
-        Good luck!
-        
-        © 2025 COV Tweet League
+        The reminder subject, and its bodies with everything but the username
+        filled in. Cached, so a blast renders the fixture section once.
         """
-        
-        return self.send_email(to_email, subject, html_content, text_content)
+        values = {
+            'home_team': home_team,
+            'away_team': away_team,
+            'competition': competition,
+            'kickoff_time': kickoff_time,
+            'prediction_url': self.frontend_url
+        }
+        return (
+            FIXTURE_REMINDER_SUBJECT.render(**values),
+            FIXTURE_REMINDER_HTML.partial(**values),
+            FIXTURE_REMINDER_TEXT.partial(**values)
+        )
 
 email_service = EmailService()
\ No newline at end of file
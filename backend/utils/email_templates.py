@@ -0,0 +1,410 @@
+"""
+Email bodies, compiled once at import.
+
+Each template is a string.Template source split up front into literal chunks
+and ${placeholder} names, so rendering a message is a single join rather than
+re-scanning 100+ lines of markup. partial() fills in some placeholders ahead of
+time: a reminder blast renders the fixture section once and only substitutes
+the username per recipient.
+"""
+import string
+from typing import List
+
+class EmailTemplate:
+    """A string.Template source pre-split into literals and placeholder names"""
+    def __init__(self, source: str):
+        literals = [""]
+        names = []
+        position = 0
+        for match in string.Template.pattern.finditer(source):
+            literals[-1] += source[position:match.start()]
+            position = match.end()
+            if match.group("escaped") is not None:
+                literals[-1] += "$"
+            elif match.group("named") or match.group("braced"):
+                names.append(match.group("named") or match.group("braced"))
+                literals.append("")
+            else:
+                raise ValueError(f"Invalid placeholder in email template at position {match.start()}")
+        literals[-1] += source[position:]
+        self._set_parts(literals, names)
+
+    def _set_parts(self, literals: List[str], names: List[str]):
+        self.names = tuple(names)
+        # Literals at even indexes, placeholder slots at odd ones
+        self._parts = [None] * (2 * len(names) + 1)
+        self._parts[0::2] = literals
+
+    def render(self, **values) -> str:
+        """Substitute every placeholder; a missing value raises KeyError like Template.substitute"""
+        parts = self._parts.copy()
+        parts[1::2] = [str(values[name]) for name in self.names]
+        return "".join(parts)
+
+    def partial(self, **values) -> "EmailTemplate":
+        """Substitute the given placeholders and return a template for the rest"""
+        literals = [self._parts[0]]
+        names = []
+        for name, literal in zip(self.names, self._parts[2::2]):
+            if name in values:
+                literals[-1] += str(values[name]) + literal
+            else:
+                names.append(name)
+                literals.append(literal)
+        template = EmailTemplate.__new__(EmailTemplate)
+        template._set_parts(literals, names)
+        return template
+
+FIXTURE_REMINDER_SUBJECT = EmailTemplate("⚽ Don't forget to predict: ${home_team} vs ${away_team}")
+
+VERIFICATION_HTML = EmailTemplate("""
+        <!DOCTYPE html>
+        <html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width,initial-scale=1">
+            <meta name="x-apple-disable-message-reformatting">
+            <!--[if mso]>
+            <noscript>
+                <xml>
+                    <o:OfficeDocumentSettings>
+                        <o:PixelsPerInch>96</o:PixelsPerInch>
+                    </o:OfficeDocumentSettings>
+                </xml>
+            </noscript>
+            <![endif]-->
+            <style>
+                table, td, div, h1, p {font-family: Arial, sans-serif;}
+            </style>
+        </head>
+        <body style="margin:0;padding:0;word-spacing:normal;background-color:#f4f4f4;">
+            <div role="article" aria-roledescription="email" lang="en" style="text-size-adjust:100%;-webkit-text-size-adjust:100%;-ms-text-size-adjust:100%;background-color:#f4f4f4;">
+                <table role="presentation" style="width:100%;border:none;border-spacing:0;">
+                    <tr>
+                        <td align="center" style="padding:20px 0;">
+                            <!--[if mso]>
+                            <table role="presentation" align="center" style="width:600px;">
+                            <tr>
+                            <td>
+                            <![endif]-->
+                            <table role="presentation" style="width:94%;max-width:600px;border:none;border-spacing:0;text-align:left;font-family:Arial,sans-serif;font-size:16px;line-height:22px;color:#363636;">
+                                <!-- Header with Outlook-compatible background -->
+                                <tr>
+                                    <td style="padding:0;background:#62B5E5;">
+                                        <!--[if mso]>
+                                        <v:rect xmlns:v="urn:schemas-microsoft-com:vml" fill="true" stroke="false" style="width:600px;height:120px;">
+                                            <v:fill type="gradient" color="#62B5E5" color2="#315B73" angle="135"/>
+                                            <v:textbox inset="0,0,0,0">
+                                        <![endif]-->
+                                        <div style="padding:40px 30px;text-align:center;">
+                                            <h1 style="margin:0;font-size:28px;line-height:36px;color:#ffffff;font-weight:bold;">Welcome to COV Tweet League!</h1>
+                                        </div>
+                                        <!--[if mso]>
+                                            </v:textbox>
+                                        </v:rect>
+                                        <![endif]-->
+                                    </td>
+                                </tr>
+                                <!-- Content -->
+                                <tr>
+                                    <td style="padding:30px;background:#ffffff;">
+                                        <h2 style="margin:0 0 20px 0;font-size:20px;line-height:28px;color:#333333;">Hi ${username},</h2>
+                                        <p style="margin:0 0 20px 0;">Welcome to the Coventry City prediction game!</p>
+                                        <p style="margin:0 0 20px 0;">To get started and make your first prediction, please confirm your email address by clicking the button below:</p>
+                                        
+                                        <!-- Button with VML fallback -->
+                                        <table role="presentation" style="width:100%;border:none;border-spacing:0;margin:30px 0;">
+                                            <tr>
+                                                <td align="center">
+                                                    <!--[if mso]>
+                                                    <v:roundrect xmlns:v="urn:schemas-microsoft-com:vml" xmlns:w="urn:schemas-microsoft-com:office:word" href="${verification_url}" style="height:50px;v-text-anchor:middle;width:250px;" arcsize="10%" stroke="f" fillcolor="#62B5E5">
+                                                        <w:anchorlock/>
+                                                        <center style="color:#ffffff;font-family:sans-serif;font-size:16px;font-weight:bold;">Confirm Email Address</center>
+                                                    </v:roundrect>
+                                                    <![endif]-->
+                                                    <!--[if !mso]><!-->
+                                                    <a href="${verification_url}" style="display:inline-block;padding:15px 30px;background-color:#62B5E5;color:#ffffff;font-weight:bold;text-decoration:none;border-radius:5px;font-size:16px;">Confirm Email Address</a>
+                                                    <!--<![endif]-->
+                                                </td>
+                                            </tr>
+                                        </table>
+                                        
+                                        <p style="margin:20px 0;font-size:14px;line-height:20px;">Or copy and paste this link into your browser:</p>
+                                        <p style="margin:0 0 20px 0;padding:12px;background-color:#f4f4f4;border-radius:4px;word-break:break-all;font-size:12px;font-family:monospace;">${verification_url}</p>
+                                        <p style="margin:0 0 20px 0;font-size:14px;color:#666666;">This link will expire in 24 hours.</p>
+                                        <p style="margin:0;font-size:14px;color:#666666;">If you didn't create an account, you can safely ignore this email.</p>
+                                    </td>
+                                </tr>
+                                <!-- Footer -->
+                                <tr>
+                                    <td style="padding:20px;text-align:center;font-size:12px;background-color:#f4f4f4;color:#666666;">
+                                        <p style="margin:0;">© 2025 COV Tweet League. All rights reserved.</p>
+                                        <p style="margin:5px 0 0 0;">
+                                            <a href="https://twitter.com/covtweetleague" style="color:#62B5E5;text-decoration:none;">@covtweetleague</a>
+                                        </p>
+                                    </td>
+                                </tr>
+                            </table>
+                            <!--[if mso]>
+                            </td>
+                            </tr>
+                            </table>
+                            <![endif]-->
+                        </td>
+                    </tr>
+                </table>
+            </div>
+        </body>
+        </html>
+        """)
+
+VERIFICATION_TEXT = EmailTemplate("""
+        Welcome to Tweet League!
+        
+        Hi ${username},
+        
+        Thanks for signing up! Please verify your email address by clicking the link below:
+        
+        ${verification_url}
+        
+        This link will expire in 24 hours.
+        
+        If you didn't create an account, you can safely ignore this email.
+        
+        © 2025 Tweet League
+        """)
+
+PASSWORD_RESET_HTML = EmailTemplate("""
+        <!DOCTYPE html>
+        <html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width,initial-scale=1">
+            <meta name="x-apple-disable-message-reformatting">
+            <!--[if mso]>
+            <noscript>
+                <xml>
+                    <o:OfficeDocumentSettings>
+                        <o:PixelsPerInch>96</o:PixelsPerInch>
+                    </o:OfficeDocumentSettings>
+                </xml>
+            </noscript>
+            <![endif]-->
+            <style>
+                table, td, div, h1, p {font-family: Arial, sans-serif;}
+            </style>
+        </head>
+        <body style="margin:0;padding:0;word-spacing:normal;background-color:#f4f4f4;">
+            <div role="article" aria-roledescription="email" lang="en" style="text-size-adjust:100%;-webkit-text-size-adjust:100%;-ms-text-size-adjust:100%;background-color:#f4f4f4;">
+                <table role="presentation" style="width:100%;border:none;border-spacing:0;">
+                    <tr>
+                        <td align="center" style="padding:20px 0;">
+                            <table role="presentation" style="width:94%;max-width:600px;border:none;border-spacing:0;text-align:left;font-family:Arial,sans-serif;font-size:16px;line-height:22px;color:#363636;">
+                                <!-- Header -->
+                                <tr>
+                                    <td style="padding:0;background:#62B5E5;">
+                                        <!--[if mso]>
+                                        <v:rect xmlns:v="urn:schemas-microsoft-com:vml" fill="true" stroke="false" style="width:600px;height:120px;">
+                                            <v:fill type="gradient" color="#62B5E5" color2="#315B73" angle="135"/>
+                                            <v:textbox inset="0,0,0,0">
+                                        <![endif]-->
+                                        <div style="padding:40px 30px;text-align:center;">
+                                            <h1 style="margin:0;font-size:28px;line-height:36px;color:#ffffff;font-weight:bold;">Password Reset Request</h1>
+                                        </div>
+                                        <!--[if mso]>
+                                            </v:textbox>
+                                        </v:rect>
+                                        <![endif]-->
+                                    </td>
+                                </tr>
+                                <!-- Content -->
+                                <tr>
+                                    <td style="padding:30px;background:#ffffff;">
+                                        <h2 style="margin:0 0 20px 0;font-size:20px;line-height:28px;color:#333333;">Hi ${username},</h2>
+                                        <p style="margin:0 0 20px 0;">We received a request to reset your password. Click the button below to create a new password:</p>
+                                        
+                                        <!-- Button -->
+                                        <table role="presentation" style="width:100%;border:none;border-spacing:0;margin:30px 0;">
+                                            <tr>
+                                                <td align="center">
+                                                    <!--[if mso]>
+                                                    <v:roundrect xmlns:v="urn:schemas-microsoft-com:vml" xmlns:w="urn:schemas-microsoft-com:office:word" href="${reset_url}" style="height:50px;v-text-anchor:middle;width:200px;" arcsize="10%" stroke="f" fillcolor="#62B5E5">
+                                                        <w:anchorlock/>
+                                                        <center style="color:#ffffff;font-family:sans-serif;font-size:16px;font-weight:bold;">Reset Password</center>
+                                                    </v:roundrect>
+                                                    <![endif]-->
+                                                    <!--[if !mso]><!-->
+                                                    <a href="${reset_url}" style="display:inline-block;padding:15px 30px;background-color:#62B5E5;color:#ffffff;font-weight:bold;text-decoration:none;border-radius:5px;font-size:16px;">Reset Password</a>
+                                                    <!--<![endif]-->
+                                                </td>
+                                            </tr>
+                                        </table>
+                                        
+                                        <p style="margin:20px 0;font-size:14px;line-height:20px;">Or copy and paste this link into your browser:</p>
+                                        <p style="margin:0 0 20px 0;padding:12px;background-color:#f4f4f4;border-radius:4px;word-break:break-all;font-size:12px;font-family:monospace;">${reset_url}</p>
+                                        <p style="margin:0 0 20px 0;font-size:14px;color:#666666;">This link will expire in 1 hour.</p>
+                                        <p style="margin:0;font-size:14px;color:#666666;">If you didn't request a password reset, you can safely ignore this email.</p>
+                                    </td>
+                                </tr>
+                                <!-- Footer -->
+                                <tr>
+                                    <td style="padding:20px;text-align:center;font-size:12px;background-color:#f4f4f4;color:#666666;">
+                                        <p style="margin:0;">© 2025 COV Tweet League. All rights reserved.</p>
+                                    </td>
+                                </tr>
+                            </table>
+                        </td>
+                    </tr>
+                </table>
+            </div>
+        </body>
+        </html>
+        """)
+
+PASSWORD_RESET_TEXT = EmailTemplate("""
+        Password Reset Request
+        
+        Hi ${username},
+        
+        We received a request to reset your password. Click the link below to create a new password:
+        
+        ${reset_url}
+        
+        This link will expire in 1 hour.
+        
+        If you didn't request a password reset, you can safely ignore this email.
+        
+        © 2025 Tweet League
+        """)
+
+FIXTURE_REMINDER_HTML = EmailTemplate("""
+        <!DOCTYPE html>
+        <html lang="en" xmlns="http://www.w3.org/1999/xhtml" xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office">
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width,initial-scale=1">
+            <meta name="x-apple-disable-message-reformatting">
+            <!--[if mso]>
+            <noscript>
+                <xml>
+                    <o:OfficeDocumentSettings>
+                        <o:PixelsPerInch>96</o:PixelsPerInch>
+                    </o:OfficeDocumentSettings>
+                </xml>
+            </noscript>
+            <![endif]-->
+            <style>
+                table, td, div, h1, p {font-family: Arial, sans-serif;}
+            </style>
+        </head>
+        <body style="margin:0;padding:0;word-spacing:normal;background-color:#f4f4f4;">
+            <div role="article" aria-roledescription="email" lang="en" style="text-size-adjust:100%;-webkit-text-size-adjust:100%;-ms-text-size-adjust:100%;background-color:#f4f4f4;">
+                <table role="presentation" style="width:100%;border:none;border-spacing:0;">
+                    <tr>
+                        <td align="center" style="padding:20px 0;">
+                            <!--[if mso]>
+                            <table role="presentation" align="center" style="width:600px;">
+                            <tr>
+                            <td>
+                            <![endif]-->
+                            <table role="presentation" style="width:94%;max-width:600px;border:none;border-spacing:0;text-align:left;font-family:Arial,sans-serif;font-size:16px;line-height:22px;color:#363636;">
+                                <!-- Header with Outlook-compatible background -->
+                                <tr>
+                                    <td style="padding:0;background:#62B5E5;">
+                                        <!--[if mso]>
+                                        <v:rect xmlns:v="urn:schemas-microsoft-com:vml" fill="true" stroke="false" style="width:600px;height:120px;">
+                                            <v:fill type="gradient" color="#62B5E5" color2="#315B73" angle="135"/>
+                                            <v:textbox inset="0,0,0,0">
+                                        <![endif]-->
+                                        <div style="padding:40px 30px;text-align:center;">
+                                            <h1 style="margin:0;font-size:28px;line-height:36px;color:#ffffff;font-weight:bold;">⚽ Match Prediction Reminder</h1>
+                                        </div>
+                                        <!--[if mso]>
+                                            </v:textbox>
+                                        </v:rect>
+                                        <![endif]-->
+                                    </td>
+                                </tr>
+                                <!-- Content -->
+                                <tr>
+                                    <td style="padding:30px;background:#ffffff;">
+                                        <h2 style="margin:0 0 20px 0;font-size:20px;line-height:28px;color:#333333;">Hi ${username},</h2>
+                                        <p style="margin:0 0 20px 0;">Don't forget to make your prediction for the upcoming match!</p>
+                                        
+                                        <!-- Match Details Box -->
+                                        <div style="background-color:#f8f9fa;border-left:4px solid #62B5E5;padding:20px;margin:20px 0;border-radius:5px;">
+                                            <h3 style="margin:0 0 15px 0;color:#333;font-size:18px;">📅 ${home_team} vs ${away_team}</h3>
+                                            <p style="margin:5px 0;color:#666;"><strong>Competition:</strong> ${competition}</p>
+                                            <p style="margin:5px 0;color:#666;"><strong>Kick-off:</strong> ${kickoff_time}</p>
+                                            <p style="margin:15px 0 0 0;color:#d9534f;font-weight:bold;">⏰ Deadline: 5 minutes before kick-off</p>
+                                        </div>
+                                        
+                                        <p style="margin:20px 0;">Remember: You can earn <strong>3 points</strong> for a perfect score or <strong>1 point</strong> for the correct result!</p>
+                                        
+                                        <!-- Button with VML fallback -->
+                                        <table role="presentation" style="width:100%;border:none;border-spacing:0;margin:30px 0;">
+                                            <tr>
+                                                <td align="center">
+                                                    <!--[if mso]>
+                                                    <v:roundrect xmlns:v="urn:schemas-microsoft-com:vml" xmlns:w="urn:schemas-microsoft-com:office:word" href="${prediction_url}" style="height:50px;v-text-anchor:middle;width:200px;" arcsize="10%" stroke="f" fillcolor="#62B5E5">
+                                                        <w:anchorlock/>
+                                                        <center style="color:#ffffff;font-family:sans-serif;font-size:16px;font-weight:bold;">Make Your Prediction</center>
+                                                    </v:roundrect>
+                                                    <![endif]-->
+                                                    <!--[if !mso]><!-->
+                                                    <a href="${prediction_url}" style="display:inline-block;padding:15px 30px;background-color:#62B5E5;color:#ffffff;font-weight:bold;text-decoration:none;border-radius:5px;font-size:16px;">Make Your Prediction</a>
+                                                    <!--<![endif]-->
+                                                </td>
+                                            </tr>
+                                        </table>
+                                        
+                                        <p style="margin:20px 0;font-size:14px;color:#666666;">Good luck! 🍀</p>
+                                    </td>
+                                </tr>
+                                <!-- Footer -->
+                                <tr>
+                                    <td style="padding:20px;text-align:center;font-size:12px;background-color:#f4f4f4;color:#666666;">
+                                        <p style="margin:0;">© 2025 COV Tweet League. All rights reserved.</p>
+                                        <p style="margin:5px 0 0 0;">
+                                            <a href="https://twitter.com/covtweetleague" style="color:#62B5E5;text-decoration:none;">@covtweetleague</a>
+                                        </p>
+                                        <p style="margin:10px 0 0 0;font-size:11px;">
+                                            You're receiving this because you haven't made a prediction for an upcoming match.
+                                        </p>
+                                    </td>
+                                </tr>
+                            </table>
+                            <!--[if mso]>
+                            </td>
+                            </tr>
+                            </table>
+                            <![endif]-->
+                        </td>
+                    </tr>
+                </table>
+            </div>
+        </body>
+        </html>
+        """)
+
+FIXTURE_REMINDER_TEXT = EmailTemplate("""
+        Match Prediction Reminder
+        
+        Hi ${username},
+        
+        Don't forget to make your prediction for:
+        
+        ${home_team} vs ${away_team}
+        Competition: ${competition}
+        Kick-off: ${kickoff_time}
+        
+        Deadline: 5 minutes before kick-off
+        
+        Make your prediction at: ${prediction_url}
+        
+        Remember: You can earn 3 points for a perfect score or 1 point for the correct result!
+        
+        Good luck!
+        
+        © 2025 COV Tweet League
+        """)
@@ -2,13 +2,86 @@
 Utility functions for calculating and updating leaderboard positions
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, case, update, select, and_
+from concurrent.futures import ProcessPoolExecutor
 from models.models import UserStats, Season, User
 from models.mini_leagues import MiniLeague, MiniLeagueMember
+import multiprocessing
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Worker processes for mini league recalculation. Defaults to 1 (in-process) because web
+# workers recalculate after scoring; the position script can raise it for thousands of leagues.
+MINI_LEAGUE_POSITION_WORKERS = int(os.getenv("MINI_LEAGUE_POSITION_WORKERS", "1"))
+PARALLEL_LEAGUE_THRESHOLD = int(os.getenv("PARALLEL_LEAGUE_THRESHOLD", "500"))
+
+def ranking_values(stat):
+    """Return the (predictions_made, total_points, correct_scores, correct_results) tuple used for ranking"""
+    return (stat.predictions_made, stat.total_points, stat.correct_scores, stat.correct_results)
+
+def ranking_sort_key(values, username):
+    """Python equivalent of the leaderboard ORDER BY for in-memory sorting"""
+    predictions_made, total_points, correct_scores, correct_results = values
+    return (predictions_made == 0, -total_points, -correct_scores, -correct_results, username)
+
+def ranking_order(predictions_made, total_points, correct_scores, correct_results):
+    """
+    SQL ORDER BY clauses for ranking columns given in ranking_values order,
+    e.g. ranking_order(*ranking_values(UserStats))
+    """
+    return (desc(predictions_made > 0), desc(total_points), desc(correct_scores), desc(correct_results))
+
+def ranking_position(ranking_columns, partition_by=None):
+    """
+    SQL rank() window over ranking columns giving the same positions as calculate_positions.
+    Tie-breakers are ignored for users without predictions so they all share one position.
+    """
+    predictions_made, *tie_breakers = ranking_columns
+    has_predictions = predictions_made > 0
+    tie_breakers = [case((has_predictions, column), else_=0) for column in tie_breakers]
+    return func.rank().over(partition_by=partition_by, order_by=ranking_order(predictions_made, *tie_breakers))
+
+def mini_league_standings(mini_league_id: int, season_id: int):
+    """
+    Subquery of (user_id, position) for the members of a mini league with stats in a season,
+    ranked live by the leaderboard rules so it never depends on stored positions
+    """
+    return select(
+        UserStats.user_id,
+        ranking_position(ranking_values(UserStats)).label("position")
+    ).join(
+        MiniLeagueMember, and_(
+            MiniLeagueMember.user_id == UserStats.user_id,
+            MiniLeagueMember.mini_league_id == mini_league_id
+        )
+    ).where(UserStats.season_id == season_id).subquery()
+
+def calculate_positions(ordered_values):
+    """
+    Assign positions to ranking tuples that are already in leaderboard order.
+    Tied users share a position and the next user skips ahead (1, 1, 3).
+    Users with no predictions all share the position after the last predictor.
+    """
+    users_with_predictions = sum(1 for values in ordered_values if values[0] > 0)
+    
+    positions = []
+    current_position = 1
+    last_values = None
+    for index, values in enumerate(ordered_values):
+        if values[0] == 0:
+            positions.append(users_with_predictions + 1)
+        elif last_values is not None and values[1:] == last_values[1:]:
+            # Same points, correct scores and correct results - tie
+            positions.append(current_position)
+        else:
+            current_position = index + 1
+            positions.append(current_position)
+        last_values = values
+    
+    return positions
+
 def update_all_positions(db: Session, season_id: int = None):
     """
     Calculate and update positions for all users in a season.
@@ -34,35 +107,9 @@ def update_all_positions(db: Session, season_id: int = None):
     ).all()
     
     # Calculate positions with proper tie handling
-    current_position = 1
-    last_stats = None
-    users_at_position = 0
-    
-    for i, stat in enumerate(all_stats):
-        # Check if this user has the same stats as the previous user (tie)
-        if last_stats and stat.predictions_made > 0 and last_stats.predictions_made > 0:
-            if (stat.total_points == last_stats.total_points and
-                stat.correct_scores == last_stats.correct_scores and
-                stat.correct_results == last_stats.correct_results):
-                # Same position as previous user (tie)
-                stat.position = current_position
-                users_at_position += 1
-            else:
-                # Different stats, update position
-                current_position = current_position + users_at_position
-                stat.position = current_position
-                users_at_position = 1
-        elif stat.predictions_made == 0:
-            # Users with no predictions go to the bottom
-            # Count all users with predictions > 0
-            users_with_predictions = sum(1 for s in all_stats if s.predictions_made > 0)
-            stat.position = users_with_predictions + 1
-        else:
-            # First user or first user with predictions
-            stat.position = current_position
-            users_at_position = 1
-        
-        last_stats = stat
+    positions = calculate_positions([ranking_values(stat) for stat in all_stats])
+    for stat, position in zip(all_stats, positions):
+        stat.position = position
     
     # Commit all position updates
     db.commit()
@@ -70,74 +117,27 @@ def update_all_positions(db: Session, season_id: int = None):
     logger.info(f"Updated positions for {len(all_stats)} users in season {season_id}")
     return len(all_stats)
 
-def update_mini_league_positions(db: Session, mini_league_id: int):
+def rank_league_members(leagues):
     """
-    Calculate positions for users within a specific mini league.
-    Returns a dictionary of user_id -> position within that league.
+    Rank the members of each league. Takes (league_id, [(member_id, user_id, values, username)])
+    pairs and returns (league_id, member_id, user_id, position) tuples. Pure, so it can run in
+    a worker process.
     """
-    # Get mini league
-    mini_league = db.query(MiniLeague).filter(MiniLeague.id == mini_league_id).first()
-    if not mini_league:
-        logger.warning(f"Mini league {mini_league_id} not found")
-        return {}
-    
-    # Get member IDs
-    member_ids = db.query(MiniLeagueMember.user_id).filter(
-        MiniLeagueMember.mini_league_id == mini_league_id
-    ).all()
-    member_ids = [m[0] for m in member_ids]
-    
-    if not member_ids:
-        return {}
-    
-    # Get stats for league members only
-    league_stats = db.query(UserStats).filter(
-        UserStats.season_id == mini_league.season_id,
-        UserStats.user_id.in_(member_ids)
-    ).join(User).order_by(
-        desc(UserStats.predictions_made > 0),
-        desc(UserStats.total_points),
-        desc(UserStats.correct_scores),
-        desc(UserStats.correct_results),
-        User.username
-    ).all()
-    
-    # Calculate positions within the league
-    positions = {}
-    current_position = 1
-    last_stats = None
-    users_at_position = 0
-    
-    for stat in league_stats:
-        if last_stats and stat.predictions_made > 0 and last_stats.predictions_made > 0:
-            if (stat.total_points == last_stats.total_points and
-                stat.correct_scores == last_stats.correct_scores and
-                stat.correct_results == last_stats.correct_results):
-                # Tie - same position
-                positions[stat.user_id] = current_position
-                users_at_position += 1
-            else:
-                # Different stats
-                current_position = current_position + users_at_position
-                positions[stat.user_id] = current_position
-                users_at_position = 1
-        elif stat.predictions_made == 0:
-            # No predictions - last position
-            users_with_predictions = sum(1 for s in league_stats if s.predictions_made > 0)
-            positions[stat.user_id] = users_with_predictions + 1
-        else:
-            positions[stat.user_id] = current_position
-            users_at_position = 1
-        
-        last_stats = stat
-    
-    return positions
+    results = []
+    for league_id, members in leagues:
+        members = sorted(members, key=lambda member: ranking_sort_key(member[2], member[3]))
+        positions = calculate_positions([member[2] for member in members])
+        for (member_id, user_id, _, _), position in zip(members, positions):
+            results.append((league_id, member_id, user_id, position))
+    return results
 
-def update_all_mini_league_positions(db: Session, season_id: int = None):
+def update_all_mini_league_positions(db: Session, season_id: int = None, workers: int = None):
     """
-    Update positions for all mini leagues in a season.
-    This is more complex as we need to store positions per league.
-    For now, this returns calculated positions that can be cached.
+    Recalculate and store positions for every mini league in a season.
+    Stats and memberships are each read in one scan; leagues are then ranked in memory,
+    across a process pool when workers > 1 and there are enough of them, and changed
+    positions are written back in one bulk update.
+    Returns a dictionary of league_id -> {user_id: position}.
     """
     if not season_id:
         current_season = db.query(Season).filter(Season.is_current == True).first()
@@ -145,15 +145,62 @@ def update_all_mini_league_positions(db: Session, season_id: int = None):
             return {}
         season_id = current_season.id
     
-    # Get all mini leagues for the season
-    mini_leagues = db.query(MiniLeague).filter(
-        MiniLeague.season_id == season_id
-    ).all()
+    stats = {
+        row.user_id: ranking_values(row)
+        for row in db.query(
+            UserStats.user_id,
+            UserStats.predictions_made,
+            UserStats.total_points,
+            UserStats.correct_scores,
+            UserStats.correct_results
+        ).filter(UserStats.season_id == season_id)
+    }
+    
+    memberships = db.query(
+        MiniLeagueMember.id,
+        MiniLeagueMember.mini_league_id,
+        MiniLeagueMember.user_id,
+        MiniLeagueMember.position,
+        User.username
+    ).join(
+        MiniLeague, MiniLeague.id == MiniLeagueMember.mini_league_id
+    ).join(
+        User, User.id == MiniLeagueMember.user_id
+    ).filter(MiniLeague.season_id == season_id).all()
+    
+    # Members without season stats rank as users with no predictions
+    no_stats = (0, 0, 0, 0)
+    leagues = {}
+    stored_positions = {}
+    for member in memberships:
+        leagues.setdefault(member.mini_league_id, []).append(
+            (member.id, member.user_id, stats.get(member.user_id, no_stats), member.username)
+        )
+        stored_positions[member.id] = member.position
+    
+    league_items = list(leagues.items())
+    workers = workers or MINI_LEAGUE_POSITION_WORKERS
+    if workers > 1 and len(league_items) >= PARALLEL_LEAGUE_THRESHOLD:
+        # Spawned rather than forked: the caller may be a threaded server process
+        shards = [league_items[index::workers] for index in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            ranked = [row for shard in pool.map(rank_league_members, shards) for row in shard]
+    else:
+        ranked = rank_league_members(league_items)
     
     all_positions = {}
-    for league in mini_leagues:
-        positions = update_mini_league_positions(db, league.id)
-        all_positions[league.id] = positions
-        logger.info(f"Calculated positions for {len(positions)} users in mini league {league.name}")
+    changed = []
+    for league_id, member_id, user_id, position in ranked:
+        all_positions.setdefault(league_id, {})[user_id] = position
+        if stored_positions[member_id] != position:
+            changed.append({"id": member_id, "position": position})
+    
+    if changed:
+        db.execute(update(MiniLeagueMember), changed)
+    db.commit()
     
-    return all_positions
\ No newline at end of file
+    logger.info(
+        f"Calculated positions for {len(memberships)} members in {len(league_items)} mini leagues "
+        f"in season {season_id} ({len(changed)} changed)"
+    )
+    return all_positions
@@ -1,63 +1,334 @@
+"""
+Rate limiting for the auth endpoints.
+
+With RATE_LIMIT_REDIS_URL set, limits are sliding windows kept in Redis: the
+attempts in the current fixed window plus the previous window's attempts
+weighted by how much of it still overlaps. The check-and-increment runs as one
+Lua script, so the limit holds across uvicorn workers and restarts.
+
+Without it, or while Redis is unreachable, each process limits on its own with
+GCRA (a token bucket that stores only the time the bucket will be full again).
+That state lives in a bounded LRU, so a spray of one-off keys can't grow memory
+past RATE_LIMIT_MAX_KEYS entries; only refilled keys are evicted, and once the
+map is full of limited keys new ones share an overflow bucket.
+
+RateLimitMiddleware (mounted in main.py) applies per-route policies per client
+IP before FastAPI routes the request, so rejected requests never parse a body
+or open a database session. The client IP is taken from X-Forwarded-For past
+RATE_LIMIT_TRUSTED_PROXY_HOPS proxies, never from hops the client could forge.
+"""
 from fastapi import HTTPException, Request, status
-from datetime import datetime, timedelta
-from typing import Dict, Tuple
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+import json
+import logging
+import math
+import os
+import threading
 import time
+import redis
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", os.getenv("REDIS_URL", ""))
+RATE_LIMIT_REDIS_TIMEOUT_SECONDS = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT_SECONDS", "0.5"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "50000"))
+RATE_LIMIT_POLICIES = os.getenv("RATE_LIMIT_POLICIES", "")
+# Proxies in front of the app that append to X-Forwarded-For (Render's load balancer is one)
+RATE_LIMIT_TRUSTED_PROXY_HOPS = int(os.getenv("RATE_LIMIT_TRUSTED_PROXY_HOPS", "1"))
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    reset_seconds: int
+
+def window_position(now: float, window_seconds: int) -> Tuple[int, float]:
+    """Index of the fixed window containing now, and how far into it now is"""
+    index = int(now // window_seconds)
+    return index, now - index * window_seconds
+
+def window_result(
+    allowed: bool,
+    previous: int,
+    current: int,
+    max_attempts: int,
+    window_seconds: int,
+    elapsed: float
+) -> RateLimitResult:
+    """Turn the two window counters (current including this attempt, if allowed) into a result"""
+    left_in_window = window_seconds - elapsed
+    used = previous * left_in_window / window_seconds + current
+
+    if allowed:
+        return RateLimitResult(True, max(0, max_attempts - math.ceil(used)), math.ceil(left_in_window))
+
+    if current < max_attempts:
+        # The previous window's share decays until the estimate drops below the limit
+        wait = left_in_window - window_seconds * (max_attempts - current) / previous
+    else:
+        # Wait for the window to roll over, then for this window's share to decay
+        wait = left_in_window + window_seconds * (1 - max_attempts / max(current, 1))
+    # The estimate must drop strictly below the limit, so round past the boundary
+    return RateLimitResult(False, 0, math.floor(max(wait, 0)) + 1)
+
+class FakeClock:
+    """Settable clock for tests, e.g. GCRARateLimitBackend(clock=FakeClock())"""
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def __call__(self) -> float:
+        return self.now
+
+class GCRARateLimitBackend:
+    """
+    Per-process limiter; only correct when a single worker serves the app.
+
+    Each key stores one float, its theoretical arrival time (TAT): when the
+    bucket will be full again. max_attempts per window_seconds means one token
+    every window_seconds / max_attempts, with bursts of up to max_attempts.
+
+    Only keys whose bucket has refilled are ever evicted, since dropping a
+    limited key would reset its limit. If max_keys keys are all still limited,
+    keys not already tracked share one overflow bucket per policy until room
+    frees up, so a spray of new keys limits itself instead of its victims.
+    """
+    # Least recently seen keys checked for a refilled bucket on each hit, and
+    # when a new key arrives at a full map
+    TRIM_PER_HIT = 2
+    TRIM_WHEN_FULL = 32
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, clock: Callable[[], float] = time.time):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._tats = OrderedDict()
+        # (max_attempts, window_seconds) -> TAT for keys that found the map full
+        self._overflow = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, max_attempts: int, window_seconds: int) -> RateLimitResult:
+        now = self.clock()
+
+        with self._lock:
+            tats = self._tats
+            if key in tats:
+                self._trim(now, self.TRIM_PER_HIT)
+            else:
+                self._trim(now, self.TRIM_PER_HIT if len(tats) < self.max_keys else self.TRIM_WHEN_FULL)
+                if len(tats) >= self.max_keys:
+                    tats = self._overflow
+                    key = (max_attempts, window_seconds)
+            return self._hit(tats, key, now, max_attempts, window_seconds)
+
+    @staticmethod
+    def _hit(tats: OrderedDict, key, now: float, max_attempts: int, window_seconds: int) -> RateLimitResult:
+        interval = window_seconds / max_attempts
+        tat = max(tats.get(key, now), now)
+        new_tat = tat + interval
+        allow_at = new_tat - window_seconds
+
+        if now < allow_at:
+            tats.move_to_end(key)
+            return RateLimitResult(False, 0, math.ceil(allow_at - now))
+
+        tats[key] = new_tat
+        tats.move_to_end(key)
+
+        remaining = int((window_seconds - (new_tat - now)) / interval + 1e-9)
+        return RateLimitResult(True, remaining, math.ceil(new_tat - now))
+
+    def _trim(self, now: float, limit: int):
+        # A key whose bucket has refilled is the same as no key, so it can go;
+        # keys that are still limited are kept however long ago they were seen
+        for key, tat in list(islice(self._tats.items(), limit)):
+            if tat <= now:
+                del self._tats[key]
+
+    def __len__(self):
+        return len(self._tats)
+
+# KEYS: current window counter, previous window counter
+# ARGV: limit, window length (ms), time elapsed in the current window (ms)
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+
+if previous * (window - elapsed) / window + current >= limit then
+    return {0, previous, current}
+end
+
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('PEXPIRE', KEYS[1], window * 2)
+end
+return {1, previous, current}
+"""
+
+class RedisRateLimitBackend:
+    """Counters shared by every worker through Redis"""
+    # Does network I/O, so async callers run it in a worker thread
+    blocking = True
+
+    def __init__(self, client: redis.Redis, prefix: str = "ratelimit", clock: Callable[[], float] = time.time):
+        self.client = client
+        self.prefix = prefix
+        self.clock = clock
+        self._script = client.register_script(SLIDING_WINDOW_SCRIPT)
+
+    def _key(self, key: str, window_seconds: int, index: int) -> str:
+        # The hash tag keeps both windows of a key on one Redis Cluster slot
+        return f"{self.prefix}:{{{key}:{window_seconds}}}:{index}"
+
+    def hit(self, key: str, max_attempts: int, window_seconds: int) -> RateLimitResult:
+        index, elapsed = window_position(self.clock(), window_seconds)
+        allowed, previous, current = self._script(
+            keys=[self._key(key, window_seconds, index), self._key(key, window_seconds, index - 1)],
+            args=[max_attempts, window_seconds * 1000, int(elapsed * 1000)]
+        )
+        return window_result(bool(allowed), previous, current, max_attempts, window_seconds, elapsed)
 
 class RateLimiter:
-    def __init__(self):
-        self.attempts: Dict[str, list] = {}
-        
-    def _clean_old_attempts(self, key: str, window_seconds: int):
-        """Remove attempts older than the time window"""
-        if key not in self.attempts:
-            return
-        
-        cutoff_time = time.time() - window_seconds
-        self.attempts[key] = [t for t in self.attempts[key] if t > cutoff_time]
-        
-        if not self.attempts[key]:
-            del self.attempts[key]
-    
-    def check_rate_limit(
-        self,
-        key: str,
-        max_attempts: int,
-        window_seconds: int
-    ) -> Tuple[bool, int]:
-        """
-        Check if rate limit is exceeded
-        Returns (is_allowed, remaining_attempts)
-        """
-        self._clean_old_attempts(key, window_seconds)
-        
-        if key not in self.attempts:
-            self.attempts[key] = []
-        
-        current_attempts = len(self.attempts[key])
-        
-        if current_attempts >= max_attempts:
-            return False, 0
-        
-        return True, max_attempts - current_attempts
-    
-    def record_attempt(self, key: str):
-        """Record a new attempt"""
-        if key not in self.attempts:
-            self.attempts[key] = []
-        self.attempts[key].append(time.time())
-    
-    def get_reset_time(self, key: str, window_seconds: int) -> int:
-        """Get seconds until rate limit resets"""
-        if key not in self.attempts or not self.attempts[key]:
-            return 0
-        
-        oldest_attempt = min(self.attempts[key])
-        reset_time = oldest_attempt + window_seconds - time.time()
-        
-        return max(0, int(reset_time))
+    """Applies limits through a backend, falling back to process memory if Redis fails"""
+    def __init__(self, backend=None, fallback=None):
+        self.backend = backend or GCRARateLimitBackend()
+        self.fallback = fallback or GCRARateLimitBackend()
+
+    def hit(self, key: str, max_attempts: int, window_seconds: int) -> RateLimitResult:
+        """Count an attempt against key, unless it is already over the limit"""
+        try:
+            return self.backend.hit(key, max_attempts, window_seconds)
+        except redis.RedisError as e:
+            logger.warning(f"Rate limit backend unavailable, counting in process: {e}")
+            return self.fallback.hit(key, max_attempts, window_seconds)
+
+    async def ahit(self, key: str, max_attempts: int, window_seconds: int) -> RateLimitResult:
+        """hit() for use on the event loop"""
+        if getattr(self.backend, "blocking", False):
+            return await run_in_threadpool(self.hit, key, max_attempts, window_seconds)
+        return self.hit(key, max_attempts, window_seconds)
+
+def create_rate_limiter() -> RateLimiter:
+    if RATE_LIMIT_REDIS_URL:
+        client = redis.Redis.from_url(
+            RATE_LIMIT_REDIS_URL,
+            socket_timeout=RATE_LIMIT_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=RATE_LIMIT_REDIS_TIMEOUT_SECONDS
+        )
+        return RateLimiter(RedisRateLimitBackend(client))
+    return RateLimiter(GCRARateLimitBackend())
 
 # Global rate limiter instance
-rate_limiter = RateLimiter()
+rate_limiter = create_rate_limiter()
+
+def scope_client_ip(scope, trusted_hops: int = RATE_LIMIT_TRUSTED_PROXY_HOPS) -> str:
+    """
+    Client IP of an ASGI request. Each trusted proxy appends the address it saw
+    to X-Forwarded-For, so the client is the trusted_hops-th entry from the
+    right; anything left of that was sent by the client and can't be trusted.
+    """
+    if trusted_hops > 0:
+        hops = [
+            hop.strip()
+            for name, value in scope.get("headers", [])
+            if name == b"x-forwarded-for"
+            for hop in value.decode("latin-1").split(",")
+            if hop.strip()
+        ]
+        if hops:
+            # Fewer entries than proxies means the header started at one of ours
+            return hops[-min(trusted_hops, len(hops))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+class RateLimitPolicy(NamedTuple):
+    limit: int
+    window_seconds: int
+
+# Keyed by "METHOD /path". RATE_LIMIT_POLICIES takes JSON that is merged over these,
+# e.g. {"POST /api/auth/login": {"limit": 20, "window": 300}}; null removes a policy.
+# /api/auth/social is left out as every call comes from the NextAuth server's IP.
+DEFAULT_RATE_LIMIT_POLICIES = {
+    "POST /api/auth/login": RateLimitPolicy(10, 300),
+    "POST /api/auth/register": RateLimitPolicy(5, 300),
+    "POST /api/auth/verify-email": RateLimitPolicy(10, 300),
+    "POST /api/auth/resend-verification": RateLimitPolicy(3, 300),
+    "POST /api/auth/resend-verification-public": RateLimitPolicy(3, 300),
+    "POST /api/auth/forgot-password": RateLimitPolicy(5, 300),
+    "POST /api/auth/reset-password": RateLimitPolicy(5, 300),
+    "POST /api/users/me/change-password": RateLimitPolicy(5, 300),
+    "POST /api/predictions": RateLimitPolicy(30, 60),
+}
+
+def route_key(method: str, path: str) -> str:
+    return f"{method.upper()} {path.rstrip('/') or '/'}"
+
+def load_rate_limit_policies(overrides: str = RATE_LIMIT_POLICIES) -> Dict[str, RateLimitPolicy]:
+    policies = dict(DEFAULT_RATE_LIMIT_POLICIES)
+    if overrides:
+        for route, policy in json.loads(overrides).items():
+            method, path = route.split(" ", 1)
+            route = route_key(method, path)
+            if policy is None:
+                policies.pop(route, None)
+            else:
+                policies[route] = RateLimitPolicy(int(policy["limit"]), int(policy["window"]))
+    return policies
+
+def rate_limit_headers(policy: RateLimitPolicy, result: RateLimitResult) -> Dict[str, str]:
+    """IETF draft RateLimit-* response headers"""
+    return {
+        "RateLimit-Limit": str(policy.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(result.reset_seconds),
+        "RateLimit-Policy": f"{policy.limit};w={policy.window_seconds}"
+    }
+
+class RateLimitMiddleware:
+    """ASGI middleware that applies rate limit policies to matching routes"""
+    def __init__(self, app, limiter: Optional[RateLimiter] = None, policies: Optional[Dict[str, RateLimitPolicy]] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+        self.policies = load_rate_limit_policies() if policies is None else policies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_key(scope["method"], scope["path"])
+        policy = self.policies.get(route)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        result = await self.limiter.ahit(f"{route}:{scope_client_ip(scope)}", policy.limit, policy.window_seconds)
+        headers = rate_limit_headers(policy, result)
+
+        if not result.allowed:
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": f"Too many attempts. Please try again in {result.reset_seconds} seconds."},
+                headers={**headers, "Retry-After": str(result.reset_seconds)}
+            )
+            await response(scope, receive, send)
+            return
+
+        raw_headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), *raw_headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
 
 def rate_limit_middleware(
     request: Request,
@@ -70,37 +341,26 @@ def rate_limit_middleware(
     Default: 5 attempts per minute
     """
     # Get client IP
-    client_ip = request.client.host
-    if "x-forwarded-for" in request.headers:
-        client_ip = request.headers["x-forwarded-for"].split(",")[0].strip()
-    
+    client_ip = scope_client_ip(request.scope)
+
     # Create rate limit key
     rate_limit_key = f"{endpoint}:{client_ip}"
-    
-    # Check rate limit
-    is_allowed, remaining = rate_limiter.check_rate_limit(
-        rate_limit_key,
-        max_attempts,
-        window_seconds
-    )
-    
-    if not is_allowed:
-        reset_time = rate_limiter.get_reset_time(rate_limit_key, window_seconds)
+
+    result = rate_limiter.hit(rate_limit_key, max_attempts, window_seconds)
+
+    if not result.allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Too many attempts. Please try again in {reset_time} seconds.",
+            detail=f"Too many attempts. Please try again in {result.reset_seconds} seconds.",
             headers={
                 "X-RateLimit-Limit": str(max_attempts),
                 "X-RateLimit-Remaining": "0",
-                "X-RateLimit-Reset": str(reset_time)
+                "X-RateLimit-Reset": str(result.reset_seconds)
             }
         )
-    
-    # Record attempt
-    rate_limiter.record_attempt(rate_limit_key)
-    
+
     return {
         "X-RateLimit-Limit": str(max_attempts),
-        "X-RateLimit-Remaining": str(remaining - 1),
-        "X-RateLimit-Reset": str(window_seconds)
-    }
\ No newline at end of file
+        "X-RateLimit-Remaining": str(result.remaining),
+        "X-RateLimit-Reset": str(result.reset_seconds)
+    }